@@ -3,6 +3,11 @@ ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Las vistas async (p.ej. el stream SSE de /notificaciones/stream/) deben
+servirse por aquí para no bloquear un worker por cliente conectado:
+
+    uvicorn config.asgi:application --workers 4
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
@@ -1,8 +1,15 @@
 from pathlib import Path
+import copy
 import os
 
+from dotenv import load_dotenv
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# Variables de .env (python-dotenv) para todos los perfiles; las ya definidas
+# en el entorno tienen prioridad. Se carga antes de leer DB_* y compañía.
+load_dotenv(BASE_DIR / '.env')
+
 
 SECRET_KEY = 'django-inseguro-para-dev'
 
@@ -30,6 +37,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.ratelimit.RateLimitMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -45,6 +53,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.unread_notifications',
             ],
         },
     },
@@ -52,21 +61,94 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
-DATABASES = {
-  'default': {
-    'ENGINE': 'django.db.backends.mysql',
-    'NAME': 'incluimap',
-    'USER': 'root',
-    'PASSWORD': '',          
-    'HOST': '127.0.0.1',
-    'PORT': '3306',
-    'OPTIONS': {
-      'charset': 'utf8mb4',
-      'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
-    },
-  }
+TEST_RUNNER = 'core.test_runner.IncluiMapTestRunner'
+
+# Base de datos configurable por variables de entorno (ver .env).
+# DB_ENGINE=sqlite permite correr el proyecto y los tests sin MySQL.
+DB_ENGINE = os.environ.get('DB_ENGINE', 'mysql').lower()
+
+# Conexiones persistentes: cada worker reutiliza su conexión durante
+# DB_CONN_MAX_AGE segundos en vez de abrir una (y correr init_command)
+# por petición. Las health checks descartan conexiones caídas.
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', '60'))
+DB_CONN_HEALTH_CHECKS = os.environ.get('DB_CONN_HEALTH_CHECKS', '1') == '1'
+
+# Pool en proceso (opcional) para workers con hilos o ASGI: DB_POOL_SIZE > 0
+# lo activa. Con pool, CONN_MAX_AGE=0 devuelve la conexión al pool al final
+# de cada petición.
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '0'))
+DB_POOL = {
+    'MAX_SIZE': DB_POOL_SIZE,
+    'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', '5')),
+    'MAX_IDLE': float(os.environ.get('DB_POOL_MAX_IDLE', '300')),
+    'CHECK_AFTER': float(os.environ.get('DB_POOL_CHECK_AFTER', '30')),
 }
 
+if DB_ENGINE == 'sqlite':
+    # Ruta propia: DB_NAME (también en .env) es el nombre del esquema MySQL.
+    DATABASES = {
+      'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('DB_SQLITE_NAME') or BASE_DIR / 'db.sqlite3',
+      }
+    }
+else:
+    DATABASES = {
+      'default': {
+        'ENGINE': 'django.db.backends.mysql',
+        'NAME': os.environ.get('DB_NAME', 'incluimap'),
+        'USER': os.environ.get('DB_USER', 'root'),
+        'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+        'HOST': os.environ.get('DB_HOST', '127.0.0.1'),
+        'PORT': os.environ.get('DB_PORT', '3306'),
+        'OPTIONS': {
+          'charset': 'utf8mb4',
+          'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
+        },
+      }
+    }
+
+DATABASES['default']['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+DATABASES['default']['CONN_HEALTH_CHECKS'] = DB_CONN_HEALTH_CHECKS
+
+if DB_POOL_SIZE > 0:
+    DATABASES['default']['ENGINE'] = (
+        'core.db.backends.sqlite3' if DB_ENGINE == 'sqlite' else 'core.db.backends.mysql'
+    )
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default']['POOL'] = DB_POOL
+
+# Réplica de lectura opcional (DB_REPLICA_HOST o DB_REPLICA_NAME). Las vistas
+# de solo lectura marcadas con @read_from_replica leen de ella; ver
+# core/routers.py. En MySQL los tests la tratan como espejo de 'default';
+# con SQLite se crean dos BDs separadas para poder probar el ruteo.
+DB_REPLICA_HOST = os.environ.get('DB_REPLICA_HOST')
+DB_REPLICA_NAME = os.environ.get('DB_REPLICA_NAME')
+if DB_REPLICA_HOST or DB_REPLICA_NAME:
+    DATABASES['replica'] = copy.deepcopy(DATABASES['default'])
+    if DB_REPLICA_NAME:
+        DATABASES['replica']['NAME'] = DB_REPLICA_NAME
+    if DB_REPLICA_HOST:
+        DATABASES['replica']['HOST'] = DB_REPLICA_HOST
+        DATABASES['replica']['PORT'] = os.environ.get('DB_REPLICA_PORT', DATABASES['default'].get('PORT', ''))
+        DATABASES['replica']['USER'] = os.environ.get('DB_REPLICA_USER', DATABASES['default'].get('USER', ''))
+        DATABASES['replica']['PASSWORD'] = os.environ.get('DB_REPLICA_PASSWORD', DATABASES['default'].get('PASSWORD', ''))
+    if DB_ENGINE != 'sqlite':
+        DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+DATABASE_REPLICA_ALIAS = 'replica'
+# Interruptor general del ruteo. El runner de tests lo apaga (TestCase escribe
+# dentro de una transacción que la réplica no ve); los tests del router lo
+# activan con override_settings.
+REPLICA_READS = os.environ.get('DB_REPLICA_READS', '1') == '1'
+# Segundos que las lecturas de un usuario van al primario después de que
+# escribe (reporte, comentario, favorito), para que vea sus propios cambios.
+REPLICA_PIN_SECONDS = int(os.environ.get('DB_REPLICA_PIN_SECONDS', '15'))
+# Alias de CACHES donde vive el pin; con DEBUG=False y réplica debe ser
+# compartida entre workers (lo exige el check core.E002).
+REPLICA_PIN_CACHE = os.environ.get('DB_REPLICA_PIN_CACHE', 'default')
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
@@ -88,13 +170,105 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# ModelBackend que trae el Profile en la misma consulta que el usuario.
+AUTHENTICATION_BACKENDS = ['core.backends.ProfileModelBackend']
+
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'home'
 LOGOUT_REDIRECT_URL = 'home'
 
 
-EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+# Todo correo pasa por la bandeja de salida (core.models.OutboundEmail);
+# `python manage.py send_queued_mail` lo entrega con el backend real.
+EMAIL_BACKEND = 'core.mail.OutboxEmailBackend'
+OUTBOX_DELIVERY_BACKEND = 'django.core.mail.backends.console.EmailBackend'
+OUTBOX_MAX_ATTEMPTS = 6
+OUTBOX_BACKOFF_SECONDS = 60
+# Un lote reclamado queda en "sending" hasta que vence este lease; debe
+# superar lo que tarda un lote completo (batch_size · EMAIL_TIMEOUT).
+OUTBOX_LEASE_SECONDS = 900
 
 
 DEFAULT_FROM_EMAIL = 'no-reply@incluimap.local'
 CONTACT_EMAIL = 'soporte@incluimap.local'
+
+# Segundos entre comentarios "keepalive" del stream SSE de notificaciones.
+SSE_HEARTBEAT_SECONDS = 15
+# Cada cuántos segundos el relay de cada proceso ASGI revisa la base de
+# datos en busca de notificaciones escritas por otros workers, con una
+# consulta por pasada para todas sus conexiones (core/pubsub.py).
+SSE_POLL_SECONDS = 5
+# Duración máxima de una conexión SSE; el navegador reconecta solo.
+SSE_MAX_SECONDS = 300
+# Margen al releer desde el cursor, para filas que confirmaron tarde.
+SSE_REPLAY_OVERLAP_SECONDS = 5
+
+# Segundos que se cachea el resumen de un lugar (/lugares/<id>/); igual se
+# invalida al cambiar sus reportes o comentarios.
+PLACE_SUMMARY_CACHE_SECONDS = int(os.environ.get('PLACE_SUMMARY_CACHE_SECONDS', '600'))
+
+# Antigüedad mínima (segundos) de una entrada de ChangeLog para entregarla
+# en /api/sync/; cubre dos INSERT del ChangeLog que confirman casi a la vez
+# (las entradas se insertan después del commit, ver core/sync.py).
+SYNC_SETTLE_SECONDS = int(os.environ.get('SYNC_SETTLE_SECONDS', '2'))
+# Días que se conserva el ChangeLog (`python manage.py prune_changelog`); un
+# cliente que no sincroniza en ese plazo vuelve a bajar el snapshot.
+SYNC_RETENTION_DAYS = int(os.environ.get('SYNC_RETENTION_DAYS', '30'))
+
+# Días que se guardan las notificaciones leídas antes de que
+# `python manage.py prune_notifications` las pase a NotificationArchive.
+NOTIFICATION_RETENTION_DAYS = int(os.environ.get('NOTIFICATION_RETENTION_DAYS', '90'))
+
+# Días que un reporte eliminado (borrado lógico) se conserva antes de que
+# `python manage.py purge_deleted_reports` lo borre con sus comentarios.
+REPORT_PURGE_AFTER_DAYS = int(os.environ.get('REPORT_PURGE_AFTER_DAYS', '30'))
+
+# Máximo de reportes aceptados por /api/reports/batch/ en una petición.
+REPORT_BATCH_MAX_ITEMS = int(os.environ.get('REPORT_BATCH_MAX_ITEMS', '50'))
+
+# Límite de POST por usuario (o IP sin sesión), por nombre de URL.
+# Formato "cantidad/periodo" con periodo s, m, h o d. Ver core/ratelimit.py.
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', '1').lower() in ('1', 'true', 'yes')
+# Alias de CACHES con los contadores; con DEBUG=False debe ser compartida
+# entre workers (lo exige el check core.E002).
+RATE_LIMIT_CACHE = os.environ.get('RATE_LIMIT_CACHE', 'default')
+RATE_LIMITS = {
+    'report': '10/m',
+    'report_detail': '20/m',
+    'contact': '3/h',
+    'reports_batch_api': '20/m',
+    'flag_report': '10/h',
+    'flag_comment': '10/h',
+}
+# Detrás de un proxy de confianza, la IP real viene en X-Forwarded-For.
+RATE_LIMIT_TRUST_X_FORWARDED_FOR = os.environ.get('RATE_LIMIT_TRUST_X_FORWARDED_FOR', '0').lower() in ('1', 'true', 'yes')
+
+# Proxy de teselas del mapa base (core/tiles.py). Apagado, el mapa pide
+# las teselas directo a TILE_UPSTREAMS.
+TILE_PROXY_ENABLED = os.environ.get('TILE_PROXY_ENABLED', '0').lower() in ('1', 'true', 'yes')
+TILE_UPSTREAMS = {
+    'osm': 'https://tile.openstreetmap.org/{z}/{x}/{y}.png',
+    'hot': 'https://a.tile.openstreetmap.fr/hot/{z}/{x}/{y}.png',
+    'carto': 'https://a.basemaps.cartocdn.com/light_all/{z}/{x}/{y}.png',
+}
+TILE_CACHE_DIR = Path(os.environ.get('TILE_CACHE_DIR', BASE_DIR / 'var' / 'tiles'))
+# Tope del disco para TILE_CACHE_DIR; `python manage.py prune_tiles` (cron)
+# borra las teselas menos usadas cuando se pasa.
+TILE_CACHE_MAX_BYTES = int(os.environ.get('TILE_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+# Segundos que una tesela se sirve sin revalidar con el servidor de origen.
+TILE_CACHE_MAX_AGE = int(os.environ.get('TILE_CACHE_MAX_AGE', str(7 * 86400)))
+TILE_BROWSER_MAX_AGE = 86400
+# El proxy solo sirve teselas que tocan este rectángulo (Maipú con margen,
+# como (lat_min, lat_max, lng_min, lng_max)) entre estos zoom; el resto es
+# 404 sin consultar al origen.
+TILE_BOUNDS = (-33.65, -33.38, -70.93, -70.63)
+TILE_MIN_ZOOM = 11
+TILE_MAX_ZOOM = 19
+TILE_UPSTREAM_TIMEOUT = 10
+# La política de uso de tile.openstreetmap.org pide un User-Agent que
+# identifique a la app (idealmente con un contacto).
+TILE_USER_AGENT = os.environ.get('TILE_USER_AGENT', 'IncluiMap tile proxy')
+
+# Sin static/vendor/leaflet/ (python manage.py vendor_leaflet) las páginas
+# cargan Leaflet desde unpkg solo si esto está activo; si no, falla el check.
+LEAFLET_CDN_FALLBACK = os.environ.get('LEAFLET_CDN_FALLBACK', '0').lower() in ('1', 'true', 'yes')
@@ -12,12 +12,16 @@ urlpatterns = [
     
     path('', core_views.map_view, name='home'),
     path('lugares/', core_views.places_view, name='places'),
+    path('lugares/<int:pk>/', core_views.place_detail_view, name='place_detail'),
     path('reportar/', core_views.report_view, name='report'),
     path('reportes/', core_views.reports_view, name='reports'),
     path('reportes/mios/', core_views.my_reports_view, name='my_reports'),
     path('reportes/<int:pk>/', core_views.report_detail, name='report_detail'),
     path('reportes/<int:pk>/editar/', core_views.report_edit_view, name='report_edit'),
     path('reportes/<int:pk>/eliminar/', core_views.report_delete_view, name='report_delete'),
+    path('reportes/<int:pk>/denunciar/', core_views.flag_report_view, name='flag_report'),
+    path('comentarios/<int:pk>/denunciar/', core_views.flag_comment_view, name='flag_comment'),
+    path('moderacion/', core_views.moderation_view, name='moderation'),
     path('acerca/', core_views.about_view, name='about'),
     path('contacto/', core_views.contact_view, name='contact'),
 
@@ -28,6 +32,8 @@ urlpatterns = [
     
     path('perfil/', core_views.profile_view, name='profile'),
     path('notificaciones/', core_views.notifications_view, name='notifications'),
+    path('notificaciones/stream/', core_views.notifications_stream, name='notifications_stream'),
+    path('notificaciones/nuevas/', core_views.notifications_poll, name='notifications_poll'),
 
     
     path('dashboard/', core_views.dashboard_view, name='dashboard'),
@@ -75,6 +81,14 @@ urlpatterns = [
 
     
     path('api/places/', core_views.places_api, name='places_api'),
+    path('api/places/search/', core_views.place_search_api, name='place_search_api'),
+    path('api/places/<int:pk>/', core_views.place_detail_api, name='place_detail_api'),
+    path('api/async/places/', core_views.places_api_async, name='places_api_async'),
+    path('api/reports/batch/', core_views.reports_batch_api, name='reports_batch_api'),
+    path('api/sync/', core_views.sync_api, name='sync_api'),
+    path('api/favorites/', core_views.favorites_api, name='favorites_api'),
+    path('api/metrics/', core_views.metrics_api, name='metrics_api'),
+    path('tiles/<slug:layer>/<int:z>/<int:x>/<int:y>.png', core_views.tile_view, name='tile'),
 ]
 
 if settings.DEBUG:
@@ -1,5 +1,60 @@
-from django.contrib import admin
-from .models import Place, Report
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db import connections
+from django.urls import reverse
+from django.utils.functional import cached_property
+from django.utils.html import format_html, format_html_join
+
+from . import moderation
+from .dedupe import find_similar
+from .models import Comment, Flag, Notification, OutboundEmail, Place, Report
+
+# Por debajo de esto el COUNT(*) exacto es barato y la estimación, imprecisa.
+ESTIMATE_MIN_ROWS = 100_000
+
+
+def estimated_row_count(model, using="default"):
+    """
+    Filas aproximadas de la tabla según las estadísticas de InnoDB, sin
+    recorrerla. None si el motor no las tiene (SQLite).
+    """
+    connection = connections[using]
+    if connection.vendor != "mysql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            [model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginador del admin para tablas grandes: sin filtros ni búsqueda, el
+    total sale de las estadísticas de la tabla en vez de un COUNT(*) que la
+    recorre entera. Con filtros cuenta de verdad (usan índices).
+    """
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        if not qs.query.where:
+            estimate = estimated_row_count(qs.model, qs.db)
+            if estimate is not None and estimate >= ESTIMATE_MIN_ROWS:
+                return estimate
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """Changelist usable con millones de filas."""
+    paginator = EstimatedCountPaginator
+    # Evita el segundo COUNT(*) sin filtros ("N de M seleccionados").
+    show_full_result_count = False
+    list_per_page = 50
+
 
 @admin.register(Place)
 class PlaceAdmin(admin.ModelAdmin):
@@ -8,9 +63,92 @@ class PlaceAdmin(admin.ModelAdmin):
     list_filter = ()
     ordering = ("-created_at",)
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and not {"name", "lat", "lng"} & set(form.changed_data):
+            return
+        similar = find_similar(obj.name, obj.lat, obj.lng, exclude=obj.pk)
+        if similar:
+            links = format_html_join(
+                ", ", '<a href="{}">{}</a>',
+                ((reverse("admin:core_place_change", args=[p.pk]), p.name) for p in similar),
+            )
+            messages.warning(request, format_html(
+                "«{}» parece duplicado de: {}. Revisa y fusiona con "
+                "<code>manage.py find_duplicate_places --merge</code>.",
+                obj.name, links,
+            ))
+
 @admin.register(Report)
-class ReportAdmin(admin.ModelAdmin):
-    list_display = ("id", "place", "author", "rating", "tags", "created_at")
+class ReportAdmin(LargeTableAdmin):
+    list_display = ("id", "place", "author", "rating", "tags", "created_at", "deleted_at", "deleted_by")
+    list_select_related = ("place", "author", "deleted_by")
     search_fields = ("place__name", "author__username", "tags", "description")
-    list_filter = ("rating",)
+    list_filter = ("rating", "deleted_at")
+    ordering = ("-created_at",)
+    raw_id_fields = ("place", "author")
+    readonly_fields = ("deleted_at", "deleted_by")
+
+    def get_queryset(self, request):
+        # Moderación: también los eliminados que aún no se purgan.
+        qs = Report.all_objects.all()
+        ordering = self.get_ordering(request)
+        return qs.order_by(*ordering) if ordering else qs
+
+@admin.register(Comment)
+class CommentAdmin(LargeTableAdmin):
+    list_display = ("id", "report", "author", "created_at", "hidden_at")
+    list_select_related = ("report__place", "author")
+    search_fields = ("author__username", "text")
+    list_filter = ("hidden_at",)
+    ordering = ("-created_at",)
+    raw_id_fields = ("report", "author")
+
+    def get_queryset(self, request):
+        # También los ocultados, para poder restaurarlos.
+        qs = Comment.all_objects.all()
+        ordering = self.get_ordering(request)
+        return qs.order_by(*ordering) if ordering else qs
+
+@admin.register(Notification)
+class NotificationAdmin(LargeTableAdmin):
+    list_display = ("id", "user", "place", "count", "is_read", "created_at")
+    list_select_related = ("user", "place")
+    search_fields = ("user__username",)
+    list_filter = ("is_read",)
+    ordering = ("-created_at",)
+    raw_id_fields = ("user", "place", "report")
+
+@admin.register(Flag)
+class FlagAdmin(LargeTableAdmin):
+    list_display = ("id", "kind", "reason", "status", "reporter", "created_at", "resolved_by", "resolved_at")
+    list_select_related = ("reporter", "resolved_by")
+    list_filter = ("status", "kind", "reason")
+    ordering = ("-id",)
+    raw_id_fields = ("report", "comment", "reporter", "resolved_by")
+    actions = ("approve", "hide", "delete_content")
+
+    def _apply(self, request, queryset, action):
+        result = moderation.apply_action(
+            action, list(queryset.values_list("pk", flat=True)), request.user
+        )
+        self.message_user(request, f"{result['flags']} denuncias resueltas.")
+
+    @admin.action(description="Aprobar el contenido denunciado")
+    def approve(self, request, queryset):
+        self._apply(request, queryset, "approve")
+
+    @admin.action(description="Ocultar el contenido denunciado")
+    def hide(self, request, queryset):
+        self._apply(request, queryset, "hide")
+
+    @admin.action(description="Eliminar el contenido denunciado")
+    def delete_content(self, request, queryset):
+        self._apply(request, queryset, "delete")
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ("id", "subject", "status", "attempts", "next_attempt_at", "created_at", "sent_at")
+    search_fields = ("subject", "last_error")
+    list_filter = ("status",)
     ordering = ("-created_at",)
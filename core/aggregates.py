@@ -0,0 +1,173 @@
+"""
+Agregados por lugar para la página /lugares/<id>/ y /api/places/<id>/.
+
+El resumen de un lugar (histograma de calificaciones, frecuencia de
+etiquetas y primera página de reportes) recorre todos sus reportes, así
+que se guarda en la caché por lugar y se invalida desde core.signals
+cuando cambia un reporte o comentario del lugar. Las páginas siguientes
+se leen con paginación por cursor (created_at, id), que no necesita
+OFFSET ni COUNT.
+
+Los cambios en bloque (moderación) no pasan por señales: borran el
+resumen con invalidate_places, encolan los lugares en PlaceRefresh y
+refresh_queued_places los recalcula después, desde el comando
+refresh_place_aggregates.
+"""
+import base64
+import binascii
+from collections import Counter
+from datetime import datetime
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import ChangeLog, Comment, PlaceRefresh, Report
+from .sync import record_changes
+
+REPORTS_PAGE_SIZE = 10
+
+
+def _cache_key(place_id):
+    return f"place-summary:{place_id}"
+
+
+def invalidate_place(place_id):
+    """Borra el resumen cacheado del lugar cuando la transacción confirma."""
+    if place_id is None:
+        return
+    transaction.on_commit(lambda: cache.delete(_cache_key(place_id)))
+
+
+def invalidate_places(place_ids):
+    """Como invalidate_place, para varios lugares con un solo delete_many."""
+    keys = [_cache_key(pk) for pk in place_ids if pk is not None]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def encode_cursor(report):
+    raw = f"{report['created_at'].isoformat()}|{report['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Devuelve (created_at, id) o None si el cursor no es válido."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, pk = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+
+
+def with_comments_count(qs):
+    """
+    Anota comments_count (comentarios visibles) con una subconsulta
+    correlacionada. Un Count("comments") con JOIN obliga a agrupar todos los
+    reportes antes del ORDER BY ... LIMIT y deja sin uso el índice por fecha.
+    """
+    counts = (
+        Comment.objects.filter(report=OuterRef("pk"))
+        .order_by().values("report").annotate(n=Count("id")).values("n")
+    )
+    return qs.annotate(comments_count=Coalesce(Subquery(counts), 0))
+
+
+def _serialize_report(r):
+    return {
+        "id": r.pk,
+        "rating": r.rating,
+        "description": r.description,
+        "tags": [t.strip() for t in r.tags.split(",") if t.strip()],
+        "author": r.author.username,
+        "photo": r.photo.url if r.photo else None,
+        "comments_count": r.comments_count,
+        "created_at": r.created_at,
+    }
+
+
+def reports_page(place_id, cursor=None, limit=None):
+    """
+    Reportes del lugar, del más nuevo al más antiguo, a partir de `cursor`.
+    Devuelve (reportes, siguiente_cursor o None).
+    """
+    limit = limit or REPORTS_PAGE_SIZE
+    qs = with_comments_count(
+        Report.objects.filter(place_id=place_id).select_related("author")
+    ).order_by("-created_at", "-id")
+    if cursor is not None:
+        created_at, pk = cursor
+        qs = qs.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk))
+
+    rows = [_serialize_report(r) for r in qs[:limit + 1]]
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def compute_aggregates(place_id):
+    histogram = {str(i): 0 for i in range(1, 6)}
+    for row in (
+        Report.objects.filter(place_id=place_id)
+        .values("rating").annotate(n=Count("id")).order_by()
+    ):
+        key = str(row["rating"])
+        if key in histogram:
+            histogram[key] = row["n"]
+
+    total = sum(histogram.values())
+    avg = sum(int(k) * n for k, n in histogram.items()) / total if total else None
+
+    tags = Counter()
+    for raw in Report.objects.filter(place_id=place_id).exclude(tags="").values_list("tags", flat=True):
+        tags.update(t.strip() for t in raw.split(",") if t.strip())
+
+    return {
+        "reports_count": total,
+        "avg_rating": round(avg, 2) if avg is not None else None,
+        "rating_histogram": histogram,
+        "tags": [{"tag": t, "count": n} for t, n in tags.most_common()],
+    }
+
+
+def place_summary(place_id):
+    """
+    Agregados y primera página de reportes del lugar, desde la caché si
+    están; si no, se calculan y se guardan por PLACE_SUMMARY_CACHE_SECONDS.
+    """
+    key = _cache_key(place_id)
+    summary = cache.get(key)
+    if summary is None:
+        reports, next_cursor = reports_page(place_id)
+        summary = {
+            "aggregates": compute_aggregates(place_id),
+            "reports": reports,
+            "next_cursor": next_cursor,
+        }
+        cache.set(key, summary, getattr(settings, "PLACE_SUMMARY_CACHE_SECONDS", 600))
+    return summary
+
+
+def refresh_queued_places(batch_size=100):
+    """
+    Recalcula y guarda en caché el resumen de hasta `batch_size` lugares
+    encolados en PlaceRefresh, registra el cambio para /api/sync/ y los
+    saca de la cola. Devuelve cuántos lugares procesó.
+    """
+    place_ids = list(
+        PlaceRefresh.objects.order_by("requested_at")
+        .values_list("place_id", flat=True)[:batch_size]
+    )
+    if not place_ids:
+        return 0
+    # Se sacan de la cola antes de recalcular: si otra acción los vuelve a
+    # encolar mientras tanto, quedan para la próxima pasada.
+    with transaction.atomic():
+        PlaceRefresh.objects.filter(place_id__in=place_ids).delete()
+        record_changes([(ChangeLog.PLACE, pk, False) for pk in place_ids])
+    for place_id in place_ids:
+        cache.delete(_cache_key(place_id))
+        place_summary(place_id)
+    return len(place_ids)
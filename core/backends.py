@@ -0,0 +1,22 @@
+"""
+Backend de autenticación que carga el Profile junto con el usuario.
+
+En cada petición AuthenticationMiddleware resuelve request.user con
+get_user(); con select_related("profile") el menú (badge de
+notificaciones) y las vistas de favoritos y perfil leen request.user.profile
+sin otra consulta. El Profile siempre existe: lo crea
+core.models.create_user_profile al crear el usuario.
+"""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+class ProfileModelBackend(ModelBackend):
+
+    def get_user(self, user_id):
+        UserModel = get_user_model()
+        try:
+            user = UserModel._default_manager.select_related("profile").get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,277 @@
+"""
+Harness de benchmarks para las vistas más usadas de IncluiMap.
+
+Cada escenario es una función que recibe el contexto del benchmark y
+ejecuta UNA petición con el cliente de pruebas de Django. Se mide la
+latencia (percentiles) y la cantidad de consultas SQL por petición. Los
+escenarios `async def` usan AsyncClient, es decir, el handler ASGI.
+
+run_http_load() mide, en cambio, servidores reales (gunicorn/WSGI frente a
+uvicorn/ASGI) con peticiones concurrentes; ver el comando bench_http.
+"""
+import platform
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Count
+from django.test import AsyncClient, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Place, Profile
+
+BENCH_PASSWORD = "bench-password"
+
+
+def percentile(values, pct):
+    """Percentil con interpolación lineal (pct entre 0 y 100)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100.0
+    low = int(k)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (k - low)
+
+
+def summarize_latency(timings_ms):
+    return {
+        "min": round(min(timings_ms), 3),
+        "p50": round(percentile(timings_ms, 50), 3),
+        "p90": round(percentile(timings_ms, 90), 3),
+        "p95": round(percentile(timings_ms, 95), 3),
+        "p99": round(percentile(timings_ms, 99), 3),
+        "max": round(max(timings_ms), 3),
+        "mean": round(statistics.fmean(timings_ms), 3),
+    }
+
+
+def summarize(timings_ms, query_counts):
+    return {
+        "iterations": len(timings_ms),
+        "latency_ms": summarize_latency(timings_ms),
+        "queries": {
+            "min": min(query_counts),
+            "median": statistics.median(query_counts),
+            "max": max(query_counts),
+        },
+    }
+
+
+class BenchContext:
+    """
+    Datos compartidos por los escenarios: el lugar con más seguidores
+    (para medir el fan-out de notificaciones al crear un reporte), uno de
+    sus seguidores como lector y un autor aparte que envía los reportes.
+    """
+
+    def __init__(self):
+        self.hot_place = (
+            Place.objects
+            .annotate(n=Count("favorited_by"))
+            .order_by("-n", "id")
+            .first()
+        )
+        self.followers = 0
+        follower = None
+        if self.hot_place is not None:
+            followers = Profile.objects.filter(favorite_places=self.hot_place)
+            self.followers = followers.count()
+            follower = followers.select_related("user").first()
+
+        self.user = follower.user if follower else User.objects.order_by("id").first()
+        if self.user is None:
+            self.user = User.objects.create_user("bench_user", password=BENCH_PASSWORD)
+        self.author, _ = User.objects.get_or_create(username="bench_author")
+        self.login_user, created = User.objects.get_or_create(username="bench_login")
+        if created:
+            self.login_user.set_password(BENCH_PASSWORD)
+            self.login_user.save(update_fields=["password"])
+
+        self.anon = Client()
+        self.async_anon = AsyncClient()
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+
+def scenario_places_api(ctx):
+    return ctx.anon.get(reverse("places_api"))
+
+
+async def scenario_places_api_async(ctx):
+    return await ctx.async_anon.get(reverse("places_api_async"))
+
+
+def scenario_reports_view(ctx):
+    return ctx.anon.get(reverse("reports"))
+
+
+def scenario_dashboard_view(ctx):
+    return ctx.client.get(reverse("dashboard"))
+
+
+def scenario_notifications_view(ctx):
+    return ctx.client.get(reverse("notifications"))
+
+
+def scenario_login(ctx):
+    # Cliente nuevo en cada iteración: sesión y last_login se escriben siempre.
+    return Client().post(reverse("login"), {
+        "username": ctx.login_user.username,
+        "password": BENCH_PASSWORD,
+    })
+
+
+def scenario_places_view(ctx):
+    return ctx.client.get(reverse("places"))
+
+
+def scenario_favorites_view(ctx):
+    return ctx.client.get(reverse("favorites"))
+
+
+def scenario_profile_view(ctx):
+    return ctx.client.get(reverse("profile"))
+
+
+def scenario_report_submit(ctx):
+    return ctx.author_client.post(reverse("report"), {
+        "place": ctx.hot_place.pk,
+        "description": "Reporte de benchmark",
+        "rating": "4",
+        "tags": ["rampa"],
+    })
+
+
+SCENARIOS = {
+    "places_api": scenario_places_api,
+    "places_api_async": scenario_places_api_async,
+    "reports_view": scenario_reports_view,
+    "dashboard_view": scenario_dashboard_view,
+    "report_submit_fanout": scenario_report_submit,
+    "notifications_view": scenario_notifications_view,
+    "login": scenario_login,
+    "places_view": scenario_places_view,
+    "favorites_view": scenario_favorites_view,
+    "profile_view": scenario_profile_view,
+}
+
+
+def run_scenario(ctx, func, iterations=20, warmup=2):
+    """
+    Ejecuta un escenario `warmup + iterations` veces y devuelve el resumen.
+    Las respuestas con status >= 400 se consideran error.
+    """
+    if iscoroutinefunction(func):
+        func = async_to_sync(func)
+
+    for _ in range(warmup):
+        func(ctx)
+
+    timings, queries, errors = [], [], 0
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            response = func(ctx)
+            elapsed = (time.perf_counter() - start) * 1000
+        if response.status_code >= 400:
+            errors += 1
+        timings.append(elapsed)
+        queries.append(len(captured.captured_queries))
+
+    result = summarize(timings, queries)
+    result["errors"] = errors
+    return result
+
+
+def run_benchmarks(names=None, iterations=20, warmup=2):
+    """
+    Corre los escenarios pedidos (todos por defecto) y devuelve un dict
+    serializable a JSON con metadatos del entorno y los resultados.
+    """
+    ctx = BenchContext()
+    names = names or list(SCENARIOS)
+
+    results = {}
+    # Los escenarios repiten POSTs a propósito; el límite de peticiones
+    # los cortaría con 429.
+    with override_settings(RATE_LIMIT_ENABLED=False):
+        for name in names:
+            if name == "report_submit_fanout" and ctx.hot_place is None:
+                continue
+            results[name] = run_scenario(ctx, SCENARIOS[name], iterations, warmup)
+
+    return {
+        "meta": {
+            "timestamp": timezone.now().isoformat(),
+            "django": django.get_version(),
+            "python": platform.python_version(),
+            "db_vendor": connection.vendor,
+            "places": Place.objects.count(),
+            "followers_hot_place": ctx.followers,
+            "iterations": iterations,
+        },
+        "results": results,
+    }
+
+
+def compare(previous, current):
+    """
+    Diferencias entre dos ejecuciones: {escenario: {p50, p95, queries}}
+    con el delta (actual - anterior) de cada métrica.
+    """
+    deltas = {}
+    for name, cur in current.get("results", {}).items():
+        prev = previous.get("results", {}).get(name)
+        if not prev:
+            continue
+        deltas[name] = {
+            "p50_ms": round(cur["latency_ms"]["p50"] - prev["latency_ms"]["p50"], 3),
+            "p95_ms": round(cur["latency_ms"]["p95"] - prev["latency_ms"]["p95"], 3),
+            "queries": cur["queries"]["median"] - prev["queries"]["median"],
+        }
+    return deltas
+
+
+def _timed_get(url, timeout):
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            response.read()
+            ok = response.status < 400
+    except (urllib.error.URLError, OSError):
+        ok = False
+    return (time.perf_counter() - start) * 1000, ok
+
+
+def run_http_load(url, requests=200, concurrency=16, timeout=30):
+    """
+    Lanza `requests` GET contra `url` con `concurrency` peticiones en vuelo
+    y devuelve latencias, errores y peticiones por segundo. Pensado para
+    comparar el mismo endpoint servido por gunicorn (WSGI) y por uvicorn
+    (ASGI), o /api/places/ frente a /api/async/places/.
+    """
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda _: _timed_get(url, timeout), range(requests)))
+    wall = time.perf_counter() - start
+
+    timings = [ms for ms, _ in results]
+    return {
+        "url": url,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": sum(1 for _, ok in results if not ok),
+        "rps": round(requests / wall, 2) if wall else None,
+        "latency_ms": summarize_latency(timings),
+    }
@@ -0,0 +1,78 @@
+"""
+Checks de sistema del proyecto (python manage.py check), registrados en
+CoreConfig.ready().
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Error, Tags, register
+
+from .ratelimit import parse_rate
+from .routers import replica_alias
+from .templatetags.maps import LEAFLET_INTEGRITY, _vendored
+
+
+def _shared_cache_errors(setting, purpose):
+    alias = getattr(settings, setting, "default")
+    if alias not in settings.CACHES:
+        return [Error(
+            f"{setting} apunta a la caché {alias!r}, que no está en CACHES.",
+            id="core.E001",
+        )]
+    if isinstance(caches[alias], (LocMemCache, DummyCache)):
+        return [Error(
+            f"La caché {alias!r} ({purpose}) no es compartida entre workers.",
+            hint="Configura CACHE_BACKEND con Redis, Memcached o DatabaseCache.",
+            id="core.E002",
+        )]
+    return []
+
+
+@register(Tags.caches)
+def check_shared_caches(app_configs, **kwargs):
+    """
+    Con DEBUG=False el límite de peticiones y el pin al primario necesitan
+    una caché compartida entre workers (Redis, Memcached o la de BD): con
+    una por proceso cada worker lleva su propio contador, y el pin que dejó
+    una escritura no se ve desde los demás.
+    """
+    if settings.DEBUG:
+        return []
+    errors = []
+    if getattr(settings, "RATE_LIMIT_ENABLED", True):
+        errors += _shared_cache_errors("RATE_LIMIT_CACHE", "límite de peticiones")
+    if replica_alias() is not None:
+        errors += _shared_cache_errors("REPLICA_PIN_CACHE", "pin de lecturas al primario")
+    return errors
+
+
+@register()
+def check_rate_limits(app_configs, **kwargs):
+    """Cada valor de RATE_LIMITS tiene que poder leerse con parse_rate."""
+    errors = []
+    for name, rate in getattr(settings, "RATE_LIMITS", {}).items():
+        try:
+            parse_rate(rate)
+        except ValueError as exc:
+            errors.append(Error(f"RATE_LIMITS[{name!r}]: {exc}", id="core.E003"))
+    return errors
+
+
+@register(Tags.staticfiles)
+def check_leaflet_vendored(app_configs, **kwargs):
+    """
+    Leaflet se sirve desde static/vendor/leaflet/; cargarlo desde unpkg
+    tiene que pedirse con LEAFLET_CDN_FALLBACK, no pasar sin avisar.
+    """
+    if getattr(settings, "LEAFLET_CDN_FALLBACK", False):
+        return []
+    return [
+        Error(
+            f"Falta static/vendor/leaflet/{name}.",
+            hint="Corre python manage.py vendor_leaflet o activa LEAFLET_CDN_FALLBACK.",
+            id="core.E004",
+        )
+        for name in LEAFLET_INTEGRITY
+        if not _vendored(name)
+    ]
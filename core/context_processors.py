@@ -0,0 +1,16 @@
+def unread_notifications(request):
+    """
+    Expone `unread_notifications` (contador desnormalizado del Profile) para el
+    badge del menú. Es un callable: solo se consulta si la plantilla lo usa.
+    """
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return {}
+
+    def count():
+        try:
+            return user.profile.unread_notifications
+        except Exception:
+            return 0
+
+    return {"unread_notifications": count}
@@ -0,0 +1,249 @@
+"""
+Pool de conexiones en proceso para workers con hilos (gthread) y ASGI.
+
+Con CONN_MAX_AGE cada hilo mantiene su propia conexión persistente, lo
+que con muchos hilos o con el ORM async (que abre conexiones en hilos
+de sync_to_async) termina en decenas de conexiones ociosas. El pool
+comparte un número acotado de conexiones entre todos los hilos del
+proceso: Django "cierra" la conexión al terminar cada petición y el
+backend la devuelve al pool en vez de cerrarla.
+"""
+import threading
+import time
+from collections import deque
+
+from django.db.utils import OperationalError
+
+from core import metrics
+
+
+class PoolTimeout(OperationalError):
+    """No se liberó ninguna conexión dentro del tiempo de espera."""
+
+
+class ConnectionPool:
+    """
+    Pool acotado de conexiones DB-API.
+
+    - max_size: máximo de conexiones abiertas (ocupadas + libres).
+    - timeout: segundos que se espera una conexión libre antes de fallar.
+    - max_idle: conexiones libres más antiguas que esto se descartan.
+    - check_after: si una conexión estuvo libre más de estos segundos, se
+      valida con SELECT 1 antes de entregarla.
+    """
+
+    def __init__(self, max_size=10, timeout=5.0, max_idle=300.0, check_after=30.0):
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.check_after = check_after
+
+        self._cond = threading.Condition()
+        self._idle = deque()          # (conexión, instante en que se liberó)
+        self._size = 0                # conexiones abiertas
+        self._in_use = 0
+
+        self.checkouts = 0
+        self.created = 0
+        self.discarded = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def checkout(self, factory):
+        """
+        Entrega una conexión libre o crea una nueva con `factory()` si hay
+        cupo. Si el pool está lleno, espera hasta `timeout` segundos.
+        """
+        start = time.monotonic()
+        waited = False
+        with self._cond:
+            while True:
+                conn = self._pop_idle()
+                if conn is not None:
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    conn = None
+                    break
+                remaining = self.timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    self.timeouts += 1
+                    metrics.incr("db_pool.timeouts")
+                    raise PoolTimeout(
+                        f"No hay conexiones libres en el pool (max_size={self.max_size})."
+                    )
+                waited = True
+                self._cond.wait(remaining)
+
+            self._in_use += 1
+            self.checkouts += 1
+            if waited:
+                elapsed = time.monotonic() - start
+                self.waits += 1
+                self.wait_time_total += elapsed
+                self.wait_time_max = max(self.wait_time_max, elapsed)
+
+        if conn is None:
+            try:
+                conn = factory()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._in_use -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self.created += 1
+        return conn
+
+    def release(self, conn, discard=False):
+        """Devuelve la conexión al pool (o la cierra si `discard`)."""
+        with self._cond:
+            self._in_use -= 1
+            if discard:
+                self._size -= 1
+                self.discarded += 1
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+        if discard:
+            _safe_close(conn)
+
+    def close_all(self):
+        """Cierra las conexiones libres (las ocupadas se cierran al liberarse)."""
+        with self._cond:
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            _safe_close(conn)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "max_size": self.max_size,
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "checkouts": self.checkouts,
+                "created": self.created,
+                "discarded": self.discarded,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "wait_time_total_ms": round(self.wait_time_total * 1000, 3),
+                "wait_time_max_ms": round(self.wait_time_max * 1000, 3),
+            }
+
+    def _pop_idle(self):
+        # Se llama con el lock tomado. Usa la conexión liberada más
+        # recientemente (LIFO) para que las antiguas expiren por max_idle.
+        now = time.monotonic()
+        while self._idle:
+            conn, released_at = self._idle.pop()
+            idle_for = now - released_at
+            if idle_for > self.max_idle or (
+                idle_for > self.check_after and not _is_usable(conn)
+            ):
+                self._size -= 1
+                self.discarded += 1
+                _safe_close(conn)
+                continue
+            return conn
+        return None
+
+
+def _is_usable(conn):
+    try:
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        finally:
+            cursor.close()
+    except Exception:
+        return False
+    return True
+
+
+def _safe_close(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _pool_key(alias, settings_dict):
+    # Incluye NAME para no mezclar la BD real con la de tests (test_<name>).
+    return (
+        alias,
+        str(settings_dict.get("NAME")),
+        settings_dict.get("HOST"),
+        settings_dict.get("PORT"),
+        settings_dict.get("USER"),
+    )
+
+
+def get_pool(alias, settings_dict):
+    """Pool asociado a un alias/BD, creado la primera vez con settings['POOL']."""
+    key = _pool_key(alias, settings_dict)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                options = settings_dict.get("POOL") or {}
+                pool = ConnectionPool(
+                    max_size=int(options.get("MAX_SIZE", 10)),
+                    timeout=float(options.get("TIMEOUT", 5)),
+                    max_idle=float(options.get("MAX_IDLE", 300)),
+                    check_after=float(options.get("CHECK_AFTER", 30)),
+                )
+                _pools[key] = pool
+    return pool
+
+
+def pool_stats():
+    """Estadísticas de todos los pools del proceso, por alias y BD."""
+    return {
+        f"{alias}:{name}": pool.stats()
+        for (alias, name, *_), pool in list(_pools.items())
+    }
+
+
+def close_all_pools():
+    for pool in list(_pools.values()):
+        pool.close_all()
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Mixin para DatabaseWrapper: pide las conexiones al pool y, al cerrar,
+    las devuelve en vez de cerrarlas. Si la conexión queda dentro de un
+    bloque atómico o tuvo errores, se descarta.
+    """
+
+    @property
+    def pool(self):
+        return get_pool(self.alias, self.settings_dict)
+
+    def get_new_connection(self, conn_params):
+        parent = super()
+        return self.pool.checkout(lambda: parent.get_new_connection(conn_params))
+
+    def _close(self):
+        if self.connection is None:
+            return
+        discard = self.in_atomic_block or self.errors_occurred
+        if not discard:
+            try:
+                if not self.get_autocommit():
+                    self.connection.rollback()
+            except Exception:
+                discard = True
+        self.pool.release(self.connection, discard=discard)
@@ -0,0 +1,206 @@
+"""
+Detección y fusión de lugares duplicados.
+
+Dos lugares se consideran el mismo si están a menos de DISTANCE_METERS y
+sus nombres normalizados se parecen (SIMILARITY). Para no comparar todos
+contra todos, cada lugar guarda su celda de una grilla de ~100 m
+(Place.grid_cell): un lugar solo se compara con los de su celda y las
+vecinas, así que el costo total es lineal en el número de lugares.
+
+"Metro Maipú" y "Estación Metro Maipú" coinciden porque la normalización
+quita tildes, mayúsculas, puntuación y palabras genéricas ("estación",
+"de", "la", ...).
+"""
+import math
+import re
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .aggregates import invalidate_place
+from .models import (
+    GRID_DEGREES, ChangeLog, Notification, NotificationArchive, Place, Profile, Report,
+    grid_cell, grid_index,
+)
+from .sync import record_changes
+
+DISTANCE_METERS = 75
+SIMILARITY = 0.8
+
+GENERIC_WORDS = {
+    "a", "al", "de", "del", "el", "en", "la", "las", "los", "y",
+    "estacion", "sector", "sucursal",
+}
+
+
+def normalize_name(name):
+    text = unicodedata.normalize("NFKD", name or "")
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    words = re.findall(r"[a-z0-9]+", text)
+    return tuple(sorted(w for w in words if w not in GENERIC_WORDS))
+
+
+def name_similarity(a, b):
+    """
+    Parecido entre dos nombres ya normalizados (tuplas de palabras), de 0 a
+    1: el mayor entre la similitud de texto y la proporción del nombre más
+    corto contenida en el otro (si tiene al menos dos palabras). Si los
+    números no coinciden ("Colegio 1" / "Colegio 2") son lugares distintos.
+    """
+    if not a or not b:
+        return 0.0
+    if {w for w in a if w.isdigit()} != {w for w in b if w.isdigit()}:
+        return 0.0
+    ratio = SequenceMatcher(None, " ".join(a), " ".join(b)).ratio()
+    shorter = min(len(a), len(b))
+    if shorter >= 2:
+        ratio = max(ratio, len(set(a) & set(b)) / shorter)
+    return ratio
+
+
+def distance_meters(lat1, lng1, lat2, lng2):
+    """Distancia haversine en metros."""
+    lat1, lng1, lat2, lng2 = map(math.radians, map(float, (lat1, lng1, lat2, lng2)))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * 6371000 * math.asin(math.sqrt(a))
+
+
+def _rings(distance):
+    # Celdas vecinas a revisar: el lado más corto de la celda es el de
+    # longitud (~93 m en Maipú).
+    side = GRID_DEGREES * 111320 * math.cos(math.radians(33.5))
+    return max(1, math.ceil(distance / side))
+
+
+def neighbor_cells(lat, lng, distance=DISTANCE_METERS):
+    i, j = grid_index(lat, lng)
+    r = _rings(distance)
+    return [f"{i + di}:{j + dj}" for di in range(-r, r + 1) for dj in range(-r, r + 1)]
+
+
+def is_duplicate(a, b, distance=DISTANCE_METERS, similarity=SIMILARITY):
+    """a y b son dicts con name/lat/lng (o con "key" ya normalizado)."""
+    if distance_meters(a["lat"], a["lng"], b["lat"], b["lng"]) > distance:
+        return False
+    key_a = a.get("key") or normalize_name(a["name"])
+    key_b = b.get("key") or normalize_name(b["name"])
+    return name_similarity(key_a, key_b) >= similarity
+
+
+def find_similar(name, lat, lng, exclude=None, distance=DISTANCE_METERS, similarity=SIMILARITY):
+    """Lugares existentes que parecen el mismo que (name, lat, lng)."""
+    candidates = Place.objects.filter(grid_cell__in=neighbor_cells(lat, lng, distance))
+    if exclude is not None:
+        candidates = candidates.exclude(pk=exclude)
+    target = {"name": name, "lat": lat, "lng": lng}
+    return [
+        place for place in candidates.order_by("id")
+        if is_duplicate(target, {"name": place.name, "lat": place.lat, "lng": place.lng},
+                        distance, similarity)
+    ]
+
+
+def find_duplicate_groups(distance=DISTANCE_METERS, similarity=SIMILARITY):
+    """
+    Grupos de ids de lugares duplicados entre sí, recorriendo la tabla una
+    vez. Cada lugar se compara solo con los ya vistos de su celda y las
+    vecinas; los pares se unen con union-find (A~B y B~C => {A, B, C}).
+    """
+    buckets = defaultdict(list)
+    parent = {}
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    rows = Place.objects.order_by("id").values("id", "name", "lat", "lng")
+    for row in rows.iterator(chunk_size=2000):
+        row["key"] = normalize_name(row["name"])
+        parent[row["id"]] = row["id"]
+        for cell in neighbor_cells(row["lat"], row["lng"], distance):
+            for other in buckets.get(cell, ()):
+                if is_duplicate(row, other, distance, similarity):
+                    parent[find(row["id"])] = find(other["id"])
+        buckets[grid_cell(row["lat"], row["lng"])].append(row)
+
+    groups = defaultdict(list)
+    for place_id in parent:
+        groups[find(place_id)].append(place_id)
+    return [sorted(ids) for ids in groups.values() if len(ids) > 1]
+
+
+def pick_canonical(place_ids):
+    """Se conserva el lugar con más reportes (a igualdad, el más antiguo)."""
+    counts = dict(
+        Report.objects.filter(place_id__in=place_ids)
+        .values_list("place_id").annotate(n=Count("id")).order_by()
+    )
+    return min(place_ids, key=lambda pk: (-counts.get(pk, 0), pk))
+
+
+def merge_places(keep_id, duplicate_ids):
+    """
+    Fusiona `duplicate_ids` en `keep_id` en una sola transacción: mueve
+    reportes, favoritos y notificaciones, junta las etiquetas y borra los
+    duplicados. Devuelve un dict con lo que se movió.
+    """
+    duplicate_ids = [pk for pk in duplicate_ids if pk != keep_id]
+    if not duplicate_ids:
+        return {"reports": 0, "favorites": 0, "notifications": 0}
+
+    with transaction.atomic():
+        keep = Place.objects.select_for_update().get(pk=keep_id)
+        duplicates = list(Place.objects.select_for_update().filter(pk__in=duplicate_ids))
+        now = timezone.now()
+
+        # También los eliminados (pendientes de purga): si no, el borrado
+        # del duplicado se los llevaría en cascada.
+        report_ids = list(
+            Report.all_objects.filter(place__in=duplicates).values_list("id", flat=True)
+        )
+        Report.all_objects.filter(pk__in=report_ids).update(place=keep, updated_at=now)
+
+        # Favoritos: quien seguía un duplicado pasa a seguir el conservado.
+        Through = Profile.favorite_places.through
+        followers = set(
+            Through.objects.filter(place__in=duplicates).values_list("profile_id", flat=True)
+        )
+        Through.objects.bulk_create(
+            [Through(profile_id=pid, place_id=keep.pk) for pid in followers],
+            ignore_conflicts=True,
+        )
+        Through.objects.filter(place__in=duplicates).delete()
+        Profile.objects.filter(pk__in=followers).update(
+            favorites_version=F("favorites_version") + 1
+        )
+
+        # Las no leídas movidas dejan de agruparse: el usuario podría tener
+        # ya una no leída del lugar conservado con la misma clave.
+        notifications = Notification.objects.filter(place__in=duplicates).update(
+            place=keep, coalesce_key=None
+        )
+        NotificationArchive.objects.filter(place_id__in=duplicate_ids).update(place_id=keep.pk)
+
+        tags = [t for t in keep.tags.split(",") if t]
+        for place in duplicates:
+            tags += [t for t in place.tags.split(",") if t and t not in tags]
+            if not keep.address and place.address:
+                keep.address = place.address
+        keep.tags = ",".join(tags)[:255]
+        keep.save()
+
+        record_changes([(ChangeLog.REPORT, pk, False) for pk in report_ids])
+        # El borrado deja los tombstones de los duplicados (core.signals).
+        Place.objects.filter(pk__in=duplicate_ids).delete()
+        invalidate_place(keep.pk)
+
+    return {"reports": len(report_ids), "favorites": len(followers), "notifications": notifications}
@@ -0,0 +1,148 @@
+"""
+Auditoría de planes de consulta de las vistas principales.
+
+Cada caso ejecuta una vista con el cliente de pruebas, captura sus
+consultas (SELECT/UPDATE/DELETE) y corre EXPLAIN sobre cada una. Se marca
+como problema cualquier recorrido completo de una tabla que el caso no
+declare como esperado (p.ej. el dashboard agrega sobre todos los reportes
+a propósito). Soporta SQLite (EXPLAIN QUERY PLAN) y MySQL (EXPLAIN, type=ALL).
+"""
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from .models import Place, Report
+
+# Backends con los que explain() sabe leer el plan.
+SUPPORTED_VENDORS = ("sqlite", "mysql")
+
+
+class Case:
+    def __init__(self, name, url, params=None, login=False, allow_scans=()):
+        self.name = name
+        self.url = url  # función ctx -> URL
+        self.params = params or {}
+        self.login = login
+        self.allow_scans = set(allow_scans)
+
+
+CASES = [
+    Case("places_view", lambda ctx: reverse("places")),
+    Case("places_api", lambda ctx: reverse("places_api"),
+         allow_scans={"core_place"}),  # Lista todos los lugares del mapa.
+    Case("place_search_api", lambda ctx: reverse("place_search_api"), {"q": "Ba"}),
+    Case("place_detail", lambda ctx: reverse("place_detail", args=[ctx.place.pk])),
+    Case("reports_view", lambda ctx: reverse("reports")),
+    Case("reports_view_rango", lambda ctx: reverse("reports"),
+         {"desde": "2024-01-01", "hasta": "2024-03-31"}),
+    Case("my_reports_view", lambda ctx: reverse("my_reports"), login=True),
+    Case("report_detail", lambda ctx: reverse("report_detail", args=[ctx.report.pk])),
+    Case("favorites_view", lambda ctx: reverse("favorites"), login=True),
+    Case("notifications_view", lambda ctx: reverse("notifications"), login=True),
+    Case("dashboard_view", lambda ctx: reverse("dashboard"), login=True,
+         allow_scans={"core_place", "core_report"}),  # Agregados globales.
+]
+
+
+class ExplainContext:
+    """El lugar con más reportes, su último reporte y el autor más activo."""
+
+    def __init__(self):
+        self.place = (
+            Place.objects.annotate(n=Count("report")).order_by("-n", "id").first()
+        )
+        self.report = (
+            Report.objects.filter(place=self.place).order_by("-created_at").first()
+        )
+        author = (
+            User.objects.annotate(n=Count("report")).order_by("-n", "id").first()
+        )
+        self.anon = Client()
+        self.client = Client()
+        self.client.force_login(author)
+
+
+def capture_statements(func):
+    """Ejecuta `func` y devuelve [(sql, params)] de lecturas y escrituras no INSERT."""
+    statements = []
+
+    def wrapper(execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE")):
+            statements.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        func()
+    return statements
+
+
+def explain(sql, params):
+    """
+    Devuelve (líneas del plan, tablas recorridas completas).
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            details = [row[3] for row in cursor.fetchall()]
+            # Recorrer un índice en orden sirve si el LIMIT corta antes; si
+            # además hay que ordenar/agrupar en un B-tree temporal, se leyó
+            # todo el índice y cuenta como recorrido completo.
+            sorts = any(d.startswith("USE TEMP B-TREE") for d in details)
+            scans = set()
+            for detail in details:
+                words = detail.split()
+                if (
+                    len(words) < 2
+                    or words[0] != "SCAN"
+                    or words[1].startswith("(")
+                    or words[1] == "CONSTANT"
+                ):
+                    continue
+                if "INDEX" not in detail or sorts:
+                    scans.add(words[1])
+            return details, scans
+
+        if connection.vendor == "mysql":
+            cursor.execute("EXPLAIN " + sql, params)
+            columns = [c[0] for c in cursor.description]
+            rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            details = [
+                f"{r.get('table')}: type={r.get('type')} key={r.get('key')} rows={r.get('rows')} {r.get('Extra') or ''}".strip()
+                for r in rows
+            ]
+            scans = {
+                r["table"] for r in rows
+                if r.get("table") and (
+                    r.get("type") == "ALL"
+                    or (r.get("type") == "index" and "filesort" in (r.get("Extra") or ""))
+                )
+            }
+            return details, scans
+
+    raise NotImplementedError(f"EXPLAIN no soportado para {connection.vendor}")
+
+
+def run_case(ctx, case):
+    """
+    Devuelve una lista de dicts {sql, plan, scans, unexpected} por consulta.
+    """
+    client = ctx.client if case.login else ctx.anon
+    url = case.url(ctx)
+
+    def request():
+        response = client.get(url, case.params)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{case.name}: {url} respondió {response.status_code}")
+
+    results = []
+    for sql, params in capture_statements(request):
+        plan, scans = explain(sql, params)
+        results.append({
+            "sql": sql,
+            "plan": plan,
+            "scans": sorted(scans),
+            "unexpected": sorted(scans - case.allow_scans),
+        })
+    return results
@@ -2,6 +2,7 @@ from django import forms
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
 from django.core.validators import RegexValidator
+from django.urls import reverse_lazy
 
 from .models import Report, Place, Profile
 
@@ -79,11 +80,37 @@ TAGS_CHOICES = [
 ]
 
 
+class PlaceSelect(forms.Select):
+    """
+    Select de lugares que solo renderiza la opción elegida. El resto se
+    busca por nombre contra /api/places/search/ desde el navegador, así el
+    formulario no carga un <option> por cada lugar de la BD.
+    """
+
+    def optgroups(self, name, value, attrs=None):
+        selected = [v for v in value if str(v).isdigit()]
+        choices = [("", "Busca un lugar por nombre…")]
+        if selected:
+            choices += [
+                (place.pk, str(place))
+                for place in self.choices.queryset.filter(pk__in=selected)
+            ]
+        all_choices, self.choices = self.choices, choices
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = all_choices
+
+
 class ReportForm(forms.ModelForm):
+    # Al validar, ModelChoiceField solo busca el id enviado (un get por PK).
     place = forms.ModelChoiceField(
-        queryset=Place.objects.all().order_by('name'),
+        queryset=Place.objects.all(),
         label="Lugar",
-        widget=forms.Select(attrs={'class': 'input'})
+        widget=PlaceSelect(attrs={
+            'class': 'input',
+            'data-search-url': reverse_lazy('place_search_api'),
+        })
     )
     rating = forms.ChoiceField(
         choices=[(i, str(i)) for i in range(1, 6)],
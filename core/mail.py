@@ -0,0 +1,176 @@
+"""
+Envío de correo a través de la bandeja de salida (OutboundEmail).
+
+Con EMAIL_BACKEND = 'core.mail.OutboxEmailBackend', send_mail() y
+compañía solo insertan filas en la BD: la petición no espera al servidor
+SMTP ni falla si está caído. El comando send_queued_mail llama a
+drain_outbox(), que reclama un lote, lo entrega fuera de toda transacción
+reutilizando una conexión del backend real (OUTBOX_DELIVERY_BACKEND) y
+anota el resultado de cada correo por separado.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.utils import timezone
+
+from . import metrics
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+
+class OutboxEmailBackend(BaseEmailBackend):
+    """Backend de correo que encola los mensajes en OutboundEmail."""
+
+    def send_messages(self, email_messages):
+        rows = []
+        for message in email_messages:
+            if not message.recipients():
+                continue
+            rows.append(OutboundEmail(
+                subject=message.subject,
+                body=message.body,
+                from_email=message.from_email or settings.DEFAULT_FROM_EMAIL,
+                to=list(message.to),
+                cc=list(message.cc),
+                bcc=list(message.bcc),
+                reply_to=list(message.reply_to),
+                headers=dict(message.extra_headers),
+                alternatives=[list(alt) for alt in getattr(message, "alternatives", [])],
+            ))
+        try:
+            OutboundEmail.objects.bulk_create(rows)
+        except Exception:
+            if not self.fail_silently:
+                raise
+            return 0
+        metrics.incr("outbox.queued", len(rows))
+        return len(rows)
+
+
+def to_message(email, connection=None):
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email,
+        to=email.to,
+        cc=email.cc,
+        bcc=email.bcc,
+        reply_to=email.reply_to,
+        headers=email.headers,
+        connection=connection,
+    )
+    for content, mimetype in email.alternatives:
+        message.attach_alternative(content, mimetype)
+    return message
+
+
+def backoff_delay(attempts):
+    """Espera antes del siguiente intento: base · 2^(intentos-1), con tope."""
+    base = getattr(settings, "OUTBOX_BACKOFF_SECONDS", 60)
+    cap = getattr(settings, "OUTBOX_BACKOFF_MAX_SECONDS", 6 * 3600)
+    return timedelta(seconds=min(cap, base * 2 ** max(0, attempts - 1)))
+
+
+def drain_outbox(batch_size=50, connection=None):
+    """
+    Entrega hasta `batch_size` correos pendientes cuyo turno ya llegó.
+    Devuelve un dict con cuántos se enviaron, fallaron y quedaron "dead".
+
+    Las filas se reclaman en una transacción corta (SELECT ... FOR UPDATE
+    SKIP LOCKED y paso a "sending" con un lease en next_attempt_at), así
+    varios workers pueden drenar a la vez sin enviar dos veces el mismo
+    correo. El envío SMTP ocurre fuera de toda transacción y cada fila se
+    actualiza por separado apenas se conoce su resultado. Si el worker muere
+    a mitad de lote, las filas vuelven a tomarse cuando vence el lease.
+    """
+    if connection is None:
+        connection = get_connection(
+            getattr(settings, "OUTBOX_DELIVERY_BACKEND", "django.core.mail.backends.smtp.EmailBackend")
+        )
+    counts = {"sent": 0, "failed": 0, "dead": 0}
+    batch = _claim_batch(batch_size)
+    if batch:
+        _deliver_batch(batch, connection, counts)
+
+    for key, value in counts.items():
+        metrics.incr(f"outbox.{key}", value)
+    return counts
+
+
+def _claim_batch(batch_size):
+    lease = timedelta(seconds=getattr(settings, "OUTBOX_LEASE_SECONDS", 900))
+    with transaction.atomic():
+        now = timezone.now()
+        batch = list(
+            OutboundEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status__in=[OutboundEmail.PENDING, OutboundEmail.SENDING],
+                    next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        if batch:
+            OutboundEmail.objects.filter(pk__in=[email.pk for email in batch]).update(
+                status=OutboundEmail.SENDING, next_attempt_at=now + lease
+            )
+    return batch
+
+
+def _deliver_batch(batch, connection, counts):
+    max_attempts = getattr(settings, "OUTBOX_MAX_ATTEMPTS", 6)
+    try:
+        connection.open()
+    except Exception as exc:
+        # Sin conexión no hay nada que intentar: todo el lote se reprograma.
+        logger.warning("No se pudo abrir la conexión de correo: %s", exc)
+        for email in batch:
+            _record_failure(email, exc, max_attempts, counts)
+        return
+
+    try:
+        for i, email in enumerate(batch):
+            try:
+                to_message(email, connection).send()
+            except Exception as exc:
+                _record_failure(email, exc, max_attempts, counts)
+                # La sesión puede haber quedado rota: se reabre una vez para
+                # el resto del lote. Cerrada, send() abriría y cerraría una
+                # sesión SMTP por cada correo que queda.
+                try:
+                    connection.close()
+                except Exception:
+                    pass
+                try:
+                    connection.open()
+                except Exception as exc:
+                    logger.warning("No se pudo reabrir la conexión de correo: %s", exc)
+                    for rest in batch[i + 1:]:
+                        _record_failure(rest, exc, max_attempts, counts)
+                    return
+            else:
+                email.status = OutboundEmail.SENT
+                email.attempts += 1
+                email.sent_at = timezone.now()
+                email.last_error = ""
+                email.save(update_fields=["status", "attempts", "sent_at", "last_error"])
+                counts["sent"] += 1
+    finally:
+        connection.close()
+
+
+def _record_failure(email, exc, max_attempts, counts):
+    email.attempts += 1
+    email.last_error = f"{type(exc).__name__}: {exc}"[:2000]
+    if email.attempts >= max_attempts:
+        email.status = OutboundEmail.DEAD
+        counts["dead"] += 1
+        logger.error("Correo %s descartado tras %s intentos: %s", email.pk, email.attempts, exc)
+    else:
+        email.status = OutboundEmail.PENDING
+        email.next_attempt_at = timezone.now() + backoff_delay(email.attempts)
+        counts["failed"] += 1
+    email.save(update_fields=["status", "attempts", "last_error", "next_attempt_at"])
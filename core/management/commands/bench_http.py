@@ -0,0 +1,63 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import bench
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide con peticiones concurrentes uno o más servidores ya levantados. "
+        "Ejemplo, WSGI frente a ASGI con los mismos datos:\n"
+        "  gunicorn -c gunicorn.conf.py -b :8000 config.wsgi\n"
+        "  uvicorn config.asgi:application --port 8001\n"
+        "  python manage.py bench_http --target wsgi=http://127.0.0.1:8000 "
+        "--target asgi=http://127.0.0.1:8001 "
+        "--path /api/places/ --path /api/async/places/"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--target", action="append", required=True,
+                            help="nombre=URL base del servidor (se puede repetir).")
+        parser.add_argument("--path", action="append",
+                            help="Ruta a medir (se puede repetir). Por defecto, "
+                                 "/api/places/ y /api/async/places/.")
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--timeout", type=float, default=30)
+        parser.add_argument("--output", default="bench_http_results.json",
+                            help="Archivo JSON de salida ('-' para stdout).")
+
+    def handle(self, *args, **opts):
+        targets = []
+        for raw in opts["target"]:
+            name, sep, base = raw.partition("=")
+            if not sep or not base:
+                raise CommandError(f"--target debe tener la forma nombre=URL: {raw}")
+            targets.append((name, base.rstrip("/")))
+        paths = opts["path"] or ["/api/places/", "/api/async/places/"]
+
+        results = {}
+        for name, base in targets:
+            for path in paths:
+                label = f"{name} {path}"
+                results[label] = bench.run_http_load(
+                    base + path,
+                    requests=opts["requests"],
+                    concurrency=opts["concurrency"],
+                    timeout=opts["timeout"],
+                )
+
+        payload = json.dumps({"results": results}, indent=2, ensure_ascii=False)
+        if opts["output"] == "-":
+            self.stdout.write(payload)
+        else:
+            with open(opts["output"], "w", encoding="utf-8") as fh:
+                fh.write(payload + "\n")
+
+        for label, res in results.items():
+            lat = res["latency_ms"]
+            self.stdout.write(
+                f"{label:<32} rps={res['rps']:>8.2f} p50={lat['p50']:>8.2f}ms "
+                f"p95={lat['p95']:>8.2f}ms errors={res['errors']}"
+            )
@@ -0,0 +1,102 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core import bench
+from core.seed import generate_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera datos sintéticos y mide latencia (percentiles) y número de "
+        "consultas de las vistas más usadas. Escribe los resultados en JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--places", type=int, default=200)
+        parser.add_argument("--reports", type=int, default=2000)
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--favorites-per-user", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=42,
+                            help="Semilla para que los datos sean reproducibles.")
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument("--scenario", action="append", choices=list(bench.SCENARIOS),
+                            help="Escenario a medir (se puede repetir). Por defecto, todos.")
+        parser.add_argument("--output", default="bench_results.json",
+                            help="Archivo JSON de salida ('-' para stdout).")
+        parser.add_argument("--compare",
+                            help="JSON de una ejecución anterior para mostrar diferencias.")
+        parser.add_argument("--use-existing-db", action="store_true",
+                            help="Usa la BD configurada (p.ej. ya poblada con "
+                                 "seed_incluimap) en vez de una BD de prueba temporal.")
+        parser.add_argument("--no-seed", action="store_true",
+                            help="No genera datos (útil junto a --use-existing-db).")
+
+    def handle(self, *args, **opts):
+        previous = None
+        if opts["compare"]:
+            try:
+                with open(opts["compare"], encoding="utf-8") as fh:
+                    previous = json.load(fh)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"No se pudo leer {opts['compare']}: {exc}")
+
+        old_name = None
+        if not opts["use_existing_db"]:
+            old_name = connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False
+            )
+
+        # Permite 'testserver' en ALLOWED_HOSTS y usa el backend de correo
+        # en memoria, para no enviar correos reales durante el fan-out.
+        try:
+            setup_test_environment()
+            own_environment = True
+        except RuntimeError:
+            # Ya estamos dentro del runner de tests.
+            own_environment = False
+
+        try:
+            if not opts["no_seed"]:
+                counts = generate_dataset(
+                    places=opts["places"],
+                    reports=opts["reports"],
+                    users=opts["users"],
+                    favorites_per_user=opts["favorites_per_user"],
+                    seed=opts["seed"],
+                )
+                self.stdout.write(f"Datos generados: {counts}")
+
+            data = bench.run_benchmarks(
+                names=opts["scenario"],
+                iterations=opts["iterations"],
+                warmup=opts["warmup"],
+            )
+        finally:
+            if own_environment:
+                teardown_test_environment()
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        data["meta"]["seed"] = opts["seed"]
+        if previous is not None:
+            data["diff"] = bench.compare(previous, data)
+
+        payload = json.dumps(data, indent=2, ensure_ascii=False)
+        if opts["output"] == "-":
+            self.stdout.write(payload)
+        else:
+            with open(opts["output"], "w", encoding="utf-8") as fh:
+                fh.write(payload + "\n")
+
+        for name, res in data["results"].items():
+            lat = res["latency_ms"]
+            self.stdout.write(
+                f"{name:<22} p50={lat['p50']:>8.2f}ms p95={lat['p95']:>8.2f}ms "
+                f"p99={lat['p99']:>8.2f}ms queries={res['queries']['median']}"
+            )
+        for name, delta in (data.get("diff") or {}).items():
+            self.stdout.write(f"  Δ {name}: {delta}")
@@ -0,0 +1,87 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core import explain
+from core.seed import generate_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Corre EXPLAIN sobre las consultas de las vistas principales contra "
+        "una BD poblada y falla si alguna recorre una tabla completa sin que "
+        "el caso lo espere."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--places", type=int, default=500)
+        parser.add_argument("--reports", type=int, default=5000)
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--case", action="append",
+                            choices=[c.name for c in explain.CASES],
+                            help="Caso a revisar (se puede repetir). Por defecto, todos.")
+        parser.add_argument("--use-existing-db", action="store_true",
+                            help="Usa la BD configurada (ya poblada) en vez de una temporal.")
+        parser.add_argument("--no-seed", action="store_true")
+
+    def handle(self, *args, **opts):
+        if connection.vendor not in explain.SUPPORTED_VENDORS:
+            raise CommandError(
+                f"Backend no soportado: {connection.vendor} "
+                f"(solo {', '.join(explain.SUPPORTED_VENDORS)})."
+            )
+        old_name = None
+        if not opts["use_existing_db"]:
+            old_name = connection.creation.create_test_db(
+                verbosity=0, autoclobber=True, serialize=False
+            )
+
+        try:
+            setup_test_environment()
+            own_environment = True
+        except RuntimeError:
+            own_environment = False
+
+        try:
+            if not opts["no_seed"]:
+                generate_dataset(
+                    places=opts["places"],
+                    reports=opts["reports"],
+                    users=opts["users"],
+                    favorites_per_user=5,
+                    seed=opts["seed"],
+                )
+            problems = self.audit(opts["case"], opts["verbosity"])
+        finally:
+            if own_environment:
+                teardown_test_environment()
+            if old_name is not None:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        if problems:
+            raise CommandError(
+                f"{len(problems)} consulta(s) con recorrido completo: " + ", ".join(problems)
+            )
+        self.stdout.write(self.style.SUCCESS("Sin recorridos completos inesperados."))
+
+    def audit(self, names, verbosity=1):
+        ctx = explain.ExplainContext()
+        cases = [c for c in explain.CASES if not names or c.name in names]
+        problems = []
+
+        for case in cases:
+            results = explain.run_case(ctx, case)
+            bad = [r for r in results if r["unexpected"]]
+            status = self.style.ERROR("SCAN") if bad else self.style.SUCCESS("ok")
+            self.stdout.write(f"{case.name:<22} {status} ({len(results)} consultas)")
+
+            for r in results:
+                if r["unexpected"] or verbosity >= 2:
+                    self.stdout.write(f"    {r['sql'][:160]}")
+                    for line in r["plan"]:
+                        self.stdout.write(f"      {line}")
+            if bad:
+                tables = sorted({t for r in bad for t in r["unexpected"]})
+                problems.append(f"{case.name} ({', '.join(tables)})")
+        return problems
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from core import dedupe
+from core.models import Place
+
+
+class Command(BaseCommand):
+    help = (
+        "Busca lugares duplicados (cercanos y con nombre parecido) usando la "
+        "grilla de Place.grid_cell. Con --merge fusiona cada grupo en el lugar "
+        "con más reportes, moviendo reportes, favoritos y notificaciones."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--distance", type=float, default=dedupe.DISTANCE_METERS,
+                            help="Distancia máxima en metros.")
+        parser.add_argument("--similarity", type=float, default=dedupe.SIMILARITY,
+                            help="Parecido mínimo de nombres, de 0 a 1.")
+        parser.add_argument("--merge", action="store_true",
+                            help="Fusiona los grupos encontrados (sin esto solo los lista).")
+
+    def handle(self, *args, **opts):
+        groups = dedupe.find_duplicate_groups(opts["distance"], opts["similarity"])
+        if not groups:
+            self.stdout.write(self.style.SUCCESS("No se encontraron duplicados."))
+            return
+
+        names = dict(
+            Place.objects.filter(pk__in=[pk for g in groups for pk in g]).values_list("id", "name")
+        )
+        for group in groups:
+            keep = dedupe.pick_canonical(group)
+            others = [pk for pk in group if pk != keep]
+            line = f"#{keep} {names[keep]} <- " + ", ".join(f"#{pk} {names[pk]}" for pk in others)
+            if opts["merge"]:
+                moved = dedupe.merge_places(keep, others)
+                line += (
+                    f"  (reportes={moved['reports']} favoritos={moved['favorites']} "
+                    f"notificaciones={moved['notifications']})"
+                )
+            self.stdout.write(line)
+
+        verb = "fusionados" if opts["merge"] else "encontrados (usa --merge para fusionar)"
+        self.stdout.write(f"{len(groups)} grupos {verb}.")
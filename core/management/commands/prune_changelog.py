@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.retention import prune_changelog, retention_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra las entradas del ChangeLog de /api/sync/ con más de --days días, "
+        "en lotes. Los clientes que quedaron más atrás reciben un snapshot con reset."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int,
+                            default=getattr(settings, "SYNC_RETENTION_DAYS", 30))
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--pause", type=float, default=0,
+                            help="Segundos de espera entre lotes para no saturar la BD.")
+
+    def handle(self, *args, **opts):
+        cutoff = retention_cutoff(opts["days"])
+        pruned = prune_changelog(cutoff, batch_size=opts["batch_size"], pause=opts["pause"])
+        self.stdout.write(f"{pruned} entradas del ChangeLog borradas (anteriores a {cutoff:%Y-%m-%d}).")
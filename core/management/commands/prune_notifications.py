@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Min
+from django.utils import timezone
+
+from core.models import NotificationArchive
+from core.retention import (
+    existing_partitions,
+    partition_statements,
+    prune_notifications,
+    retention_cutoff,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Archiva (o borra con --delete) las notificaciones leídas con más de "
+        "--days días, en lotes cortos. Con --partition mantiene el archivo "
+        "particionado por mes en MySQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int,
+                            default=getattr(settings, "NOTIFICATION_RETENTION_DAYS", 90))
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--pause", type=float, default=0,
+                            help="Segundos de espera entre lotes para no saturar la BD.")
+        parser.add_argument("--delete", action="store_true",
+                            help="Borra en vez de mover a NotificationArchive.")
+        parser.add_argument("--partition", action="store_true",
+                            help="(MySQL) Particiona el archivo por mes y crea los meses siguientes.")
+        parser.add_argument("--months-ahead", type=int, default=3)
+        parser.add_argument("--archive-months", type=int, default=None,
+                            help="(MySQL, con --partition) Elimina las particiones más antiguas "
+                                 "que estos meses.")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Con --partition, solo muestra el SQL.")
+
+    def handle(self, *args, **opts):
+        if opts["partition"]:
+            self.partition(opts)
+            if opts["dry_run"]:
+                return
+
+        cutoff = retention_cutoff(opts["days"])
+        moved = prune_notifications(
+            cutoff,
+            batch_size=opts["batch_size"],
+            archive=not opts["delete"],
+            pause=opts["pause"],
+        )
+        verb = "borradas" if opts["delete"] else "archivadas"
+        self.stdout.write(f"{moved} notificaciones {verb} (leídas antes de {cutoff:%Y-%m-%d}).")
+
+    def partition(self, opts):
+        if connection.vendor != "mysql":
+            raise CommandError("--partition solo está disponible en MySQL.")
+
+        oldest = NotificationArchive.objects.aggregate(m=Min("created_at"))["m"]
+        today = timezone.localdate()
+        statements = partition_statements(
+            existing_partitions(),
+            today,
+            months_ahead=opts["months_ahead"],
+            keep_months=opts["archive_months"],
+            first_month=timezone.localtime(oldest).date() if oldest else today,
+        )
+        for sql in statements:
+            self.stdout.write(sql)
+            if not opts["dry_run"]:
+                with connection.cursor() as cursor:
+                    cursor.execute(sql)
+        if not statements:
+            self.stdout.write("Particiones al día.")
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.tiles import get_cache
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra las teselas menos usadas del proxy hasta bajar del 90 % de "
+        "TILE_CACHE_MAX_BYTES. Pensado para cron (p. ej. cada hora)."
+    )
+
+    def handle(self, *args, **opts):
+        cache = get_cache()
+        evicted = cache.evict()
+        self.stdout.write(f"{evicted} teselas desalojadas de {cache.root}.")
@@ -0,0 +1,36 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.retention import purge_deleted_reports, retention_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra definitivamente los reportes eliminados hace más de --days días, "
+        "con sus comentarios y notificaciones, en lotes cortos. Con --loop queda "
+        "corriendo como worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int,
+                            default=getattr(settings, "REPORT_PURGE_AFTER_DAYS", 30))
+        parser.add_argument("--batch-size", type=int, default=200)
+        parser.add_argument("--pause", type=float, default=0,
+                            help="Segundos de espera entre lotes para no saturar la BD.")
+        parser.add_argument("--loop", action="store_true")
+        parser.add_argument("--interval", type=float, default=3600)
+
+    def handle(self, *args, **opts):
+        while True:
+            purged = purge_deleted_reports(
+                retention_cutoff(opts["days"]),
+                batch_size=opts["batch_size"],
+                pause=opts["pause"],
+            )
+            if purged or not opts["loop"]:
+                self.stdout.write(f"{purged} reportes purgados.")
+            if not opts["loop"]:
+                break
+            time.sleep(opts["interval"])
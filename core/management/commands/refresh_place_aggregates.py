@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.aggregates import refresh_queued_places
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula los agregados de los lugares encolados por las acciones en "
+        "bloque de moderación. Con --loop queda corriendo como worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument("--loop", action="store_true")
+        parser.add_argument("--interval", type=float, default=30)
+
+    def handle(self, *args, **opts):
+        while True:
+            total = 0
+            while True:
+                done = refresh_queued_places(batch_size=opts["batch_size"])
+                total += done
+                if done < opts["batch_size"]:
+                    break
+            if total or not opts["loop"]:
+                self.stdout.write(f"{total} lugares recalculados.")
+            if not opts["loop"]:
+                break
+            time.sleep(opts["interval"])
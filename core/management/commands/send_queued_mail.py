@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.mail import drain_outbox
+
+
+class Command(BaseCommand):
+    help = (
+        "Entrega los correos pendientes de la bandeja de salida (OutboundEmail) "
+        "con reintentos y backoff exponencial. Con --loop queda corriendo como worker."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--loop", action="store_true",
+                            help="No termina: vuelve a revisar la bandeja cada --interval segundos.")
+        parser.add_argument("--interval", type=float, default=5)
+
+    def handle(self, *args, **opts):
+        while True:
+            # Lotes seguidos mientras haya trabajo; así un backlog se vacía
+            # sin esperar el intervalo entre lotes.
+            while True:
+                counts = drain_outbox(batch_size=opts["batch_size"])
+                if any(counts.values()):
+                    self.stdout.write(
+                        f"enviados={counts['sent']} reintentar={counts['failed']} "
+                        f"descartados={counts['dead']}"
+                    )
+                if counts["sent"] + counts["failed"] + counts["dead"] < opts["batch_size"]:
+                    break
+            if not opts["loop"]:
+                break
+            time.sleep(opts["interval"])
@@ -0,0 +1,41 @@
+import base64
+import hashlib
+from pathlib import Path
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.templatetags.maps import (
+    LEAFLET_CDN, LEAFLET_IMAGES, LEAFLET_INTEGRITY, LEAFLET_VERSION,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        f"Descarga Leaflet {LEAFLET_VERSION} a static/vendor/leaflet/ (verificando "
+        "los hashes SRI) para servirlo desde nuestro dominio en vez de unpkg."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dest", default=str(Path(settings.STATICFILES_DIRS[0]) / "vendor" / "leaflet"))
+
+    def handle(self, *args, **opts):
+        dest = Path(opts["dest"])
+        (dest / "images").mkdir(parents=True, exist_ok=True)
+
+        files = list(LEAFLET_INTEGRITY) + [f"images/{name}" for name in LEAFLET_IMAGES]
+        with requests.Session() as http:
+            for name in files:
+                response = http.get(LEAFLET_CDN + name, timeout=30)
+                if response.status_code != 200:
+                    raise CommandError(f"{name}: HTTP {response.status_code}")
+                expected = LEAFLET_INTEGRITY.get(name)
+                if expected:
+                    digest = base64.b64encode(hashlib.sha256(response.content).digest()).decode()
+                    if f"sha256-{digest}" != expected:
+                        raise CommandError(f"{name}: el hash no coincide con el SRI publicado.")
+                (dest / name).write_bytes(response.content)
+                self.stdout.write(f"{name} ({len(response.content)} bytes)")
+
+        self.stdout.write(self.style.SUCCESS(f"Leaflet {LEAFLET_VERSION} en {dest}"))
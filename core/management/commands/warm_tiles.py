@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.tiles import get_cache, warm
+
+
+class Command(BaseCommand):
+    help = (
+        "Precarga en la caché del proxy las teselas de TILE_BOUNDS (Maipú) para "
+        "los zoom indicados, con varias descargas en paralelo, y después desaloja "
+        "las menos usadas si la caché pasó de TILE_CACHE_MAX_BYTES."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--layer", default=next(iter(settings.TILE_UPSTREAMS)))
+        parser.add_argument("--min-zoom", type=int, default=settings.TILE_MIN_ZOOM)
+        parser.add_argument("--max-zoom", type=int, default=15)
+        parser.add_argument("--workers", type=int, default=4)
+
+    def handle(self, *args, **opts):
+        if opts["layer"] not in settings.TILE_UPSTREAMS:
+            raise CommandError(f"Capa desconocida: {opts['layer']}")
+        counts = warm(
+            opts["layer"], settings.TILE_BOUNDS, range(opts["min_zoom"], opts["max_zoom"] + 1),
+            workers=opts["workers"],
+        )
+        evicted = get_cache().evict()
+        self.stdout.write(f"teselas ok={counts['ok']} error={counts['error']} desalojadas={evicted}")
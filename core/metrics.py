@@ -0,0 +1,45 @@
+"""
+Métricas simples en memoria del proceso (contadores y colectores).
+
+Cada worker de gunicorn/uvicorn lleva sus propias métricas; el endpoint
+/api/metrics/ devuelve las del proceso que atiende la petición.
+"""
+import threading
+from collections import defaultdict
+
+_lock = threading.Lock()
+_counters = defaultdict(int)
+_collectors = {}
+
+
+def incr(name, amount=1):
+    """Incrementa el contador `name` de forma segura entre hilos."""
+    with _lock:
+        _counters[name] += amount
+
+
+def get(name):
+    with _lock:
+        return _counters.get(name, 0)
+
+
+def register_collector(name, func):
+    """
+    Registra una función sin argumentos que devuelve un dict serializable;
+    se evalúa cada vez que se pide un snapshot.
+    """
+    _collectors[name] = func
+
+
+def snapshot():
+    with _lock:
+        data = {"counters": dict(_counters)}
+    for name, func in list(_collectors.items()):
+        data[name] = func()
+    return data
+
+
+def reset():
+    """Deja los contadores en cero (útil en tests)."""
+    with _lock:
+        _counters.clear()
@@ -0,0 +1,34 @@
+# Generated by Django 5.0.14 on 2026-10-19 03:55
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_unread(apps, schema_editor):
+    Profile = apps.get_model('core', 'Profile')
+    Notification = apps.get_model('core', 'Notification')
+    unread = (
+        Notification.objects
+        .filter(user_id=OuterRef('user_id'), is_read=False)
+        .values('user_id')
+        .annotate(n=Count('id'))
+        .values('n')
+    )
+    Profile.objects.update(unread_notifications=Coalesce(Subquery(unread), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_comment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='unread_notifications',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_unread, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.14 on 2026-10-19 05:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_profile_unread_notifications'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='favorites_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.0.14 on 2026-10-19 04:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_place_updated_at_report_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='place',
+            index=models.Index(fields=['name', 'id'], name='place_name_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.14 on 2026-10-19 04:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField(db_index=True)),
+                ('user_id', models.IntegerField()),
+                ('place_id', models.BigIntegerField(blank=True, null=True)),
+                ('report_id', models.BigIntegerField(blank=True, null=True)),
+                ('message', models.TextField()),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user_id', '-created_at'], name='notif_archive_user_idx')],
+            },
+        ),
+    ]
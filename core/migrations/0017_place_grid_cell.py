@@ -0,0 +1,39 @@
+# Generated by Django 5.0.14 on 2026-10-19 04:22
+
+import math
+
+from django.db import migrations, models
+
+GRID_DEGREES = 0.001
+
+
+def fill_grid_cell(apps, schema_editor):
+    # Copia de core.models.grid_cell al momento de esta migración.
+    Place = apps.get_model("core", "Place")
+    batch = []
+    for place in Place.objects.only("id", "lat", "lng").iterator(chunk_size=2000):
+        i = math.floor(float(place.lat) / GRID_DEGREES)
+        j = math.floor(float(place.lng) / GRID_DEGREES)
+        place.grid_cell = f"{i}:{j}"
+        batch.append(place)
+        if len(batch) >= 2000:
+            Place.objects.bulk_update(batch, ["grid_cell"])
+            batch = []
+    if batch:
+        Place.objects.bulk_update(batch, ["grid_cell"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_notification_coalescing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='grid_cell',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=32),
+        ),
+        migrations.RunPython(fill_grid_cell, migrations.RunPython.noop),
+    ]
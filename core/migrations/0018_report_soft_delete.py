@@ -0,0 +1,50 @@
+# Generated by Django 5.0.14 on 2026-10-19 04:24
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_place_grid_cell'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='report',
+            name='report_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='report',
+            name='report_author_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='report',
+            name='report_place_created_idx',
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='report',
+            name='deleted_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['deleted_at', '-created_at', '-id'], name='report_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['author', 'deleted_at', '-created_at'], name='report_author_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='report',
+            index=models.Index(fields=['place', 'deleted_at', '-created_at', '-id'], name='report_place_created_idx'),
+        ),
+    ]
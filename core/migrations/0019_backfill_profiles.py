@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.db import migrations
+
+
+def create_missing_profiles(apps, schema_editor):
+    # El receptor de post_save ya no crea perfiles al guardar usuarios
+    # existentes: se crean aquí, una vez, para los que no lo tengan.
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split("."))
+    Profile = apps.get_model("core", "Profile")
+    missing = (
+        User.objects.filter(profile__isnull=True)
+        .values_list("id", flat=True)
+        .iterator(chunk_size=2000)
+    )
+    batch = []
+    for user_id in missing:
+        batch.append(Profile(user_id=user_id))
+        if len(batch) >= 2000:
+            Profile.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        Profile.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_report_soft_delete'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(create_missing_profiles, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.0.14 on 2026-10-19 04:31
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_backfill_profiles'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Flag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('report', 'Reporte'), ('comment', 'Comentario')], max_length=10)),
+                ('reason', models.CharField(choices=[('spam', 'Spam o publicidad'), ('offensive', 'Lenguaje ofensivo'), ('false_info', 'Información falsa'), ('other', 'Otro motivo')], default='other', max_length=20)),
+                ('note', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Pendiente'), ('approved', 'Aprobado'), ('hidden', 'Ocultado'), ('deleted', 'Eliminado')], default='pending', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='PlaceRefresh',
+            fields=[
+                ('place', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='core.place')),
+                ('requested_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='comment',
+            name='comment_report_created_idx',
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='hidden_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['report', 'hidden_at', 'created_at'], name='comment_report_created_idx'),
+        ),
+        migrations.AddField(
+            model_name='flag',
+            name='comment',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='flags', to='core.comment'),
+        ),
+        migrations.AddField(
+            model_name='flag',
+            name='report',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='flags', to='core.report'),
+        ),
+        migrations.AddField(
+            model_name='flag',
+            name='reporter',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='flags', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='flag',
+            name='resolved_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='flag',
+            index=models.Index(fields=['status', 'id'], name='flag_queue_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='flag',
+            constraint=models.UniqueConstraint(fields=('reporter', 'report'), name='unique_flag_report'),
+        ),
+        migrations.AddConstraint(
+            model_name='flag',
+            constraint=models.UniqueConstraint(fields=('reporter', 'comment'), name='unique_flag_comment'),
+        ),
+    ]
@@ -1,10 +1,18 @@
-from django.db import models
+import math
+from collections import defaultdict
+
+from django.db import IntegrityError, models, transaction
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.db.models.signals import post_save
-from django.dispatch import receiver
-from django.core.mail import send_mail
+from django.dispatch import Signal, receiver
+from django.core.mail import send_mass_mail
 from django.conf import settings
+from django.utils import timezone
+
+from .pubsub import broker
 
 
 class Profile(models.Model):
@@ -13,6 +21,11 @@ class Profile(models.Model):
     - avatar: foto de perfil
     - bio: pequeña descripción opcional
     - favorite_places: lugares marcados como favoritos por el usuario
+    - unread_notifications: contador desnormalizado de notificaciones no
+      leídas (lo incrementa el fan-out y lo descuenta notifications_view),
+      para mostrar el badge del menú sin un COUNT(*) por página
+    - favorites_version: sube cada vez que cambia favorite_places; los
+      clientes la usan para saber si su copia local de favoritos sigue vigente
     """
     user = models.OneToOneField(
         User,
@@ -32,21 +45,39 @@ class Profile(models.Model):
         related_name='favorited_by'
     )
 
+    unread_notifications = models.PositiveIntegerField(default=0)
+    favorites_version = models.PositiveIntegerField(default=0)
+
     def __str__(self):
         return f"Perfil de {self.user.username}"
 
 
 @receiver(post_save, sender=User)
-def create_or_update_user_profile(sender, instance, created, **kwargs):
+def create_user_profile(sender, instance, created, raw=False, **kwargs):
     """
-    Cada vez que se crea un usuario nuevo, se crea su Profile.
-    Si ya existe, se asegura que esté guardado.
+    Crea el Profile una sola vez, al crear el usuario. Los usuarios
+    anteriores a esta regla lo recibieron en la migración 0019, así que
+    después basta con leer user.profile (el backend de autenticación lo
+    trae con select_related). Los demás guardados del usuario, como el
+    last_login de cada inicio de sesión, no tocan el perfil.
     """
-    if created:
+    if created and not raw:
         Profile.objects.create(user=instance)
-    else:
-        Profile.objects.get_or_create(user=instance)
-        instance.profile.save()
+
+
+# Lado (en grados) de las celdas de la grilla de Place.grid_cell: 0.001° son
+# ~111 m de latitud y ~93 m de longitud en Maipú.
+GRID_DEGREES = 0.001
+
+
+def grid_index(lat, lng):
+    return math.floor(float(lat) / GRID_DEGREES), math.floor(float(lng) / GRID_DEGREES)
+
+
+def grid_cell(lat, lng):
+    """Celda de la grilla que contiene (lat, lng), p.ej. '-33510:-70758'."""
+    i, j = grid_index(lat, lng)
+    return f"{i}:{j}"
 
 
 class Place(models.Model):
@@ -56,6 +87,19 @@ class Place(models.Model):
     lng = models.DecimalField(max_digits=9, decimal_places=6)
     tags = models.CharField(max_length=255, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Forma parte de la clave de caché de la tarjeta del lugar.
+    updated_at = models.DateTimeField(auto_now=True)
+    # Celda de la grilla (grid_cell); indexada para buscar lugares cercanos
+    # sin comparar contra todos (ver core/dedupe.py).
+    grid_cell = models.CharField(max_length=32, blank=True, editable=False, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Búsqueda por prefijo y paginación por (name, id) del selector de lugares.
+            models.Index(fields=["name", "id"], name="place_name_idx"),
+            # places_view: últimos lugares registrados.
+            models.Index(fields=["-created_at"], name="place_created_idx"),
+        ]
 
     def __str__(self):
         return self.name
@@ -101,21 +145,87 @@ class Place(models.Model):
         Asegura que siempre se ejecute la validación (clean) antes de guardar.
         """
         self.full_clean()
+        self.grid_cell = grid_cell(self.lat, self.lng)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"lat", "lng"} & set(update_fields):
+            kwargs["update_fields"] = set(update_fields) | {"grid_cell"}
         return super().save(*args, **kwargs)
 
 
+class ReportManager(models.Manager):
+    """Manager por defecto: solo reportes no eliminados."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
 class Report(models.Model):
     place = models.ForeignKey(Place, on_delete=models.CASCADE)
-    author = models.ForeignKey(User, on_delete=models.CASCADE)
+    # Sin índice propio: report_author_created_idx (y la restricción única
+    # con client_key) empiezan por author y le sirven a la FK.
+    author = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     description = models.TextField(blank=True)
     rating = models.PositiveSmallIntegerField(default=3)
     tags = models.CharField(max_length=255, blank=True)
     photo = models.ImageField(upload_to='reports/', blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Forma parte de la clave de caché de la tarjeta del reporte.
+    updated_at = models.DateTimeField(auto_now=True)
+    # Clave de idempotencia generada por el cliente (envíos offline en lote):
+    # reintentar el mismo envío no duplica el reporte.
+    client_key = models.CharField(max_length=64, null=True, blank=True)
+    # Borrado lógico: el reporte deja de verse de inmediato y el comando
+    # purge_deleted_reports lo borra de verdad (con sus comentarios y
+    # notificaciones) pasados REPORT_PURGE_AFTER_DAYS días.
+    deleted_at = models.DateTimeField(null=True, blank=True)
+    deleted_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+
+    objects = ReportManager()
+    # Incluye los eliminados (admin, purga, idempotencia del lote).
+    all_objects = models.Manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["author", "client_key"],
+                name="unique_report_client_key",
+            ),
+        ]
+        # deleted_at va justo después de la columna de igualdad: el
+        # "deleted_at IS NULL" del manager es parte de la búsqueda en el
+        # índice y el ORDER BY created_at ... LIMIT sigue sin ordenar aparte.
+        indexes = [
+            # reports_view: orden y rango por fecha. También sirve a la purga.
+            models.Index(fields=["deleted_at", "-created_at", "-id"], name="report_created_idx"),
+            # my_reports_view: reportes del autor por fecha.
+            models.Index(fields=["author", "deleted_at", "-created_at"], name="report_author_created_idx"),
+            # Detalle de lugar: sus reportes por fecha (paginación por cursor).
+            models.Index(fields=["place", "deleted_at", "-created_at", "-id"], name="report_place_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.place.name} — {self.rating}/5"
 
+    def soft_delete(self, by=None):
+        with transaction.atomic():
+            self.deleted_at = timezone.now()
+            self.deleted_by = by
+            self.save(update_fields=["deleted_at", "deleted_by", "updated_at"])
+            retract_report_notifications([self.pk])
+
+
+# Para anotar agregados de Place sin contar reportes eliminados, p.ej.
+# Count("report", filter=ALIVE_REPORTS).
+ALIVE_REPORTS = models.Q(report__deleted_at__isnull=True)
+
+
+# Se emite tras insertar reportes con bulk_create (que no dispara post_save),
+# con reports=[ids] y author=usuario, para que los receptores hagan su
+# trabajo una sola vez por lote.
+reports_bulk_created = Signal()
+
 
 class Notification(models.Model):
     """
@@ -140,16 +250,174 @@ class Notification(models.Model):
         blank=True
     )
     message = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Fecha del último evento: al agrupar un reporte nuevo se actualiza para
+    # que la notificación vuelva arriba de la lista.
+    created_at = models.DateTimeField(default=timezone.now)
     is_read = models.BooleanField(default=False)
+    # Reportes agrupados en esta notificación (ver deliver_notifications).
+    count = models.PositiveIntegerField(default=1)
+    # "<user_id>:<place_id>" mientras no se lee; NULL después. El índice
+    # único garantiza una sola no leída por usuario y lugar.
+    coalesce_key = models.CharField(max_length=64, null=True, blank=True, unique=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # notifications_view: lista del usuario por fecha.
+            models.Index(fields=["user", "-created_at"], name="notif_user_created_idx"),
+            # Marcar como leídas / contar no leídas / reenvío por Last-Event-ID.
+            models.Index(fields=["user", "is_read", "-created_at"], name="notif_user_unread_idx"),
+        ]
 
     def __str__(self):
         return f"Notificación para {self.user.username}: {self.message[:40]}..."
 
 
+class NotificationArchive(models.Model):
+    """
+    Notificaciones leídas y antiguas que el comando prune_notifications saca
+    de Notification (ver core/retention.py). Sin claves foráneas: en MySQL
+    la tabla se puede particionar por created_at (InnoDB no admite FK en
+    tablas particionadas) y las particiones viejas se eliminan enteras. Al
+    borrar un usuario se borran sus filas desde core.signals.
+    """
+    original_id = models.BigIntegerField(db_index=True)
+    user_id = models.IntegerField()
+    place_id = models.BigIntegerField(null=True, blank=True)
+    report_id = models.BigIntegerField(null=True, blank=True)
+    message = models.TextField()
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user_id", "-created_at"], name="notif_archive_user_idx"),
+        ]
+
+    def __str__(self):
+        return f"Notificación archivada {self.original_id} (usuario {self.user_id})"
+
+
+def notification_event(notification):
+    """Representación JSON de una notificación para el stream SSE."""
+    return {
+        "type": "notification",
+        "id": notification.pk,
+        "message": notification.message,
+        "place_id": notification.place_id,
+        "place": notification.place.name if notification.place_id else None,
+        "report_id": notification.report_id,
+        "count": notification.count,
+        "created_at": notification.created_at.isoformat(),
+    }
+
+
+def publish_notification(notification):
+    """Empuja la notificación a las conexiones SSE del usuario tras el commit."""
+    event = notification_event(notification)
+    transaction.on_commit(lambda: broker.publish(notification.user_id, event))
+
+
+def coalesce_key(user_id, place_id):
+    return f"{user_id}:{place_id}"
+
+
+def unread_user_ids(notifications):
+    """Usuarios con alguna no leída en `notifications` (un QuerySet)."""
+    return set(
+        notifications.filter(is_read=False)
+        .order_by().values_list("user_id", flat=True).distinct()
+    )
+
+
+def retract_report_notifications(report_ids):
+    """
+    Borra las notificaciones que apuntan a reportes eliminados (llevarían a
+    un 404) y recalcula el contador de no leídas de sus destinatarios. Se
+    llama en la misma transacción que el borrado lógico.
+    """
+    notifications = Notification.objects.filter(report_id__in=report_ids)
+    users = unread_user_ids(notifications)
+    notifications.delete()
+    recount_unread_notifications(users)
+
+
+def recount_unread_notifications(user_ids):
+    """
+    Recalcula Profile.unread_notifications de `user_ids` desde la tabla, en
+    un solo UPDATE. Para los borrados en bloque o en cascada, que se llevan
+    no leídas sin pasar por el descuento de notifications_view.
+    """
+    if not user_ids:
+        return
+    unread = (
+        Notification.objects.filter(user_id=OuterRef("user_id"), is_read=False)
+        .order_by().values("user_id").annotate(n=Count("pk")).values("n")
+    )
+    Profile.objects.filter(user_id__in=user_ids).update(
+        unread_notifications=Coalesce(Subquery(unread), 0)
+    )
+
+
+def deliver_notifications(items):
+    """
+    Crea o agrupa notificaciones. `items` es una lista de
+    (user, place, report, message, count). Si el usuario ya tiene una no
+    leída del mismo lugar, se actualiza esa fila (count, último reporte y
+    mensaje) en vez de insertar otra. Debe llamarse dentro de una
+    transacción; devuelve los ids de usuario con una notificación nueva,
+    que son los únicos cuyo contador de no leídas cambia.
+    """
+    keys = [
+        coalesce_key(user.pk, place.pk)
+        for user, place, report, message, count in items
+        if place is not None
+    ]
+    existing = {
+        n.coalesce_key: n
+        for n in Notification.objects.select_for_update()
+        .filter(coalesce_key__in=keys).select_related("place")
+    }
+
+    now = timezone.now()
+    inserted = []
+    updates = defaultdict(list)
+    for user, place, report, message, count in items:
+        key = coalesce_key(user.pk, place.pk) if place is not None else None
+        notification = existing.get(key)
+        if notification is None:
+            try:
+                with transaction.atomic():
+                    notification = Notification.objects.create(
+                        user=user, place=place, report=report, message=message,
+                        count=count, coalesce_key=key, created_at=now,
+                    )
+            except IntegrityError:
+                # Otra transacción insertó la misma clave entremedio.
+                notification = (
+                    Notification.objects.select_for_update()
+                    .select_related("place").get(coalesce_key=key)
+                )
+            else:
+                inserted.append(user.pk)
+                publish_notification(notification)
+                continue
+        notification.count += count
+        notification.report = report
+        notification.message = message
+        notification.created_at = now
+        updates[(report.pk if report else None, message, count)].append(notification)
+
+    # Un UPDATE por grupo; con un solo reporte, uno para todos los seguidores.
+    for (report_id, message, count), group in updates.items():
+        Notification.objects.filter(pk__in=[n.pk for n in group]).update(
+            count=F("count") + count, report_id=report_id, message=message, created_at=now,
+        )
+        for notification in group:
+            publish_notification(notification)
+    return inserted
+
+
 @receiver(post_save, sender=Report)
 def create_favorite_place_notifications(sender, instance, created, **kwargs):
     """
@@ -170,35 +438,129 @@ def create_favorite_place_notifications(sender, instance, created, **kwargs):
         .select_related("user")
     )
 
-    if not favorites_qs.exists():
+    profiles = list(favorites_qs)
+    if not profiles:
         return
 
-    for profile in favorites_qs:
-        user = profile.user
-        msg = f"Se ha creado un nuevo reporte en tu lugar favorito '{place.name}'."
-        if instance.description:
-            msg += f"\n\nDescripción: {instance.description[:200]}"
+    msg = f"Se ha creado un nuevo reporte en tu lugar favorito '{place.name}'."
+    if instance.description:
+        msg += f"\n\nDescripción: {instance.description[:200]}"
 
-        
-        Notification.objects.create(
-            user=user,
-            place=place,
-            report=instance,
-            message=msg,
+    # Notificaciones y contador de no leídas en la misma transacción, para que
+    # notifications_view nunca descuente filas que el contador aún no sumó.
+    with transaction.atomic():
+        inserted = deliver_notifications(
+            [(profile.user, place, instance, msg, 1) for profile in profiles]
+        )
+        Profile.objects.filter(user_id__in=inserted).update(
+            unread_notifications=F("unread_notifications") + 1
         )
 
-        
-        if user.email:
-            try:
-                send_mail(
-                    subject=f"Nuevo reporte en tu lugar favorito: {place.name}",
-                    message=msg,
-                    from_email=getattr(settings, "DEFAULT_FROM_EMAIL", None),
-                    recipient_list=[user.email],
-                    fail_silently=True,
-                )
-            except Exception:
-                pass
+    # Un solo send_mass_mail: con la bandeja de salida es un único INSERT.
+    send_mass_mail(
+        [
+            (
+                f"Nuevo reporte en tu lugar favorito: {place.name}",
+                msg,
+                getattr(settings, "DEFAULT_FROM_EMAIL", None),
+                [profile.user.email],
+            )
+            for profile in profiles
+            if profile.user.email
+        ],
+        fail_silently=True,
+    )
+
+
+@receiver(reports_bulk_created)
+def enqueue_batch_notifications(sender, reports, **kwargs):
+    """El fan-out de un lote corre una vez, cuando el lote ya está confirmado."""
+    report_ids = list(reports)
+    transaction.on_commit(lambda: notify_followers_of_reports(report_ids))
+
+
+def notify_followers_of_reports(report_ids):
+    """
+    Fan-out agregado para reportes creados en lote: cada seguidor recibe UNA
+    notificación que resume los reportes nuevos en sus lugares favoritos,
+    en vez de una por reporte.
+    """
+    reports = list(Report.objects.filter(pk__in=report_ids).select_related("place"))
+    if not reports:
+        return
+
+    by_place = defaultdict(list)
+    for report in reports:
+        by_place[report.place_id].append(report)
+    author_ids = {r.author_id for r in reports}
+
+    places_by_profile = defaultdict(list)
+    links = (
+        Profile.favorite_places.through.objects
+        .filter(place_id__in=by_place)
+        .exclude(profile__user_id__in=author_ids)
+        .values_list("profile_id", "place_id")
+    )
+    for profile_id, place_id in links:
+        places_by_profile[profile_id].append(place_id)
+    if not places_by_profile:
+        return
+
+    profiles = list(Profile.objects.filter(pk__in=places_by_profile).select_related("user"))
+    messages = {}
+    items = []
+
+    with transaction.atomic():
+        for profile in profiles:
+            place_ids = sorted(places_by_profile[profile.pk])
+            followed = [r for pid in place_ids for r in by_place[pid]]
+            first = followed[0]
+
+            if len(followed) == 1:
+                msg = f"Se ha creado un nuevo reporte en tu lugar favorito '{first.place.name}'."
+                if first.description:
+                    msg += f"\n\nDescripción: {first.description[:200]}"
+            else:
+                names = ", ".join(f"'{by_place[pid][0].place.name}'" for pid in place_ids)
+                msg = f"Hay {len(followed)} nuevos reportes en tus lugares favoritos: {names}."
+
+            # Solo se agrupa con la notificación previa si el lote es de un
+            # único lugar; un resumen de varios lugares va en su propia fila.
+            single_place = len(place_ids) == 1
+            items.append((
+                profile.user,
+                first.place if single_place else None,
+                followed[-1] if single_place else None,
+                msg,
+                len(followed),
+            ))
+            messages[profile.pk] = msg
+
+        inserted = deliver_notifications(items)
+        Profile.objects.filter(user_id__in=inserted).update(
+            unread_notifications=F("unread_notifications") + 1
+        )
+
+    send_mass_mail(
+        [
+            (
+                "Nuevos reportes en tus lugares favoritos",
+                messages[profile.pk],
+                getattr(settings, "DEFAULT_FROM_EMAIL", None),
+                [profile.user.email],
+            )
+            for profile in profiles
+            if profile.user.email
+        ],
+        fail_silently=True,
+    )
+
+
+class CommentManager(models.Manager):
+    """Manager por defecto: solo comentarios no ocultados por moderación."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(hidden_at__isnull=True)
 
 
 class Comment(models.Model):
@@ -214,9 +576,172 @@ class Comment(models.Model):
     )
     text = models.TextField(max_length=1000)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Ocultado desde la cola de moderación (core.moderation); se puede
+    # restaurar desde el admin vaciando el campo.
+    hidden_at = models.DateTimeField(null=True, blank=True)
+
+    objects = CommentManager()
+    all_objects = models.Manager()
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # report_detail: comentarios visibles del reporte en orden.
+            models.Index(fields=["report", "hidden_at", "created_at"], name="comment_report_created_idx"),
+        ]
 
     def __str__(self):
         return f'Comentario de {self.author} en {self.report}'
+
+
+class Flag(models.Model):
+    """
+    Denuncia de un usuario sobre un reporte o un comentario. Las pendientes
+    forman la cola de moderación (/moderacion/), que se recorre por id con
+    paginación por cursor; al resolverlas se guarda quién y cuándo.
+    Si el contenido se borra, la denuncia queda como historial (FK a NULL).
+    """
+    REPORT = "report"
+    COMMENT = "comment"
+    KIND_CHOICES = [(REPORT, "Reporte"), (COMMENT, "Comentario")]
+
+    SPAM = "spam"
+    OFFENSIVE = "offensive"
+    FALSE_INFO = "false_info"
+    OTHER = "other"
+    REASON_CHOICES = [
+        (SPAM, "Spam o publicidad"),
+        (OFFENSIVE, "Lenguaje ofensivo"),
+        (FALSE_INFO, "Información falsa"),
+        (OTHER, "Otro motivo"),
+    ]
+
+    PENDING = "pending"
+    APPROVED = "approved"
+    HIDDEN = "hidden"
+    DELETED = "deleted"
+    STATUS_CHOICES = [
+        (PENDING, "Pendiente"),
+        (APPROVED, "Aprobado"),
+        (HIDDEN, "Ocultado"),
+        (DELETED, "Eliminado"),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    report = models.ForeignKey(
+        Report, on_delete=models.SET_NULL, null=True, blank=True, related_name="flags"
+    )
+    comment = models.ForeignKey(
+        Comment, on_delete=models.SET_NULL, null=True, blank=True, related_name="flags"
+    )
+    reporter = models.ForeignKey(User, on_delete=models.CASCADE, related_name="flags")
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES, default=OTHER)
+    note = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    created_at = models.DateTimeField(auto_now_add=True)
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    resolved_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+
+    class Meta:
+        constraints = [
+            # Una denuncia por usuario y contenido.
+            models.UniqueConstraint(fields=["reporter", "report"], name="unique_flag_report"),
+            models.UniqueConstraint(fields=["reporter", "comment"], name="unique_flag_comment"),
+        ]
+        indexes = [
+            # Cola de moderación: pendientes por id (cursor).
+            models.Index(fields=["status", "id"], name="flag_queue_idx"),
+        ]
+
+    def __str__(self):
+        return f"Denuncia #{self.pk} ({self.get_kind_display()}, {self.get_status_display()})"
+
+
+class PlaceRefresh(models.Model):
+    """
+    Lugares cuyos agregados hay que recalcular. Las acciones en bloque de
+    moderación solo insertan aquí; el comando refresh_place_aggregates
+    recalcula el resumen cacheado, avisa a /api/sync/ y borra la fila.
+    """
+    place = models.OneToOneField(Place, on_delete=models.CASCADE, primary_key=True)
+    requested_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Recalcular lugar {self.place_id}"
+
+
+class ChangeLog(models.Model):
+    """
+    Registro append-only de cambios en lugares y reportes para la
+    sincronización offline (/api/sync/). `seq` crece de forma monótona; un
+    cliente guarda el último seq que aplicó y pide solo lo posterior. Las
+    eliminaciones quedan como tombstones (deleted=True).
+    """
+    PLACE = "place"
+    REPORT = "report"
+    KIND_CHOICES = [(PLACE, "Lugar"), (REPORT, "Reporte")]
+
+    seq = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    deleted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["seq"]
+
+    def __str__(self):
+        op = "delete" if self.deleted else "upsert"
+        return f"#{self.seq} {op} {self.kind}:{self.object_id}"
+
+
+class OutboundEmail(models.Model):
+    """
+    Bandeja de salida de correos. El backend core.mail.OutboxEmailBackend
+    guarda aquí todo lo que la app envía (contacto, notificaciones,
+    recuperación de contraseña) y el comando send_queued_mail lo entrega
+    por SMTP, con reintentos y backoff exponencial. Tras
+    OUTBOX_MAX_ATTEMPTS fallos el correo queda como "dead" para revisarlo.
+
+    Mientras un worker lo entrega el correo está en "sending" y
+    next_attempt_at marca el fin del lease (OUTBOX_LEASE_SECONDS): si el
+    worker muere, al vencer vuelve a tomarse.
+    """
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    DEAD = "dead"
+    STATUS_CHOICES = [
+        (PENDING, "Pendiente"),
+        (SENDING, "Enviando"),
+        (SENT, "Enviado"),
+        (DEAD, "Fallido"),
+    ]
+
+    subject = models.CharField(max_length=998)
+    body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list, blank=True)
+    bcc = models.JSONField(default=list, blank=True)
+    reply_to = models.JSONField(default=list, blank=True)
+    headers = models.JSONField(default=dict, blank=True)
+    # [[contenido, mimetype], ...], p.ej. la versión HTML.
+    alternatives = models.JSONField(default=list, blank=True)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="outbox_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} → {', '.join(self.to)} ({self.status})"
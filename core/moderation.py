@@ -0,0 +1,151 @@
+"""
+Moderación de reportes y comentarios.
+
+Cualquier usuario puede denunciar (Flag) un reporte o un comentario. El
+staff revisa las denuncias pendientes en /moderacion/ y las resuelve en
+bloque:
+
+- approve: el contenido se queda y las denuncias se cierran;
+- hide: el reporte pasa a borrado lógico (Report.deleted_at) y el
+  comentario a Comment.hidden_at; se pueden restaurar desde el admin;
+- delete: el contenido se borra de verdad.
+
+Una acción cierra todas las denuncias pendientes del mismo contenido, no
+solo las seleccionadas, y se ejecuta como unas pocas consultas sobre
+conjuntos (UPDATE/DELETE ... WHERE id IN (...)) sin cargar cada objeto ni
+disparar señales: lo que harían la cascada y los receptores (denuncias en
+NULL, tombstones de sync, contador de no leídas) se hace aquí a mano.
+El resumen cacheado de los lugares afectados se borra al confirmar, y el
+recálculo se encola en PlaceRefresh para el comando
+refresh_place_aggregates (ver core.aggregates.refresh_queued_places).
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .aggregates import invalidate_places
+from .models import (
+    ChangeLog, Comment, Flag, PlaceRefresh, Report, retract_report_notifications,
+)
+from .retention import delete_stored_files
+from .sync import record_changes
+
+QUEUE_PAGE_SIZE = 50
+
+ACTIONS = {
+    "approve": Flag.APPROVED,
+    "hide": Flag.HIDDEN,
+    "delete": Flag.DELETED,
+}
+
+
+def flag_content(reporter, report=None, comment=None, reason=Flag.OTHER, note=""):
+    """
+    Denuncia un reporte o un comentario. Devuelve (flag, created): si el
+    usuario ya lo había denunciado se devuelve la denuncia existente.
+    """
+    if comment is not None:
+        kind, target = Flag.COMMENT, {"comment": comment}
+    else:
+        kind, target = Flag.REPORT, {"report": report}
+    try:
+        with transaction.atomic():
+            flag = Flag.objects.create(
+                kind=kind, reporter=reporter, reason=reason, note=note[:255], **target
+            )
+        return flag, True
+    except IntegrityError:
+        return Flag.objects.get(reporter=reporter, **target), False
+
+
+def pending_queue(after=None, limit=QUEUE_PAGE_SIZE):
+    """
+    Denuncias pendientes, de la más antigua a la más nueva, con id mayor a
+    `after`. Devuelve (denuncias, siguiente_after o None); sin OFFSET ni
+    COUNT, así que cada página cuesta lo mismo aunque la cola sea larga.
+    """
+    qs = (
+        Flag.objects.filter(status=Flag.PENDING)
+        .select_related(
+            "reporter", "report__place", "report__author",
+            "comment__author", "comment__report__place",
+        )
+        .order_by("id")
+    )
+    if after:
+        qs = qs.filter(id__gt=after)
+    flags = list(qs[:limit + 1])
+    next_after = flags[limit - 1].pk if len(flags) > limit else None
+    return flags[:limit], next_after
+
+
+def apply_action(action, flag_ids, moderator):
+    """
+    Resuelve las denuncias `flag_ids` con `action` (approve, hide o delete)
+    en una transacción. Devuelve un dict con cuántas denuncias se cerraron
+    y cuántos reportes y comentarios se tocaron.
+    """
+    status = ACTIONS[action]
+    now = timezone.now()
+
+    with transaction.atomic():
+        targets = list(
+            Flag.objects.filter(pk__in=flag_ids, status=Flag.PENDING)
+            .values_list("kind", "report_id", "comment_id",
+                         "report__place_id", "comment__report__place_id")
+        )
+        report_ids = {r for kind, r, _, _, _ in targets if kind == Flag.REPORT and r}
+        comment_ids = {c for kind, _, c, _, _ in targets if kind == Flag.COMMENT and c}
+        place_ids = {p1 or p2 for _, _, _, p1, p2 in targets if p1 or p2}
+
+        # Antes de borrar: el borrado deja report/comment en NULL.
+        content = Q(report_id__in=report_ids) | Q(comment_id__in=comment_ids)
+        if action == "delete":
+            # Los comentarios de un reporte borrado se van con él.
+            content |= Q(comment__report_id__in=report_ids)
+        closed = Flag.objects.filter(content, status=Flag.PENDING).update(
+            status=status, resolved_at=now, resolved_by=moderator
+        )
+
+        if action != "approve":
+            # Igual que Report.soft_delete: sin notificaciones que lleven a
+            # un 404 ni no leídas contadas de más.
+            retract_report_notifications(report_ids)
+
+        if action == "hide":
+            Report.objects.filter(pk__in=report_ids).update(
+                deleted_at=now, deleted_by=moderator, updated_at=now
+            )
+            Comment.objects.filter(pk__in=comment_ids).update(hidden_at=now)
+            record_changes([(ChangeLog.REPORT, pk, True) for pk in report_ids])
+        elif action == "delete":
+            photos = [
+                name for name in
+                Report.all_objects.filter(pk__in=report_ids).exclude(photo="")
+                .values_list("photo", flat=True)
+                if name
+            ]
+            # La cascada a mano: los comentarios de los reportes borrados
+            # también se van, y las denuncias quedan como historial en NULL.
+            # Las notificaciones ya las quitó retract_report_notifications.
+            comments = Comment.all_objects.filter(
+                Q(pk__in=comment_ids) | Q(report_id__in=report_ids)
+            )
+            Flag.objects.filter(comment__in=comments).update(comment=None)
+            Flag.objects.filter(report_id__in=report_ids).update(report=None)
+            # _raw_delete: un DELETE sin el Collector, que traería cada fila
+            # y dispararía post_delete por objeto.
+            comments._raw_delete(comments.db)
+            reports = Report.all_objects.filter(pk__in=report_ids)
+            reports._raw_delete(reports.db)
+            record_changes([(ChangeLog.REPORT, pk, True) for pk in report_ids])
+            if photos:
+                transaction.on_commit(lambda: delete_stored_files(photos))
+
+        if action != "approve" and place_ids:
+            invalidate_places(place_ids)
+            PlaceRefresh.objects.bulk_create(
+                [PlaceRefresh(place_id=pk) for pk in place_ids], ignore_conflicts=True
+            )
+
+    return {"flags": closed, "reports": len(report_ids), "comments": len(comment_ids)}
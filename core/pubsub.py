@@ -0,0 +1,117 @@
+"""
+Pub/sub en memoria del proceso para empujar eventos a las conexiones SSE.
+
+Los publicadores (el fan-out de notificaciones) corren en hilos síncronos;
+los suscriptores son generadores async dentro del event loop de ASGI. Por
+eso cada suscripción guarda su loop y los eventos se entregan con
+call_soon_threadsafe.
+
+Alcance: publish solo llega a los clientes conectados al mismo proceso,
+y las notificaciones se escriben sobre todo en los workers WSGI. Para lo
+que pasa en otros procesos, run_relay deja una sola tarea por proceso que
+consulta la base de datos cada SSE_POLL_SECONDS por todos los usuarios
+suscritos aquí y los despierta por el broker. Cada stream solo espera su
+cola: una conexión ociosa no hace consultas (ver
+core.views.notifications_stream).
+"""
+import asyncio
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+
+class Broker:
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)  # user_id -> {(loop, queue)}
+        self._relay = None
+
+    @contextmanager
+    def subscribe(self, user_id):
+        """
+        Suscribe al usuario mientras dure el bloque `with` y entrega una
+        asyncio.Queue con los eventos. Debe usarse dentro de un event loop.
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        entry = (loop, queue)
+        with self._lock:
+            self._subscribers[user_id].add(entry)
+        try:
+            yield queue
+        finally:
+            with self._lock:
+                subs = self._subscribers.get(user_id)
+                if subs is not None:
+                    subs.discard(entry)
+                    if not subs:
+                        del self._subscribers[user_id]
+                relay = self._relay if not self._subscribers else None
+            if relay is not None and relay.get_loop() is loop:
+                relay.cancel()
+
+    def publish(self, user_id, event):
+        """Entrega `event` a todas las suscripciones del usuario en este proceso."""
+        with self._lock:
+            targets = list(self._subscribers.get(user_id, ()))
+        for loop, queue in targets:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, event)
+            except RuntimeError:
+                # El loop ya se cerró; la suscripción se limpia sola.
+                pass
+        return len(targets)
+
+    def run_relay(self, make_poll, interval):
+        """
+        Arranca en el loop actual, si no está corriendo, la tarea que cada
+        `interval` segundos llama a `poll(user_ids)` con los usuarios
+        suscritos en este proceso y les publica {"type": "wake"} a los que
+        devuelva. `make_poll()` crea un `poll` nuevo (con su propio estado)
+        cada vez que la tarea arranca; la tarea termina con el último
+        suscriptor.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            relay = self._relay
+            if relay is not None and not relay.done() and relay.get_loop() is loop:
+                return
+            self._relay = loop.create_task(self._relay_loop(make_poll(), interval))
+
+    async def _relay_loop(self, poll, interval):
+        while True:
+            await asyncio.sleep(interval)
+            with self._lock:
+                user_ids = list(self._subscribers)
+            if not user_ids:
+                return
+            try:
+                woken = await poll(user_ids)
+            except Exception:
+                # Un fallo de la BD no debe matar el relay: se reintenta.
+                logger.exception("Falló la consulta del relay de notificaciones")
+                continue
+            for user_id in woken:
+                self.publish(user_id, {"type": "wake"})
+
+    def subscriber_count(self, user_id=None):
+        with self._lock:
+            if user_id is not None:
+                return len(self._subscribers.get(user_id, ()))
+            return sum(len(s) for s in self._subscribers.values())
+
+
+def _offer(queue, event):
+    # Un cliente lento no debe frenar al resto: si su cola está llena se
+    # descarta el evento (al reconectar lo recupera con Last-Event-ID).
+    try:
+        queue.put_nowait(event)
+    except asyncio.QueueFull:
+        pass
+
+
+broker = Broker()
@@ -0,0 +1,152 @@
+"""
+Límite de peticiones para los endpoints que escriben (reportes,
+comentarios, contacto).
+
+Se configura por nombre de URL en settings.RATE_LIMITS, p.ej.
+{"report": "10/m"}: como mucho 10 POST por minuto por usuario (o por IP
+si no hay sesión). Los contadores viven en la caché RATE_LIMIT_CACHE y se
+incrementan con incr(), que es atómico en Redis y Memcached. Con DEBUG=False
+esa caché tiene que ser compartida entre workers para que el límite sea
+global: core.checks rechaza LocMemCache y valida RATE_LIMITS al arrancar.
+
+En vez de un token bucket clásico (que necesita leer y escribir el estado
+de forma atómica, algo que la API de caché de Django no ofrece) se usa una
+ventana deslizante aproximada: el contador de la ventana actual más la
+parte proporcional de la anterior. Se comporta igual que un bucket de
+capacidad N que se rellena a N por periodo, sin ráfagas al cambiar de
+ventana. Las peticiones rechazadas no suman: un cliente que insiste
+durante el bloqueo no alarga su propia espera.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, JsonResponse
+
+from . import metrics
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """'10/m' -> (10, 60). ValueError si el formato no es válido."""
+    count, _, period = str(rate).partition("/")
+    period = period.strip().lower()
+    try:
+        count = int(count)
+    except ValueError:
+        count = 0
+    if count < 1 or not period or period[0] not in PERIODS:
+        raise ValueError(
+            f"Límite inválido {rate!r}: se espera 'cantidad/periodo' con "
+            f"cantidad >= 1 y periodo s, m, h o d."
+        )
+    return count, PERIODS[period[0]]
+
+
+def get_cache():
+    return caches[getattr(settings, "RATE_LIMIT_CACHE", "default")]
+
+
+def client_ident(request):
+    """Usuario autenticado o, si no hay sesión, la IP de origen."""
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return f"user:{user.pk}"
+    ip = request.META.get("REMOTE_ADDR", "")
+    if getattr(settings, "RATE_LIMIT_TRUST_X_FORWARDED_FOR", False):
+        forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "")
+        if forwarded:
+            ip = forwarded.split(",")[0].strip()
+    return f"ip:{ip}"
+
+
+def _incr(cache, key, timeout):
+    # add() crea la clave solo si no existe; incr() es el paso atómico.
+    cache.add(key, 0, timeout)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # La clave expiró entre add() e incr().
+        cache.add(key, 1, timeout)
+        return 1
+
+
+def hit(scope, ident, limit, period, now=None):
+    """
+    Registra una petición y devuelve (permitida, segundos_para_reintentar).
+    Solo se cuenta si se permite.
+    """
+    now = time.time() if now is None else now
+    window = int(now // period)
+    elapsed = (now % period) / period
+
+    cache = get_cache()
+    base = f"ratelimit:{scope}:{ident}"
+    key, previous_key = f"{base}:{window}", f"{base}:{window - 1}"
+    values = cache.get_many([key, previous_key])
+    current = values.get(key, 0)
+    previous = values.get(previous_key, 0)
+
+    if previous * (1 - elapsed) + current + 1 <= limit:
+        counted = _incr(cache, key, period * 2)
+        if previous * (1 - elapsed) + counted <= limit:
+            return True, 0
+        # Otra petición concurrente se llevó el último cupo: se devuelve.
+        try:
+            cache.decr(key)
+        except ValueError:
+            pass
+        current = counted - 1
+
+    if current + 1 > limit or not previous:
+        retry_after = period * (1 - elapsed)
+    else:
+        # La ventana anterior deja de pesar lo suficiente cuando
+        # previous * (1 - f) + current + 1 <= limit.
+        needed = 1 - (limit - current - 1) / previous
+        retry_after = (needed - elapsed) * period
+    return False, max(1, math.ceil(retry_after))
+
+
+class RateLimitMiddleware:
+    """
+    Aplica settings.RATE_LIMITS a las vistas por su nombre de URL. Solo
+    limita los métodos de RATE_LIMIT_METHODS (por defecto, POST). Al
+    superar el límite responde 429 con Retry-After y suma el rechazo a
+    las métricas (ratelimit.throttled y ratelimit.throttled.<url_name>).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not getattr(settings, "RATE_LIMIT_ENABLED", True):
+            return None
+        if request.method not in getattr(settings, "RATE_LIMIT_METHODS", ("POST",)):
+            return None
+
+        match = request.resolver_match
+        rate = getattr(settings, "RATE_LIMITS", {}).get(match.url_name if match else None)
+        if not rate:
+            return None
+
+        limit, period = parse_rate(rate)
+        allowed, retry_after = hit(match.url_name, client_ident(request), limit, period)
+        if allowed:
+            return None
+
+        metrics.incr("ratelimit.throttled")
+        metrics.incr(f"ratelimit.throttled.{match.url_name}")
+
+        message = "Demasiadas solicitudes. Intenta nuevamente en unos momentos."
+        if request.path.startswith("/api/"):
+            response = JsonResponse({"error": message}, status=429)
+        else:
+            response = HttpResponse(message, status=429, content_type="text/plain; charset=utf-8")
+        response["Retry-After"] = str(retry_after)
+        return response
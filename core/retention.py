@@ -0,0 +1,250 @@
+"""
+Retención de notificaciones y del ChangeLog, y purga de reportes eliminados.
+
+Notification crece con cada reporte (una fila por seguidor) y la bandeja
+solo muestra las últimas 50, así que las leídas con más de
+NOTIFICATION_RETENTION_DAYS días se archivan en NotificationArchive o se
+borran. Se procesan en lotes cortos por id, cada uno en su propia
+transacción: ningún lock dura más que un lote y el comando puede correr
+con la app en uso.
+
+En MySQL la tabla de archivo se puede particionar por mes (RANGE sobre
+created_at): las particiones futuras se crean por adelantado y las que
+quedan fuera de la retención del archivo se eliminan con DROP PARTITION,
+que es instantáneo comparado con un DELETE.
+
+Los reportes se eliminan con borrado lógico (Report.deleted_at) y
+purge_deleted_reports los borra de verdad pasados REPORT_PURGE_AFTER_DAYS
+días, también en lotes.
+
+ChangeLog solo sirve a los clientes de /api/sync/ que siguen el delta; las
+entradas con más de SYNC_RETENTION_DAYS días se borran con prune_changelog
+y un cliente que quedó más atrás recibe un snapshot con reset.
+"""
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import (
+    ChangeLog, Notification, NotificationArchive, Report, recount_unread_notifications, unread_user_ids,
+)
+
+ARCHIVE_FIELDS = ("id", "user_id", "place_id", "report_id", "message", "created_at")
+
+
+def retention_cutoff(days=None, now=None):
+    days = days if days is not None else getattr(settings, "NOTIFICATION_RETENTION_DAYS", 90)
+    return (now or timezone.now()) - timedelta(days=days)
+
+
+def prune_notifications(cutoff, batch_size=1000, archive=True, pause=0):
+    """
+    Archiva (o borra, con archive=False) las notificaciones leídas creadas
+    antes de `cutoff`. Devuelve cuántas se movieron.
+
+    Se avanza por id en vez de repetir la misma consulta: las no leídas
+    antiguas no se vuelven a leer en cada lote.
+    """
+    total = 0
+    last_id = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                Notification.objects
+                .filter(pk__gt=last_id, is_read=True, created_at__lt=cutoff)
+                .order_by("pk")
+                .values(*ARCHIVE_FIELDS)[:batch_size]
+            )
+            if not rows:
+                break
+            ids = [row["id"] for row in rows]
+            if archive:
+                NotificationArchive.objects.bulk_create([
+                    NotificationArchive(
+                        original_id=row["id"],
+                        user_id=row["user_id"],
+                        place_id=row["place_id"],
+                        report_id=row["report_id"],
+                        message=row["message"],
+                        created_at=row["created_at"],
+                    )
+                    for row in rows
+                ])
+            # Se vuelve a exigir is_read: si alguien la marcó como no leída
+            # entremedio no se borra (en el peor caso queda también archivada).
+            Notification.objects.filter(pk__in=ids, is_read=True).delete()
+        total += len(rows)
+        last_id = ids[-1]
+        if len(rows) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return total
+
+
+def purge_deleted_reports(cutoff, batch_size=200, pause=0):
+    """
+    Borra de verdad los reportes eliminados (borrado lógico) antes de
+    `cutoff`, con sus comentarios y notificaciones en cascada, en lotes de
+    `batch_size` reportes por transacción. Las fotos se borran del storage
+    después del commit. Devuelve cuántos reportes se purgaron.
+    """
+    total = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                Report.all_objects
+                .filter(deleted_at__lt=cutoff)
+                .order_by("deleted_at")
+                .values_list("id", "photo")[:batch_size]
+            )
+            if not batch:
+                break
+            ids = [pk for pk, _ in batch]
+            # La cascada se lleva sus notificaciones, también las no leídas.
+            users = unread_user_ids(Notification.objects.filter(report_id__in=ids))
+            Report.all_objects.filter(pk__in=ids).delete()
+            recount_unread_notifications(users)
+            photos = [photo for _, photo in batch if photo]
+            if photos:
+                transaction.on_commit(lambda photos=photos: delete_stored_files(photos))
+        total += len(batch)
+        if len(batch) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return total
+
+
+def prune_changelog(cutoff, batch_size=5000, pause=0):
+    """
+    Borra las entradas de ChangeLog creadas antes de `cutoff`, en lotes.
+    Devuelve cuántas se borraron.
+
+    El límite se busca una sola vez desde el inicio de la clave primaria
+    (la primera entrada posterior a `cutoff`) y los lotes se toman por seq,
+    sin filtrar la tabla entera por created_at.
+    """
+    boundary = (
+        ChangeLog.objects.filter(created_at__gte=cutoff)
+        .order_by("seq").values_list("seq", flat=True).first()
+    )
+    old = ChangeLog.objects.all() if boundary is None else ChangeLog.objects.filter(seq__lt=boundary)
+    total = 0
+    while True:
+        ids = list(old.order_by("seq").values_list("seq", flat=True)[:batch_size])
+        if not ids:
+            break
+        ChangeLog.objects.filter(seq__in=ids).delete()
+        total += len(ids)
+        if len(ids) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+    return total
+
+
+def delete_stored_files(names):
+    for name in names:
+        try:
+            default_storage.delete(name)
+        except OSError:
+            pass
+
+
+# --- Particiones MySQL de NotificationArchive ------------------------------
+
+def _month_start(day):
+    return day.replace(day=1)
+
+
+def _next_month(day):
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def _partition_name(month):
+    return f"p{month:%Y%m}"
+
+
+def _partition_clause(month):
+    """Partición con las filas del mes `month` (límite: inicio del siguiente)."""
+    return (
+        f"PARTITION {_partition_name(month)} VALUES LESS THAN "
+        f"(TO_DAYS('{_next_month(month):%Y-%m-%d}'))"
+    )
+
+
+def existing_partitions(table=None):
+    table = table or NotificationArchive._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s "
+            "AND PARTITION_NAME IS NOT NULL ORDER BY PARTITION_ORDINAL_POSITION",
+            [table],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def partition_statements(existing, today, months_ahead=3, keep_months=None, first_month=None):
+    """
+    SQL para dejar NotificationArchive particionada por mes hasta
+    `months_ahead` meses después de `today` y, con `keep_months`, eliminar
+    los meses anteriores a los últimos `keep_months`. `existing` son los
+    nombres de las particiones actuales (vacío si la tabla aún no está
+    particionada); `first_month` es el mes de la fila archivada más antigua.
+
+    MySQL exige que la columna de partición esté en la clave primaria, por
+    eso al particionar la clave pasa a ser (id, created_at). La partición
+    pmax (MAXVALUE) recibe cualquier fila posterior al último mes creado.
+    """
+    table = NotificationArchive._meta.db_table
+    current = _month_start(today)
+    last = current
+    for _ in range(months_ahead):
+        last = _next_month(last)
+
+    monthly = sorted(p for p in existing if p != "pmax")
+    if monthly:
+        start = _next_month(_partition_month(monthly[-1]))
+    else:
+        start = _month_start(min(first_month or today, today))
+    new_months = list(_months_between(start, last))
+    clauses = [_partition_clause(m) for m in new_months]
+    clauses.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+
+    statements = []
+    if not existing:
+        statements.append(
+            f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (id, created_at) "
+            f"PARTITION BY RANGE (TO_DAYS(created_at)) ({', '.join(clauses)})"
+        )
+    elif new_months:
+        statements.append(
+            f"ALTER TABLE {table} REORGANIZE PARTITION pmax INTO ({', '.join(clauses)})"
+        )
+
+    if keep_months is not None:
+        oldest_kept = current
+        for _ in range(keep_months - 1):
+            oldest_kept = _month_start(oldest_kept - timedelta(days=1))
+        names = monthly + [_partition_name(m) for m in new_months]
+        old = [p for p in names if p < _partition_name(oldest_kept)]
+        if old:
+            statements.append(f"ALTER TABLE {table} DROP PARTITION {', '.join(old)}")
+    return statements
+
+
+def _partition_month(name):
+    return date(int(name[1:5]), int(name[5:7]), 1)
+
+
+def _months_between(start, end):
+    month = _month_start(start)
+    while month <= end:
+        yield month
+        month = _next_month(month)
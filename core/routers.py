@@ -0,0 +1,107 @@
+"""
+Ruteo de lecturas a la réplica.
+
+Solo las vistas decoradas con @read_from_replica leen de la réplica; todo
+lo demás (incluidas las escrituras y el middleware de sesión/auth) usa
+'default'. Después de que un usuario escribe un reporte, comentario o
+favorito, sus lecturas quedan "fijadas" al primario durante
+REPLICA_PIN_SECONDS para que vea sus propios cambios aunque la réplica
+venga con retraso.
+
+El pin se guarda en la caché REPLICA_PIN_CACHE: si fuera una por proceso,
+la petición siguiente podría caer en otro worker que no conoce el pin y
+leer de la réplica. Con DEBUG=False y réplica configurada, el check
+core.E002 exige que sea compartida (ver core/checks.py).
+"""
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+
+_use_replica = ContextVar("incluimap_use_replica", default=False)
+
+
+def replica_alias():
+    """Alias de la réplica si está configurada y habilitada, o None."""
+    if not getattr(settings, "REPLICA_READS", True):
+        return None
+    alias = getattr(settings, "DATABASE_REPLICA_ALIAS", None)
+    if alias and alias in settings.DATABASES:
+        return alias
+    return None
+
+
+def _pin_cache():
+    return caches[getattr(settings, "REPLICA_PIN_CACHE", "default")]
+
+
+def _pin_key(user_id):
+    return f"replica-pin:{user_id}"
+
+
+def pin_to_primary(user_id):
+    """Fija las lecturas del usuario al primario durante REPLICA_PIN_SECONDS."""
+    if user_id is None or replica_alias() is None:
+        return
+    _pin_cache().set(_pin_key(user_id), 1, getattr(settings, "REPLICA_PIN_SECONDS", 15))
+
+
+def is_pinned_to_primary(user):
+    if not user.is_authenticated:
+        return False
+    return bool(_pin_cache().get(_pin_key(user.pk)))
+
+
+async def ais_pinned_to_primary(request):
+    user = await request.auser()
+    if not user.is_authenticated:
+        return False
+    return bool(await _pin_cache().aget(_pin_key(user.pk)))
+
+
+def read_from_replica(view):
+    """
+    Decorador para vistas de solo lectura: sus consultas de lectura van a
+    la réplica, salvo que el usuario haya escrito recientemente.
+    Sirve tanto para vistas síncronas como para `async def`.
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if replica_alias() is None or await ais_pinned_to_primary(request):
+                return await view(request, *args, **kwargs)
+            token = _use_replica.set(True)
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _use_replica.reset(token)
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if replica_alias() is None or is_pinned_to_primary(request.user):
+            return view(request, *args, **kwargs)
+        token = _use_replica.set(True)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _use_replica.reset(token)
+
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _use_replica.get():
+            return replica_alias()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primario y réplica contienen los mismos datos.
+        return True
@@ -0,0 +1,294 @@
+"""
+Generación de datos sintéticos para benchmarks y pruebas de carga.
+
+Los datos se insertan con bulk_create en bloques, por lo que no pasan por
+Place.save() (full_clean por fila) ni disparan las señales post_save
+(Profile automático, notificaciones a favoritos). Por eso aquí se crean
+a mano los Profile de cada usuario.
+
+Las distribuciones intentan parecerse a producción:
+- lugares agrupados en focos (centros comerciales, metro, plazas)
+  dentro del cuadrante de Maipú que valida Place.clean();
+- reportes por lugar con distribución Zipf (pocos lugares muy reportados);
+- favoritos sesgados hacia los lugares populares;
+- fechas repartidas en los últimos `days` días.
+"""
+import bisect
+import contextlib
+import itertools
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from .forms import TAGS_CHOICES
+from .models import Place, Report, Profile, grid_cell
+
+
+# Mismo cuadrante que valida Place.clean()
+MIN_LAT, MAX_LAT = -33.598, -33.434
+MIN_LNG, MAX_LNG = -70.875, -70.686
+
+TAG_VALUES = [value for value, _ in TAGS_CHOICES]
+
+SEED_USER_PREFIX = "seed_user_"
+
+PLACE_KINDS = [
+    "Plaza", "Metro", "Consultorio", "Municipalidad", "Colegio", "Supermercado",
+    "Farmacia", "Banco", "Parque", "Biblioteca", "Centro comercial", "Paradero",
+]
+STREETS = [
+    "Av. Pajaritos", "5 de Abril", "Av. Américo Vespucio", "Av. Los Pajaritos",
+    "Camino a Rinconada", "Av. Primera Transversal", "Av. El Rosal",
+    "Av. Esquina Blanca", "Av. Portales", "Av. Sur", "Av. Lumen",
+]
+DESCRIPTIONS = [
+    "Rampa en buen estado.",
+    "Rampa con pendiente muy pronunciada.",
+    "Ascensor fuera de servicio.",
+    "Baño adaptado cerrado con llave.",
+    "Estacionamiento PMR ocupado por autos sin credencial.",
+    "Vereda rota frente a la entrada.",
+    "Acceso expedito, muy buena señalética.",
+    "",
+]
+# Pesos de rating 1..5: la mayoría de los reportes son intermedios o buenos.
+RATING_WEIGHTS = [10, 15, 25, 30, 20]
+
+
+@contextlib.contextmanager
+def explicit_created_at(*models):
+    """
+    Desactiva temporalmente auto_now_add en `created_at` para poder
+    insertar fechas históricas con bulk_create.
+    """
+    fields = [m._meta.get_field("created_at") for m in models]
+    previous = [f.auto_now_add for f in fields]
+    for f in fields:
+        f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, value in zip(fields, previous):
+            f.auto_now_add = value
+
+
+def chunked(iterable, size):
+    it = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def zipf_cum_weights(n, s=1.1):
+    """Pesos acumulados de una Zipf(s) sobre n elementos (rango 1..n)."""
+    total = 0.0
+    cum = []
+    for rank in range(1, n + 1):
+        total += 1.0 / rank ** s
+        cum.append(total)
+    return cum
+
+
+class DatasetGenerator:
+    """
+    Genera usuarios, lugares, reportes y favoritos en bloques de
+    `batch_size` filas, cada bloque en su propia transacción.
+    """
+
+    def __init__(self, seed=42, batch_size=5000, days=365, clusters=None,
+                 zipf_s=1.1, log=None):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.days = days
+        self.clusters = clusters
+        self.zipf_s = zipf_s
+        self.log = log or (lambda msg: None)
+        self.now = timezone.now()
+
+    # -- utilidades ---------------------------------------------------------
+
+    def _random_date(self):
+        return self.now - timedelta(seconds=self.rng.uniform(0, self.days * 86400))
+
+    def _random_tags(self):
+        k = self.rng.choices(range(len(TAG_VALUES) + 1), weights=[20, 40, 25, 10, 5])[0]
+        return ",".join(self.rng.sample(TAG_VALUES, k))
+
+    def _hotspots(self, n_places):
+        n = self.clusters or max(5, n_places // 250)
+        return [
+            (
+                self.rng.uniform(MIN_LAT, MAX_LAT),
+                self.rng.uniform(MIN_LNG, MAX_LNG),
+                self.rng.uniform(0.001, 0.006),  # desviación en grados (~100–600 m)
+            )
+            for _ in range(n)
+        ]
+
+    def _clustered_coords(self, hotspots):
+        # 15% de los lugares quedan dispersos por toda la comuna.
+        if self.rng.random() < 0.15:
+            return (
+                self.rng.uniform(MIN_LAT, MAX_LAT),
+                self.rng.uniform(MIN_LNG, MAX_LNG),
+            )
+        lat0, lng0, sigma = self.rng.choice(hotspots)
+        while True:
+            lat = self.rng.gauss(lat0, sigma)
+            lng = self.rng.gauss(lng0, sigma)
+            if MIN_LAT <= lat <= MAX_LAT and MIN_LNG <= lng <= MAX_LNG:
+                return lat, lng
+
+    def _bulk(self, model, objs, **kwargs):
+        created = 0
+        for chunk in chunked(objs, self.batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(chunk, **kwargs)
+            created += len(chunk)
+        return created
+
+    # -- generadores ----------------------------------------------------------
+
+    def create_users(self, n):
+        password = make_password("seed-password")
+        start = User.objects.filter(username__startswith=SEED_USER_PREFIX).count()
+        # bulk_create no devuelve ids en MySQL: lo de esta corrida es lo
+        # posterior al último id actual.
+        last_id = User.objects.order_by("-id").values_list("id", flat=True).first() or 0
+        users = (
+            User(
+                username=f"{SEED_USER_PREFIX}{i}",
+                email=f"{SEED_USER_PREFIX}{i}@incluimap.local",
+                password=password,
+                date_joined=self._random_date(),
+            )
+            for i in range(start, start + n)
+        )
+        self._bulk(User, users)
+        self.log(f"Usuarios: {n}")
+
+        user_ids = list(
+            User.objects
+            .filter(id__gt=last_id, username__startswith=SEED_USER_PREFIX)
+            .order_by("id")
+            .values_list("id", flat=True)
+            .iterator(chunk_size=self.batch_size)
+        )
+        self._bulk(Profile, (Profile(user_id=uid) for uid in user_ids), ignore_conflicts=True)
+        return user_ids
+
+    def create_places(self, n):
+        first_new = Place.objects.order_by("-id").values_list("id", flat=True).first() or 0
+        hotspots = self._hotspots(n)
+
+        def build():
+            for i in range(n):
+                lat, lng = self._clustered_coords(hotspots)
+                lat, lng = Decimal(f"{lat:.6f}"), Decimal(f"{lng:.6f}")
+                yield Place(
+                    name=f"{self.rng.choice(PLACE_KINDS)} {first_new + i + 1}",
+                    address=f"{self.rng.choice(STREETS)} {self.rng.randint(1, 9999)}",
+                    lat=lat,
+                    lng=lng,
+                    grid_cell=grid_cell(lat, lng),
+                    tags=self._random_tags(),
+                    created_at=self._random_date(),
+                )
+
+        with explicit_created_at(Place):
+            self._bulk(Place, build())
+        self.log(f"Lugares: {n}")
+
+        place_ids = list(
+            Place.objects.filter(id__gt=first_new)
+            .values_list("id", flat=True)
+            .iterator(chunk_size=self.batch_size)
+        )
+        # El orden define la popularidad (rango Zipf); se baraja para que
+        # no coincida con el orden de inserción.
+        self.rng.shuffle(place_ids)
+        return place_ids
+
+    def create_reports(self, n, place_ids, user_ids):
+        if not place_ids or not user_ids:
+            return 0
+        cum = zipf_cum_weights(len(place_ids), self.zipf_s)
+
+        def build():
+            for _ in range(n):
+                yield Report(
+                    place_id=self.rng.choices(place_ids, cum_weights=cum)[0],
+                    author_id=self.rng.choice(user_ids),
+                    description=self.rng.choice(DESCRIPTIONS),
+                    rating=self.rng.choices(range(1, 6), weights=RATING_WEIGHTS)[0],
+                    tags=self._random_tags(),
+                    created_at=self._random_date(),
+                )
+
+        created = 0
+        with explicit_created_at(Report):
+            for chunk in chunked(build(), self.batch_size):
+                with transaction.atomic():
+                    Report.objects.bulk_create(chunk)
+                created += len(chunk)
+                if created % (self.batch_size * 20) == 0:
+                    self.log(f"  reportes: {created}/{n}")
+        self.log(f"Reportes: {created}")
+        return created
+
+    def create_favorites(self, place_ids, user_ids, per_user=5):
+        if not place_ids or not user_ids or per_user <= 0:
+            return 0
+        Favorite = Profile.favorite_places.through
+        cum = zipf_cum_weights(len(place_ids), self.zipf_s)
+        total = cum[-1]
+        # Solo los perfiles de los usuarios de esta corrida.
+        profile_ids = [
+            pk
+            for chunk in chunked(user_ids, self.batch_size)
+            for pk in Profile.objects.filter(user_id__in=chunk).order_by("id").values_list("id", flat=True)
+        ]
+
+        def build():
+            for profile_id in profile_ids:
+                # Cantidad variable por usuario, con media `per_user`.
+                k = min(len(place_ids), int(self.rng.expovariate(1 / per_user)) + 1)
+                chosen = set()
+                while len(chosen) < k:
+                    idx = bisect.bisect_left(cum, self.rng.random() * total)
+                    chosen.add(place_ids[min(idx, len(place_ids) - 1)])
+                for place_id in chosen:
+                    yield Favorite(profile_id=profile_id, place_id=place_id)
+
+        created = self._bulk(Favorite, build(), ignore_conflicts=True)
+        self.log(f"Favoritos: {created}")
+        return created
+
+
+def generate_dataset(places=200, reports=2000, users=50, favorites_per_user=5,
+                     seed=42, batch_size=5000, days=365, clusters=None, log=None):
+    """
+    Crea K usuarios (con su Profile), N lugares dentro de Maipú,
+    M reportes repartidos entre ellos y favoritos para cada usuario.
+    Devuelve un dict con los conteos creados.
+    """
+    gen = DatasetGenerator(seed=seed, batch_size=batch_size, days=days,
+                           clusters=clusters, log=log)
+    user_ids = gen.create_users(users)
+    place_ids = gen.create_places(places)
+    created_reports = gen.create_reports(reports, place_ids, user_ids)
+    favorites = gen.create_favorites(place_ids, user_ids, favorites_per_user)
+
+    return {
+        "users": len(user_ids),
+        "places": len(place_ids),
+        "reports": created_reports,
+        "favorites": favorites,
+    }
@@ -0,0 +1,127 @@
+"""
+Receptores de señales transversales (ruteo a réplica, cachés, etc.).
+Se conectan desde CoreConfig.ready().
+"""
+from django.contrib.auth.models import User
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+
+from .aggregates import invalidate_place
+from .models import (
+    ChangeLog, Place, Report, Comment, Profile, Notification, NotificationArchive,
+    recount_unread_notifications, reports_bulk_created, unread_user_ids,
+)
+from .routers import pin_to_primary
+from .sync import record_change, record_changes
+
+
+@receiver(post_save, sender=Report)
+@receiver(post_save, sender=Comment)
+def pin_author_after_write(sender, instance, **kwargs):
+    """Tras escribir un reporte o comentario, el autor lee del primario."""
+    pin_to_primary(instance.author_id)
+
+
+@receiver(m2m_changed, sender=Profile.favorite_places.through)
+def pin_user_after_favorite(sender, instance, action, reverse, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear") or reverse:
+        return
+    pin_to_primary(instance.user_id)
+
+
+@receiver(m2m_changed, sender=Profile.favorite_places.through)
+def bump_favorites_version(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Mantiene Profile.favorites_version al día cuando los favoritos cambian
+    con add/remove/clear. La API de sincronización escribe en bloque sobre
+    la tabla intermedia (sin m2m_changed) y sube la versión por su cuenta.
+    """
+    changed = action in ("post_add", "post_remove") and pk_set
+    if not reverse:
+        if not (changed or action == "post_clear"):
+            return
+        profiles = Profile.objects.filter(pk=instance.pk)
+    elif changed:
+        profiles = Profile.objects.filter(pk__in=pk_set)
+    elif action == "pre_clear":
+        # place.favorited_by.clear(): después ya no se sabe quiénes eran.
+        profiles = Profile.objects.filter(favorite_places=instance)
+    else:
+        return
+    profiles.update(favorites_version=F("favorites_version") + 1)
+
+
+@receiver(post_save, sender=Report)
+@receiver(post_delete, sender=Report)
+def invalidate_place_summary_on_report(sender, instance, **kwargs):
+    invalidate_place(instance.place_id)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_place_summary_on_comment(sender, instance, **kwargs):
+    """La primera página cacheada incluye el número de comentarios."""
+    place_id = (
+        Report.objects.filter(pk=instance.report_id)
+        .values_list("place_id", flat=True)
+        .first()
+    )
+    invalidate_place(place_id)
+
+
+@receiver(pre_delete, sender=Place)
+def remember_unread_before_place_delete(sender, instance, **kwargs):
+    # La cascada borra las notificaciones del lugar sin descontarlas.
+    instance._unread_user_ids = unread_user_ids(Notification.objects.filter(place=instance))
+
+
+@receiver(post_delete, sender=Place)
+def recount_unread_after_place_delete(sender, instance, **kwargs):
+    recount_unread_notifications(getattr(instance, "_unread_user_ids", ()))
+
+
+@receiver(post_save, sender=Place)
+def log_place_saved(sender, instance, **kwargs):
+    record_change(ChangeLog.PLACE, instance.pk)
+
+
+@receiver(post_delete, sender=Place)
+def log_place_deleted(sender, instance, **kwargs):
+    record_change(ChangeLog.PLACE, instance.pk, deleted=True)
+
+
+@receiver(post_save, sender=Report)
+def log_report_saved(sender, instance, **kwargs):
+    # También el lugar, porque cambian su promedio y su número de reportes.
+    # Un borrado lógico llega a los clientes como tombstone.
+    record_change(ChangeLog.REPORT, instance.pk, deleted=instance.deleted_at is not None)
+    record_change(ChangeLog.PLACE, instance.place_id)
+
+
+@receiver(post_delete, sender=Report)
+def log_report_deleted(sender, instance, **kwargs):
+    record_change(ChangeLog.REPORT, instance.pk, deleted=True)
+    record_change(ChangeLog.PLACE, instance.place_id)
+
+
+@receiver(reports_bulk_created)
+def after_reports_bulk_created(sender, reports, author, **kwargs):
+    """Lo mismo que hacen los receptores de post_save, una vez por lote."""
+    pin_to_primary(author.pk)
+
+    place_ids = set(
+        Report.objects.filter(pk__in=reports).values_list("place_id", flat=True)
+    )
+    record_changes(
+        [(ChangeLog.REPORT, pk, False) for pk in reports]
+        + [(ChangeLog.PLACE, pk, False) for pk in place_ids]
+    )
+    for place_id in place_ids:
+        invalidate_place(place_id)
+
+
+@receiver(post_delete, sender=User)
+def delete_archived_notifications(sender, instance, **kwargs):
+    """NotificationArchive no tiene FK al usuario: se limpia a mano."""
+    NotificationArchive.objects.filter(user_id=instance.pk).delete()
@@ -0,0 +1,128 @@
+"""
+Sincronización offline del mapa: snapshot completo + deltas por secuencia.
+
+Los receptores de core.signals anotan en ChangeLog cada alta, cambio o
+baja de Place y Report (un cambio en un reporte también anota su lugar,
+porque cambian sus agregados). Un cliente descarga el snapshot una vez y
+luego pide /api/sync/?since=<seq> para recibir solo lo posterior.
+
+Las entradas se insertan con transaction.on_commit, después de que confirma
+la transacción que hizo el cambio: así el orden de los seq sigue el orden
+de confirmación y una transacción larga no puede dejar atrás un seq menor
+al que un cliente ya recibió. Solo queda la carrera entre dos INSERT en
+autocommit casi simultáneos, y para eso se entregan solo las entradas con
+más de SYNC_SETTLE_SECONDS de antigüedad. Aplicar dos veces la misma
+entrada es inocuo. (Si el proceso muere entre el commit y el INSERT el
+cambio no se anota; el objeto vuelve a llegar en su próximo cambio.)
+
+Las entradas con más de SYNC_RETENTION_DAYS días se borran con
+`python manage.py prune_changelog`; un cliente con un seq anterior a lo
+conservado recibe un snapshot con reset.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count
+from django.utils import timezone
+
+from .models import ALIVE_REPORTS, ChangeLog, Place, Report
+
+DELTA_LIMIT = 1000
+
+
+def record_change(kind, object_id, deleted=False):
+    record_changes([(kind, object_id, deleted)])
+
+
+def record_changes(entries):
+    """Anota [(kind, object_id, deleted), ...] al confirmar la transacción."""
+    rows = [ChangeLog(kind=kind, object_id=oid, deleted=deleted) for kind, oid, deleted in entries]
+    if rows:
+        transaction.on_commit(lambda: ChangeLog.objects.bulk_create(rows))
+
+
+def _entries(settled=True):
+    settle = getattr(settings, "SYNC_SETTLE_SECONDS", 2)
+    qs = ChangeLog.objects.all()
+    if settled and settle:
+        qs = qs.filter(created_at__lte=timezone.now() - timedelta(seconds=settle))
+    return qs
+
+
+def current_seq(settled=True):
+    # Se recorre la clave primaria hacia atrás y se para en la primera
+    # entrada asentada: solo se saltan las de los últimos segundos, en vez
+    # de filtrar toda la tabla por created_at como haría MAX(seq).
+    return _entries(settled).order_by("-seq").values_list("seq", flat=True).first() or 0
+
+
+def oldest_seq():
+    """Primer seq conservado (0 si no hay entradas)."""
+    return ChangeLog.objects.order_by("seq").values_list("seq", flat=True).first() or 0
+
+
+def place_rows(ids=None):
+    qs = Place.objects.all()
+    if ids is not None:
+        qs = qs.filter(pk__in=ids)
+    rows = (
+        qs.annotate(
+            avg_rating=Avg("report__rating", filter=ALIVE_REPORTS),
+            reports_count=Count("report", filter=ALIVE_REPORTS),
+        )
+        .values("id", "name", "address", "lat", "lng", "tags", "avg_rating", "reports_count")
+        .order_by("id")
+    )
+    return [dict(r, lat=float(r["lat"]), lng=float(r["lng"])) for r in rows]
+
+
+def report_rows(ids):
+    return list(
+        Report.objects.filter(pk__in=ids)
+        .values("id", "place_id", "rating", "tags", "description", "created_at")
+        .order_by("id")
+    )
+
+
+def snapshot():
+    """Todos los lugares con sus agregados y el seq desde el que seguir."""
+    # El seq se lee antes que los datos: lo que cambie entremedio vuelve a
+    # llegar en el siguiente delta.
+    seq = current_seq()
+    return {"seq": seq, "places": place_rows()}
+
+
+def changes_since(since, limit=None):
+    """
+    Delta compacto desde `since`: para cada objeto solo cuenta su última
+    entrada. Si hay más de `limit` entradas pendientes se devuelve
+    has_more=True y el cliente repite la llamada con el nuevo seq.
+    """
+    limit = limit or DELTA_LIMIT
+    entries = list(
+        _entries()
+        .filter(seq__gt=since)
+        .order_by("seq")
+        .values_list("seq", "kind", "object_id", "deleted")[:limit + 1]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    latest = {}
+    for seq, kind, object_id, deleted in entries:
+        latest[(kind, object_id)] = deleted
+
+    def ids(kind, deleted):
+        return sorted(oid for (k, oid), d in latest.items() if k == kind and d == deleted)
+
+    return {
+        "seq": entries[-1][0] if entries else since,
+        "has_more": has_more,
+        "places": place_rows(ids(ChangeLog.PLACE, False)),
+        "reports": report_rows(ids(ChangeLog.REPORT, False)),
+        "deleted": {
+            "places": ids(ChangeLog.PLACE, True),
+            "reports": ids(ChangeLog.REPORT, True),
+        },
+    }
@@ -0,0 +1,93 @@
+import json
+from functools import lru_cache
+
+from django import template
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.exceptions import ImproperlyConfigured
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+LEAFLET_VERSION = "1.9.4"
+LEAFLET_CDN = f"https://unpkg.com/leaflet@{LEAFLET_VERSION}/dist/"
+# Hashes SRI publicados por Leaflet; vendor_leaflet los usa para verificar.
+LEAFLET_INTEGRITY = {
+    "leaflet.css": "sha256-p4NxAoJBhIIN+hmNHrzRCf9tD/miZyoHS5obTRR9BMY=",
+    "leaflet.js": "sha256-20nQCchB9co0qIjJZRGuk2/Z9VM+kNiyxNV1lvTlZBo=",
+}
+LEAFLET_IMAGES = [
+    "layers.png", "layers-2x.png", "marker-icon.png", "marker-icon-2x.png", "marker-shadow.png",
+]
+
+TILE_ATTRIBUTIONS = {
+    "osm": "&copy; OpenStreetMap",
+    "hot": "&copy; OpenStreetMap, HOT",
+    "carto": "&copy; OpenStreetMap, &copy; Carto",
+}
+
+
+@lru_cache(maxsize=None)
+def _vendored(name):
+    return bool(finders.find(f"vendor/leaflet/{name}"))
+
+
+def _leaflet_url(name):
+    """
+    Copia local en static/vendor/leaflet/ (python manage.py vendor_leaflet);
+    unpkg solo si LEAFLET_CDN_FALLBACK lo permite.
+    """
+    if _vendored(name):
+        return static(f"vendor/leaflet/{name}"), None
+    if getattr(settings, "LEAFLET_CDN_FALLBACK", False):
+        return LEAFLET_CDN + name, LEAFLET_INTEGRITY[name]
+    raise ImproperlyConfigured(
+        f"Falta static/vendor/leaflet/{name}: corre vendor_leaflet o activa LEAFLET_CDN_FALLBACK."
+    )
+
+
+@register.simple_tag
+def leaflet_css():
+    url, integrity = _leaflet_url("leaflet.css")
+    if integrity:
+        return format_html('<link rel="stylesheet" href="{}" integrity="{}" crossorigin="">', url, integrity)
+    return format_html('<link rel="stylesheet" href="{}">', url)
+
+
+@register.simple_tag
+def leaflet_js():
+    url, integrity = _leaflet_url("leaflet.js")
+    if integrity:
+        return format_html('<script defer src="{}" integrity="{}" crossorigin=""></script>', url, integrity)
+    return format_html('<script defer src="{}"></script>', url)
+
+
+@register.simple_tag
+def tile_layers():
+    """
+    Capas base para L.tileLayer en orden de preferencia, como JSON. Con
+    TILE_PROXY_ENABLED apuntan a /tiles/... y llevan TILE_BOUNDS y los zoom
+    que el proxy acepta; si no, a los servidores de origen.
+    """
+    proxy = getattr(settings, "TILE_PROXY_ENABLED", False)
+    layers = []
+    for name, upstream in settings.TILE_UPSTREAMS.items():
+        layer = {"attribution": TILE_ATTRIBUTIONS.get(name, "")}
+        if proxy:
+            # reverse() con marcadores que Leaflet reemplaza.
+            layer["url"] = (
+                reverse("tile", args=[name, 0, 0, 0])
+                .replace("/0/0/0.png", "/{z}/{x}/{y}.png")
+            )
+            # Fuera de esto el proxy responde 404: que Leaflet ni las pida.
+            min_lat, max_lat, min_lng, max_lng = settings.TILE_BOUNDS
+            layer["bounds"] = [[min_lat, min_lng], [max_lat, max_lng]]
+            layer["minZoom"] = settings.TILE_MIN_ZOOM
+            layer["maxZoom"] = settings.TILE_MAX_ZOOM
+        else:
+            layer["url"] = upstream
+        layers.append(layer)
+    return mark_safe(json.dumps(layers).replace("<", "\\u003c"))
@@ -0,0 +1,131 @@
+import io
+import json
+import shutil
+import tempfile
+from decimal import Decimal
+
+from unittest import mock
+
+from PIL import Image
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .forms import ReportForm
+from .models import Place, Report, Notification, ChangeLog, reports_bulk_created
+
+
+def png_bytes():
+    buffer = io.BytesIO()
+    Image.new("RGB", (1, 1)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class ReportsBatchAPITest(TestCase):
+    """
+    Ingesta en lote de reportes offline:
+    - crea los válidos, informa errores de ReportForm por ítem;
+    - reintentar con las mismas client_key no duplica, tampoco si el
+      reintento llega en paralelo;
+    - cada seguidor recibe una sola notificación agregada por lote.
+    """
+
+    def setUp(self):
+        self.author = User.objects.create_user("voluntaria", password="123456")
+        self.follower = User.objects.create_user("vecino", email="v@test.com", password="123456")
+        self.places = [
+            Place.objects.create(
+                name=f"Lugar {i}", lat=Decimal("-33.510000"), lng=Decimal("-70.757000")
+            )
+            for i in range(2)
+        ]
+        self.follower.profile.favorite_places.add(*self.places)
+        self.client.force_login(self.author)
+        self.url = reverse("reports_batch_api")
+
+    def post_batch(self, items):
+        return self.client.post(self.url, data=items, content_type="application/json")
+
+    def test_lote_idempotente_y_fan_out_agregado(self):
+        a, b = self.places
+        items = [
+            {"client_key": "k1", "place": a.pk, "rating": 4, "tags": ["rampa"]},
+            {"client_key": "k2", "place": b.pk, "rating": 2, "description": "Sin rampa"},
+            {"client_key": "k3", "place": a.pk, "rating": 9},
+            {"place": a.pk, "rating": 3},
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.post_batch(items)
+        data = response.json()
+
+        self.assertEqual(data["created"], 2)
+        statuses = [r["status"] for r in data["results"]]
+        self.assertEqual(statuses, ["created", "created", "invalid", "invalid"])
+        self.assertIn("rating", data["results"][2]["errors"])
+        self.assertEqual(Report.objects.get(client_key="k1").tags, "rampa")
+
+        notifications = Notification.objects.filter(user=self.follower)
+        self.assertEqual(notifications.count(), 1)
+        self.assertIn("2 nuevos reportes", notifications.get().message)
+        self.follower.profile.refresh_from_db()
+        self.assertEqual(self.follower.profile.unread_notifications, 1)
+        self.assertTrue(
+            ChangeLog.objects.filter(kind=ChangeLog.REPORT, object_id=data["results"][0]["id"]).exists()
+        )
+
+        # Reintento tras una subida fallida: nada nuevo.
+        with self.captureOnCommitCallbacks(execute=True):
+            retry = self.post_batch(items[:2]).json()
+        self.assertEqual(retry["created"], 0)
+        self.assertEqual([r["status"] for r in retry["results"]], ["duplicate", "duplicate"])
+        self.assertEqual(retry["results"][0]["id"], data["results"][0]["id"])
+        self.assertEqual(Report.objects.count(), 2)
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_reintento_concurrente(self):
+        a, b = self.places
+        items = [
+            {"client_key": "k1", "place": a.pk, "rating": 4},
+            {"client_key": "k2", "place": b.pk, "rating": 2},
+        ]
+        # Otra petición inserta k2 después de la primera consulta de claves.
+        concurrent = []
+        is_valid = ReportForm.is_valid
+
+        def racing_is_valid(form):
+            if not concurrent:
+                concurrent.append(Report.objects.create(
+                    place=b, author=self.author, rating=2, client_key="k2"
+                ))
+            return is_valid(form)
+
+        signalled = []
+
+        def receiver(sender, reports, **kwargs):
+            signalled.extend(reports)
+
+        reports_bulk_created.connect(receiver)
+        self.addCleanup(reports_bulk_created.disconnect, receiver)
+        with mock.patch.object(ReportForm, "is_valid", racing_is_valid):
+            data = self.post_batch(items).json()
+
+        self.assertEqual(data["created"], 1)
+        self.assertEqual([r["status"] for r in data["results"]], ["created", "duplicate"])
+        self.assertEqual(data["results"][1]["id"], concurrent[0].pk)
+        self.assertEqual(signalled, [data["results"][0]["id"]])
+        self.assertEqual(Report.objects.count(), 2)
+
+    def test_multipart_con_foto(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media))
+
+        items = [{"client_key": "foto-1", "place": self.places[0].pk, "rating": 5, "photo": "f1"}]
+        response = self.client.post(self.url, {
+            "reports": json.dumps(items),
+            "f1": SimpleUploadedFile("rampa.png", png_bytes(), content_type="image/png"),
+        })
+        self.assertEqual(response.json()["created"], 1)
+        self.assertTrue(Report.objects.get(client_key="foto-1").photo)
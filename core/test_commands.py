@@ -0,0 +1,163 @@
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import Count
+from django.test import TestCase
+
+from .explain import explain
+from .forms import TAGS_CHOICES
+from .models import Place, Report, Profile, Notification
+from .seed import generate_dataset
+
+
+class BenchCommandTest(TestCase):
+    """
+    Pruebas del harness de benchmarks:
+    - generate_dataset crea los datos pedidos.
+    - bench_incluimap escribe un JSON con percentiles y conteo de consultas.
+    """
+
+    def test_generate_dataset(self):
+        counts = generate_dataset(places=10, reports=30, users=5, favorites_per_user=2)
+
+        self.assertEqual(Place.objects.count(), 10)
+        self.assertEqual(Report.objects.count(), 30)
+        self.assertEqual(Profile.objects.count(), 5)
+        self.assertGreater(counts["favorites"], 0)
+        self.assertEqual(
+            Profile.favorite_places.through.objects.count(), counts["favorites"]
+        )
+        # Todas las coordenadas quedan dentro del cuadrante de Maipú.
+        for place in Place.objects.all():
+            place.full_clean()
+
+    def test_bench_escribe_json(self):
+        fd, path = tempfile.mkstemp(suffix=".json")
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+
+        call_command(
+            "bench_incluimap",
+            "--use-existing-db",
+            "--places=5", "--reports=20", "--users=4",
+            "--iterations=2", "--warmup=0",
+            f"--output={path}",
+            stdout=io.StringIO(),
+        )
+
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+
+        self.assertIn("places_api", data["results"])
+        self.assertIn("report_submit_fanout", data["results"])
+        self.assertEqual(data["results"]["places_api_async"]["errors"], 0)
+        res = data["results"]["places_api"]
+        self.assertEqual(res["iterations"], 2)
+        self.assertEqual(res["errors"], 0)
+        self.assertIn("p95", res["latency_ms"])
+        self.assertGreater(res["queries"]["median"], 0)
+
+
+class SeedCommandTest(TestCase):
+    """
+    seed_incluimap debe crear los datos sin disparar las señales de
+    notificación y con reportes concentrados en pocos lugares (Zipf); una
+    segunda corrida solo usa los usuarios que ella misma creó.
+    """
+
+    def test_seed_crea_datos_sin_notificaciones(self):
+        call_command(
+            "seed_incluimap",
+            "--places=40", "--reports=400", "--users=20", "--batch-size=50",
+            stdout=io.StringIO(),
+        )
+
+        self.assertEqual(Place.objects.count(), 40)
+        self.assertEqual(Report.objects.count(), 400)
+        self.assertEqual(Notification.objects.count(), 0)
+
+        top = (
+            Report.objects.values("place")
+            .annotate(n=Count("id"))
+            .order_by("-n")
+            .first()
+        )
+        # Con Zipf el lugar más reportado concentra bastante más que el promedio (10).
+        self.assertGreater(top["n"], 30)
+
+        tags = {t for r in Report.objects.exclude(tags="") for t in r.tags.split(",")}
+        self.assertTrue(tags <= {value for value, _ in TAGS_CHOICES})
+
+    def test_segunda_corrida_usa_solo_sus_usuarios(self):
+        generate_dataset(places=5, reports=20, users=4, favorites_per_user=1, batch_size=50)
+        before = set(User.objects.values_list("id", flat=True))
+
+        counts = generate_dataset(places=5, reports=20, users=3, favorites_per_user=1, batch_size=50)
+
+        self.assertEqual(counts["users"], 3)
+        self.assertEqual(User.objects.count(), 7)
+        # Los reportes de la segunda corrida son de los usuarios recién creados.
+        authors = set(Report.objects.order_by("id").values_list("author_id", flat=True)[20:])
+        self.assertTrue(authors)
+        self.assertFalse(authors & before)
+
+    def test_favoritos_por_corrida(self):
+        Favorite = Profile.favorite_places.through
+        first = generate_dataset(places=5, reports=20, users=4, favorites_per_user=2, batch_size=50)
+        old_profiles = set(Profile.objects.values_list("id", flat=True))
+        old_favorites = Favorite.objects.count()
+        self.assertEqual(first["favorites"], old_favorites)
+
+        second = generate_dataset(places=5, reports=20, users=3, favorites_per_user=2, batch_size=50)
+
+        # Los favoritos de la segunda corrida son solo de sus 3 usuarios.
+        self.assertEqual(Favorite.objects.count(), old_favorites + second["favorites"])
+        self.assertEqual(Favorite.objects.filter(profile_id__in=old_profiles).count(), old_favorites)
+        self.assertEqual(
+            Favorite.objects.exclude(profile_id__in=old_profiles)
+            .values("profile_id").distinct().count(),
+            3,
+        )
+
+
+class ExplainQueriesCommandTest(TestCase):
+    """
+    explain_queries no debe encontrar recorridos completos inesperados en
+    las vistas principales, y debe detectarlos cuando existen.
+    """
+
+    def test_vistas_principales_usan_indices(self):
+        out = io.StringIO()
+        call_command(
+            "explain_queries",
+            "--use-existing-db",
+            "--places=30", "--reports=300", "--users=10",
+            stdout=out,
+        )
+        self.assertIn("Sin recorridos completos inesperados", out.getvalue())
+
+    def test_backend_no_soportado(self):
+        with mock.patch.object(connection, "vendor", "postgresql"):
+            with self.assertRaisesMessage(CommandError, "Backend no soportado: postgresql"):
+                call_command("explain_queries", "--use-existing-db", "--no-seed", stdout=io.StringIO())
+
+    def test_sin_indice_redundante_del_autor(self):
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, Report._meta.db_table)
+        author_indexes = [c["columns"] for c in constraints.values()
+                          if c["index"] and c["columns"][0] == "author_id"]
+        # Solo el compuesto por fecha (la restricción única puede sumar el suyo).
+        self.assertNotIn(["author_id"], author_indexes)
+        self.assertIn(["author_id", "deleted_at", "created_at"], author_indexes)
+
+    def test_detecta_recorrido_completo(self):
+        qs = Report.all_objects.filter(description__icontains="rampa")
+        sql, params = qs.query.sql_with_params()
+        plan, scans = explain(sql, params)
+        self.assertIn(Report._meta.db_table, scans)
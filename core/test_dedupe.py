@@ -0,0 +1,115 @@
+import io
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from . import dedupe
+from .models import ChangeLog, Notification, Place, Report
+
+
+def place(name, lat="-33.510000", lng="-70.757000", **kwargs):
+    return Place.objects.create(name=name, lat=Decimal(lat), lng=Decimal(lng), **kwargs)
+
+
+class DuplicateDetectionTest(TestCase):
+    """
+    Un lugar es duplicado de otro si está cerca (misma celda o vecina) y
+    su nombre normalizado se parece; los números deben coincidir.
+    """
+
+    def test_nombres(self):
+        self.assertEqual(dedupe.normalize_name("Estación Metro Maipú"), ("maipu", "metro"))
+        self.assertTrue(dedupe.is_duplicate(
+            {"name": "Metro Maipú", "lat": -33.51, "lng": -70.757},
+            {"name": "Estación Metro Maipu", "lat": -33.5103, "lng": -70.7572},
+        ))
+        self.assertFalse(dedupe.is_duplicate(
+            {"name": "Colegio 1", "lat": -33.51, "lng": -70.757},
+            {"name": "Colegio 2", "lat": -33.51, "lng": -70.757},
+        ))
+        # Mismo nombre pero a ~1 km.
+        self.assertFalse(dedupe.is_duplicate(
+            {"name": "Plaza", "lat": -33.51, "lng": -70.757},
+            {"name": "Plaza", "lat": -33.52, "lng": -70.757},
+        ))
+
+    def test_celdas_vecinas(self):
+        # A 30 m pero en celdas distintas de la grilla.
+        a = place("Metro Maipú", "-33.510010", "-70.757000")
+        b = place("Estación Metro Maipú", "-33.509990", "-70.757100")
+        self.assertNotEqual(a.grid_cell, b.grid_cell)
+        self.assertEqual(dedupe.find_similar(b.name, b.lat, b.lng, exclude=b.pk), [a])
+
+    def test_grupos_en_una_consulta(self):
+        a = place("Metro Maipú")
+        b = place("Estación Metro Maipú", "-33.510200")
+        c = place("Metro  maipú", "-33.510400")
+        place("Farmacia Central")
+        place("Metro Maipú", "-33.530000")
+
+        with self.assertNumQueries(1):
+            groups = dedupe.find_duplicate_groups()
+        self.assertEqual(groups, [[a.pk, b.pk, c.pk]])
+
+
+class MergePlacesTest(TestCase):
+    """find_duplicate_places --merge mueve todo al lugar con más reportes."""
+
+    def setUp(self):
+        self.author = User.objects.create_user("autor", password="123456")
+        self.fan = User.objects.create_user("fan", password="123456")
+        self.both = User.objects.create_user("ambos", password="123456")
+        self.keep = place("Metro Maipú", tags="rampa")
+        self.dup = place("Estación Metro Maipú", "-33.510200", address="Av. Pajaritos", tags="ascensor")
+
+        self.fan.profile.favorite_places.add(self.dup)
+        self.both.profile.favorite_places.add(self.keep, self.dup)
+        for _ in range(2):
+            Report.objects.create(place=self.keep, author=self.author, rating=4)
+        self.moved = Report.objects.create(place=self.dup, author=self.author, rating=2)
+
+    def test_merge(self):
+        dup_id = self.dup.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("find_duplicate_places", "--merge", stdout=io.StringIO())
+
+        self.assertFalse(Place.objects.filter(pk=dup_id).exists())
+        self.moved.refresh_from_db()
+        self.assertEqual(self.moved.place, self.keep)
+        self.assertEqual(Report.objects.filter(place=self.keep).count(), 3)
+
+        for user in (self.fan, self.both):
+            self.assertEqual(
+                list(user.profile.favorite_places.values_list("pk", flat=True)), [self.keep.pk]
+            )
+        self.assertFalse(Notification.objects.exclude(place=self.keep).exists())
+        self.assertEqual(Notification.objects.filter(user=self.fan).count(), 1)
+
+        self.keep.refresh_from_db()
+        self.assertEqual(self.keep.tags, "rampa,ascensor")
+        self.assertEqual(self.keep.address, "Av. Pajaritos")
+        self.assertTrue(
+            ChangeLog.objects.filter(kind=ChangeLog.PLACE, object_id=dup_id, deleted=True).exists()
+        )
+
+    def test_sin_merge_solo_lista(self):
+        call_command("find_duplicate_places", stdout=io.StringIO())
+        self.assertTrue(Place.objects.filter(pk=self.dup.pk).exists())
+
+    def test_aviso_en_admin(self):
+        admin = User.objects.create_superuser("admin", "admin@test.com", "123456")
+        self.client.force_login(admin)
+        response = self.client.post(reverse("admin:core_place_add"), {
+            "name": "Metro Maipu",
+            "address": "",
+            "lat": "-33.510100",
+            "lng": "-70.757000",
+            "tags": "",
+        })
+        self.assertEqual(response.status_code, 302)
+        warnings = [str(m) for m in get_messages(response.wsgi_request)]
+        self.assertTrue(any("parece duplicado" in m and "Metro Maipú" in m for m in warnings))
@@ -0,0 +1,149 @@
+from datetime import timedelta
+from smtplib import SMTPServerDisconnected
+
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend as LocmemBackend
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .mail import drain_outbox
+from .models import OutboundEmail
+
+
+class FailingBackend(LocmemBackend):
+    def send_messages(self, messages):
+        raise ConnectionRefusedError("SMTP caído")
+
+
+class SpyBackend(LocmemBackend):
+    """Anota el estado de la fila en la BD en el momento del envío."""
+
+    def send_messages(self, messages):
+        self.seen = list(OutboundEmail.objects.values_list("status", flat=True))
+        return super().send_messages(messages)
+
+
+class SessionBackend(LocmemBackend):
+    """
+    Como el backend SMTP: sin sesión abierta, send_messages abre una solo
+    para ese envío. Cuenta las sesiones abiertas y falla con los asuntos
+    de `fail_subjects`.
+    """
+
+    def __init__(self, fail_subjects=(), **kwargs):
+        super().__init__(**kwargs)
+        self.fail_subjects = set(fail_subjects)
+        self.opens = 0
+        self.session = False
+
+    def open(self):
+        if self.session:
+            return False
+        self.opens += 1
+        self.session = True
+        return True
+
+    def close(self):
+        self.session = False
+
+    def send_messages(self, messages):
+        new_session = self.open()
+        try:
+            if messages[0].subject in self.fail_subjects:
+                raise SMTPServerDisconnected("Conexión cerrada")
+            return super().send_messages(messages)
+        finally:
+            if new_session:
+                self.close()
+
+
+@override_settings(
+    EMAIL_BACKEND="core.mail.OutboxEmailBackend",
+    OUTBOX_MAX_ATTEMPTS=2,
+    OUTBOX_BACKOFF_SECONDS=60,
+)
+class OutboxTest(TestCase):
+    """
+    Bandeja de salida:
+    - el formulario de contacto solo encola, no envía;
+    - drain_outbox entrega, reprograma con backoff y descarta tras N fallos;
+    - el lote se reclama ("sending" + lease) antes de hablar con SMTP;
+    - tras un fallo se reabre la sesión una vez para el resto del lote.
+    """
+
+    def test_contacto_encola(self):
+        response = self.client.post(reverse("contact"), {
+            "nombre": "Ana",
+            "email": "ana@test.com",
+            "tipo": "Sugerencia",
+            "mensaje": "Falta una rampa",
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(mail.outbox), 0)
+
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.status, OutboundEmail.PENDING)
+        self.assertIn("Falta una rampa", email.body)
+
+    def test_drain_entrega(self):
+        mail.send_mail("Hola", "Cuerpo", "no-reply@incluimap.local", ["a@test.com"])
+
+        counts = drain_outbox(connection=LocmemBackend())
+
+        self.assertEqual(counts["sent"], 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["a@test.com"])
+        self.assertEqual(OutboundEmail.objects.get().status, OutboundEmail.SENT)
+
+    def test_reintentos_y_dead_letter(self):
+        mail.send_mail("Hola", "Cuerpo", "no-reply@incluimap.local", ["a@test.com"])
+
+        counts = drain_outbox(connection=FailingBackend())
+        email = OutboundEmail.objects.get()
+        self.assertEqual(counts["failed"], 1)
+        self.assertEqual(email.status, OutboundEmail.PENDING)
+        self.assertIn("SMTP caído", email.last_error)
+        self.assertGreater(email.next_attempt_at, timezone.now())
+
+        # Todavía no le toca: el backoff lo deja fuera de este lote.
+        self.assertEqual(drain_outbox(connection=FailingBackend())["failed"], 0)
+
+        OutboundEmail.objects.update(next_attempt_at=timezone.now())
+        with self.assertLogs("core.mail", "ERROR"):
+            counts = drain_outbox(connection=FailingBackend())
+        self.assertEqual(counts["dead"], 1)
+        self.assertEqual(OutboundEmail.objects.get().status, OutboundEmail.DEAD)
+
+    def test_reclamo_con_lease(self):
+        mail.send_mail("Hola", "Cuerpo", "no-reply@incluimap.local", ["a@test.com"])
+        backend = SpyBackend()
+
+        drain_outbox(connection=backend)
+        # Mientras se enviaba, la fila ya estaba reclamada.
+        self.assertEqual(backend.seen, [OutboundEmail.SENDING])
+        self.assertEqual(OutboundEmail.objects.get().status, OutboundEmail.SENT)
+
+        # Un worker que murió deja la fila en "sending": otro no la toca
+        # hasta que vence el lease.
+        mail.send_mail("Otra", "Cuerpo", "no-reply@incluimap.local", ["b@test.com"])
+        OutboundEmail.objects.filter(status=OutboundEmail.PENDING).update(
+            status=OutboundEmail.SENDING, next_attempt_at=timezone.now() + timedelta(minutes=5)
+        )
+        self.assertEqual(drain_outbox(connection=LocmemBackend())["sent"], 0)
+
+        OutboundEmail.objects.filter(status=OutboundEmail.SENDING).update(next_attempt_at=timezone.now())
+        self.assertEqual(drain_outbox(connection=LocmemBackend())["sent"], 1)
+        self.assertFalse(OutboundEmail.objects.filter(status=OutboundEmail.SENDING).exists())
+
+    def test_reabre_una_vez_tras_fallo(self):
+        for subject in ("Falla", "Uno", "Dos", "Tres"):
+            mail.send_mail(subject, "Cuerpo", "no-reply@incluimap.local", ["a@test.com"])
+        backend = SessionBackend(fail_subjects={"Falla"})
+
+        counts = drain_outbox(connection=backend)
+
+        self.assertEqual((counts["sent"], counts["failed"]), (3, 1))
+        # La sesión del lote y una más tras el fallo, no una por correo.
+        self.assertEqual(backend.opens, 2)
+        self.assertEqual([m.subject for m in mail.outbox], ["Uno", "Dos", "Tres"])
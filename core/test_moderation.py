@@ -0,0 +1,156 @@
+import io
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from . import moderation
+from .models import ChangeLog, Comment, Flag, Notification, PlaceRefresh, Place, Report
+
+
+class ModerationTest(TestCase):
+    """
+    Denuncias y cola de moderación:
+    - denunciar dos veces lo mismo no duplica la denuncia;
+    - la cola se pagina por cursor y es solo para staff;
+    - ocultar y eliminar resuelven todas las denuncias del contenido con
+      consultas en bloque y dejan el recálculo de agregados encolado.
+    """
+
+    def setUp(self):
+        self.author = User.objects.create_user("autor", password="123456")
+        self.vecina = User.objects.create_user("vecina", password="123456")
+        self.otra = User.objects.create_user("otra", password="123456")
+        self.staff = User.objects.create_user("mod", password="123456", is_staff=True)
+        self.place = Place.objects.create(
+            name="Consultorio", lat=Decimal("-33.510000"), lng=Decimal("-70.757000")
+        )
+        self.report = Report.objects.create(
+            place=self.place, author=self.author, rating=1, description="Publicidad"
+        )
+        self.kept = Report.objects.create(place=self.place, author=self.author, rating=5)
+        self.comment = Comment.objects.create(report=self.kept, author=self.author, text="Insulto")
+
+    def flag_all(self):
+        self.client.force_login(self.vecina)
+        self.client.post(reverse("flag_report", args=[self.report.pk]), {"reason": Flag.SPAM})
+        self.client.post(reverse("flag_comment", args=[self.comment.pk]), {"reason": Flag.OFFENSIVE})
+        moderation.flag_content(self.otra, report=self.report)
+        return list(Flag.objects.order_by("id"))
+
+    def test_denuncia_sin_duplicar(self):
+        self.client.force_login(self.vecina)
+        url = reverse("flag_report", args=[self.report.pk])
+        self.client.post(url, {"reason": Flag.SPAM, "note": "Es un aviso"})
+        response = self.client.post(url, {"reason": "inventado"})
+        self.assertRedirects(response, reverse("report_detail", args=[self.report.pk]))
+
+        flag = Flag.objects.get()
+        self.assertEqual((flag.kind, flag.reason, flag.note), (Flag.REPORT, Flag.SPAM, "Es un aviso"))
+        self.assertEqual(flag.status, Flag.PENDING)
+
+    def test_cola_por_cursor(self):
+        flags = self.flag_all()
+        first, after = moderation.pending_queue(limit=2)
+        self.assertEqual(first, flags[:2])
+        rest, after = moderation.pending_queue(after=after, limit=2)
+        self.assertEqual(rest, flags[2:])
+        self.assertIsNone(after)
+
+        self.client.force_login(self.vecina)
+        self.assertEqual(self.client.get(reverse("moderation")).status_code, 302)
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse("moderation"))
+        self.assertContains(response, "Publicidad")
+        self.assertContains(response, "Insulto")
+
+    def test_ocultar_en_bloque(self):
+        flags = self.flag_all()
+        self.client.force_login(self.staff)
+        summary_url = reverse("place_detail_api", args=[self.place.pk])
+        self.assertEqual(self.client.get(summary_url).json()["aggregates"]["reports_count"], 2)
+        # Se selecciona una sola denuncia del reporte: la de "otra" también se cierra.
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("moderation"), {
+                "action": "hide", "flags": [flags[0].pk, flags[1].pk],
+            })
+        self.assertEqual(response.status_code, 302)
+
+        self.assertFalse(Flag.objects.filter(status=Flag.PENDING).exists())
+        self.assertEqual(
+            set(Flag.objects.values_list("status", "resolved_by")), {(Flag.HIDDEN, self.staff.pk)}
+        )
+        report = Report.all_objects.get(pk=self.report.pk)
+        self.assertEqual(report.deleted_by, self.staff)
+        self.assertIsNotNone(Comment.all_objects.get(pk=self.comment.pk).hidden_at)
+        self.assertFalse(self.kept.comments.exists())
+        self.assertTrue(
+            ChangeLog.objects.filter(kind=ChangeLog.REPORT, object_id=self.report.pk, deleted=True).exists()
+        )
+
+        # El resumen cacheado se borró al confirmar; el recálculo queda
+        # encolado hasta que corre el worker.
+        self.assertEqual(self.client.get(summary_url).json()["aggregates"]["reports_count"], 1)
+        self.assertEqual(list(PlaceRefresh.objects.values_list("place_id", flat=True)), [self.place.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("refresh_place_aggregates", stdout=io.StringIO())
+        self.assertFalse(PlaceRefresh.objects.exists())
+        self.assertTrue(ChangeLog.objects.filter(kind=ChangeLog.PLACE, object_id=self.place.pk).exists())
+
+        data = self.client.get(reverse("place_detail_api", args=[self.place.pk])).json()
+        self.assertEqual(data["aggregates"]["reports_count"], 1)
+        self.assertEqual([r["comments_count"] for r in data["reports"]], [0])
+
+    def test_eliminar_y_aprobar(self):
+        fan = User.objects.create_user("fan", password="123456")
+        fan.profile.favorite_places.add(self.place)
+        spam = Report.objects.create(place=self.place, author=self.author, rating=1)
+        reply = Comment.objects.create(report=spam, author=self.vecina, text="Otra vez")
+        self.report = spam
+        flags = self.flag_all()
+        report_id = self.report.pk
+        moderation.apply_action("approve", [flags[1].pk], self.staff)
+        self.assertTrue(Comment.objects.filter(pk=self.comment.pk).exists())
+
+        moderation.flag_content(self.otra, comment=reply)
+
+        # Savepoint, SELECT y UPDATE de denuncias, notificaciones retiradas
+        # (SELECT, DELETE, recuento), fotos, denuncias en NULL (2 UPDATE),
+        # 2 DELETE, tombstones, cola, release: no depende de cuántas
+        # denuncias, reportes o comentarios haya.
+        with self.assertNumQueries(14), self.captureOnCommitCallbacks(execute=True):
+            result = moderation.apply_action("delete", [flags[0].pk], self.staff)
+        self.assertEqual(result, {"flags": 3, "reports": 1, "comments": 0})
+        self.assertFalse(Report.all_objects.filter(pk=report_id).exists())
+        self.assertFalse(Comment.all_objects.filter(pk=reply.pk).exists())
+        self.assertTrue(Comment.objects.filter(pk=self.comment.pk).exists())
+        self.assertTrue(
+            ChangeLog.objects.filter(kind=ChangeLog.REPORT, object_id=report_id, deleted=True).exists()
+        )
+        # La notificación del seguidor se fue con el reporte y el badge se corrigió.
+        self.assertFalse(Notification.objects.filter(user=fan).exists())
+        fan.profile.refresh_from_db()
+        self.assertEqual(fan.profile.unread_notifications, 0)
+        # Las denuncias quedan como historial, también la del comentario
+        # que se fue con el reporte.
+        self.assertEqual(
+            list(Flag.objects.order_by("id").values_list("status", "report_id", "comment_id")),
+            [
+                (Flag.DELETED, None, None), (Flag.APPROVED, None, self.comment.pk),
+                (Flag.DELETED, None, None), (Flag.DELETED, None, None),
+            ],
+        )
+
+    def test_admin_con_conteo_estimado(self):
+        self.flag_all()
+        admin = User.objects.create_superuser("admin", "admin@test.com", "123456")
+        self.client.force_login(admin)
+        with mock.patch("core.admin.estimated_row_count", return_value=2_000_000):
+            for name in ("comment", "notification", "flag", "report"):
+                response = self.client.get(reverse(f"admin:core_{name}_changelist"))
+                self.assertContains(response, "2000000")
+            filtered = self.client.get(reverse("admin:core_flag_changelist"), {"status__exact": "pending"})
+        self.assertNotContains(filtered, "2000000")
@@ -0,0 +1,126 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.contrib.auth.models import User
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from .db.pool import ConnectionPool, PoolTimeout, close_all_pools
+
+
+class ConnectionPoolTest(SimpleTestCase):
+    """
+    Pruebas del pool en sí, con conexiones sqlite3 reales:
+    - reutiliza conexiones liberadas;
+    - respeta max_size y falla con PoolTimeout;
+    - registra esperas cuando otro hilo libera una conexión.
+    """
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(fd)
+        self.addCleanup(os.remove, self.path)
+
+    def factory(self):
+        return sqlite3.connect(self.path, check_same_thread=False)
+
+    def test_reutiliza_conexiones(self):
+        pool = ConnectionPool(max_size=2)
+        conn = pool.checkout(self.factory)
+        pool.release(conn)
+        again = pool.checkout(self.factory)
+
+        self.assertIs(conn, again)
+        stats = pool.stats()
+        self.assertEqual(stats["created"], 1)
+        self.assertEqual(stats["checkouts"], 2)
+        self.assertEqual(stats["in_use"], 1)
+
+    def test_timeout_si_esta_lleno(self):
+        pool = ConnectionPool(max_size=1, timeout=0.05)
+        pool.checkout(self.factory)
+
+        with self.assertRaises(PoolTimeout):
+            pool.checkout(self.factory)
+        self.assertEqual(pool.stats()["timeouts"], 1)
+
+    def test_espera_a_que_se_libere(self):
+        pool = ConnectionPool(max_size=1, timeout=2)
+        conn = pool.checkout(self.factory)
+
+        def liberar():
+            time.sleep(0.05)
+            pool.release(conn)
+
+        threading.Thread(target=liberar).start()
+        again = pool.checkout(self.factory)
+
+        self.assertIs(conn, again)
+        stats = pool.stats()
+        self.assertEqual(stats["waits"], 1)
+        self.assertGreater(stats["wait_time_max_ms"], 0)
+
+    def test_descarta_conexiones_rotas(self):
+        pool = ConnectionPool(max_size=1, check_after=0)
+        conn = pool.checkout(self.factory)
+        conn.close()
+        pool.release(conn)
+
+        again = pool.checkout(self.factory)
+        self.assertIsNot(conn, again)
+        self.assertEqual(pool.stats()["discarded"], 1)
+
+
+class PooledBackendTest(SimpleTestCase):
+    """
+    El backend core.db.backends.sqlite3 devuelve la conexión al pool al
+    cerrarla, y la siguiente apertura reutiliza la misma conexión.
+    """
+
+    def setUp(self):
+        fd, path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        self.addCleanup(close_all_pools)
+        self.handler = ConnectionHandler({
+            "default": {
+                "ENGINE": "core.db.backends.sqlite3",
+                "NAME": path,
+                "POOL": {"MAX_SIZE": 2},
+            }
+        })
+
+    def test_close_devuelve_al_pool(self):
+        conn = self.handler["default"]
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        raw = conn.connection
+        conn.close()
+
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        self.assertIs(conn.connection, raw)
+
+        stats = conn.pool.stats()
+        self.assertEqual(stats["created"], 1)
+        self.assertEqual(stats["checkouts"], 2)
+        conn.close()
+        self.assertEqual(conn.pool.stats()["idle"], 1)
+
+
+class MetricsAPITest(TestCase):
+    def test_solo_staff(self):
+        url = reverse("metrics_api")
+        user = User.objects.create_user("normal", password="123456")
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        user.is_staff = True
+        user.save()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("db_pools", response.json())
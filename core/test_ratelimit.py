@@ -0,0 +1,94 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from . import metrics
+from .models import Place, Report
+from .checks import check_rate_limits, check_shared_caches
+from .ratelimit import hit, parse_rate
+
+
+class RateAlgorithmTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate("10/m"), (10, 60))
+        self.assertEqual(parse_rate("3/hour"), (3, 3600))
+        for rate in ("10/", "10/x", "x/m", "0/m", "10"):
+            with self.assertRaises(ValueError):
+                parse_rate(rate)
+
+    def test_ventana_deslizante(self):
+        # 3 por minuto, empezando justo al inicio de una ventana.
+        t0 = 6000.0
+        for _ in range(3):
+            self.assertTrue(hit("t", "ip:1", 3, 60, now=t0)[0])
+        allowed, retry = hit("t", "ip:1", 3, 60, now=t0 + 1)
+        self.assertFalse(allowed)
+        self.assertEqual(retry, 59)
+        # Insistir durante el bloqueo no suma al contador.
+        for _ in range(5):
+            self.assertFalse(hit("t", "ip:1", 3, 60, now=t0 + 2)[0])
+        self.assertEqual(cache.get("ratelimit:t:ip:1:100"), 3)
+
+        # A mitad de la ventana siguiente todavía pesa la mitad de la
+        # anterior (3 * 0.5 = 1.5), así que queda espacio para una sola más.
+        self.assertTrue(hit("t", "ip:1", 3, 60, now=t0 + 90)[0])
+        self.assertFalse(hit("t", "ip:1", 3, 60, now=t0 + 90)[0])
+
+        # Otro cliente tiene su propio contador.
+        self.assertTrue(hit("t", "ip:2", 3, 60, now=t0 + 1)[0])
+
+
+class RateLimitChecksTest(SimpleTestCase):
+    """Los checks de arranque: caché compartida con DEBUG=False y límites legibles."""
+
+    @override_settings(DEBUG=False, RATE_LIMIT_ENABLED=True, RATE_LIMIT_CACHE="default",
+                       REPLICA_READS=False)
+    def test_cache_por_proceso_falla(self):
+        self.assertEqual([e.id for e in check_shared_caches(None)], ["core.E002"])
+        with override_settings(DEBUG=True):
+            self.assertEqual(check_shared_caches(None), [])
+        with override_settings(RATE_LIMIT_CACHE="no-existe"):
+            self.assertEqual([e.id for e in check_shared_caches(None)], ["core.E001"])
+        with override_settings(CACHES={"default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "cache",
+        }}):
+            self.assertEqual(check_shared_caches(None), [])
+
+    @override_settings(RATE_LIMITS={"report": "10/m", "contact": "10/", "flag_report": "10/x"})
+    def test_limites_invalidos(self):
+        errors = check_rate_limits(None)
+        self.assertEqual([e.id for e in errors], ["core.E003", "core.E003"])
+        self.assertIn("'contact'", errors[0].msg)
+
+
+@override_settings(RATE_LIMIT_ENABLED=True, RATE_LIMITS={"report_detail": "2/m"})
+class RateLimitMiddlewareTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        self.user = User.objects.create_user("spammer", password="123456")
+        place = Place.objects.create(
+            name="Plaza", lat=Decimal("-33.520000"), lng=Decimal("-70.770000")
+        )
+        self.report = Report.objects.create(place=place, author=self.user, rating=3)
+        self.client.force_login(self.user)
+
+    def test_comentarios_limitados_por_usuario(self):
+        url = reverse("report_detail", args=[self.report.pk])
+        for _ in range(2):
+            self.assertEqual(self.client.post(url, {"text": "hola"}).status_code, 302)
+
+        response = self.client.post(url, {"text": "hola"})
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response["Retry-After"]), 1)
+        self.assertEqual(self.report.comments.count(), 2)
+        self.assertEqual(metrics.get("ratelimit.throttled.report_detail"), 1)
+
+        # Solo se limitan los POST.
+        self.assertEqual(self.client.get(url).status_code, 200)
@@ -0,0 +1,102 @@
+import unittest
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, RequestFactory, override_settings
+from django.urls import reverse
+
+from .models import Place, Report
+from .checks import check_shared_caches
+from .routers import ReplicaRouter, read_from_replica, is_pinned_to_primary
+
+
+def _replica_separada():
+    replica = settings.DATABASES.get("replica")
+    return bool(replica) and not replica.get("TEST", {}).get("MIRROR")
+
+
+# Con DATABASE_REPLICA_ALIAS='default' se puede probar la lógica del router
+# sin una segunda BD: lo que importa es cuándo devuelve el alias y cuándo None.
+@override_settings(DATABASE_REPLICA_ALIAS="default", REPLICA_READS=True)
+class ReplicaRouterTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.router = ReplicaRouter()
+        self.user = User.objects.create_user("lector", password="123456")
+
+    def test_solo_lee_de_replica_dentro_de_vistas_marcadas(self):
+        self.assertIsNone(self.router.db_for_read(Place))
+
+        seen = {}
+
+        @read_from_replica
+        def vista(request):
+            seen["db"] = self.router.db_for_read(Place)
+
+        request = RequestFactory().get("/")
+        request.user = self.user
+        vista(request)
+
+        self.assertEqual(seen["db"], "default")
+        self.assertIsNone(self.router.db_for_read(Place))
+        self.assertEqual(self.router.db_for_write(Place), "default")
+
+    def test_escribir_reporte_fija_al_primario(self):
+        place = Place.objects.create(
+            name="Plaza", lat=Decimal("-33.520000"), lng=Decimal("-70.770000")
+        )
+        self.assertFalse(is_pinned_to_primary(self.user))
+
+        Report.objects.create(place=place, author=self.user, rating=4)
+
+        self.assertTrue(is_pinned_to_primary(self.user))
+
+    def test_favorito_fija_al_primario(self):
+        place = Place.objects.create(
+            name="Plaza", lat=Decimal("-33.520000"), lng=Decimal("-70.770000")
+        )
+        self.user.profile.favorite_places.add(place)
+        self.assertTrue(is_pinned_to_primary(self.user))
+
+    @override_settings(DEBUG=False, RATE_LIMIT_ENABLED=False, REPLICA_PIN_CACHE="default")
+    def test_pin_exige_cache_compartida(self):
+        # Con una caché por proceso el pin no se ve desde los demás workers.
+        self.assertEqual([e.id for e in check_shared_caches(None)], ["core.E002"])
+        with override_settings(REPLICA_READS=False):
+            self.assertEqual(check_shared_caches(None), [])
+
+
+@unittest.skipUnless(_replica_separada(), "Requiere una réplica SQLite separada (DB_REPLICA_NAME).")
+@override_settings(REPLICA_READS=True)
+class ReplicaRoutingIntegrationTest(TestCase):
+    """
+    Con dos BDs SQLite separadas (DB_ENGINE=sqlite DB_REPLICA_NAME=...):
+    lo escrito en 'default' no aparece en la réplica, así que se puede ver
+    a qué BD fue cada lectura.
+    """
+    databases = {"default", "replica"} if _replica_separada() else {"default"}
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("ana", password="123456")
+        self.place = Place.objects.create(
+            name="Metro Maipú", lat=Decimal("-33.510000"), lng=Decimal("-70.757000")
+        )
+
+    def test_places_api_lee_de_replica(self):
+        response = self.client.get(reverse("places_api"))
+        self.assertEqual(response.json()["places"], [])
+
+    def test_read_your_writes_tras_reportar(self):
+        self.client.force_login(self.user)
+        self.client.post(reverse("report"), {
+            "place": self.place.pk,
+            "rating": "4",
+            "description": "Ascensor operativo",
+        })
+
+        response = self.client.get(reverse("places_api"))
+        names = [p["name"] for p in response.json()["places"]]
+        self.assertEqual(names, ["Metro Maipú"])
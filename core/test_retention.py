@@ -0,0 +1,171 @@
+import io
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import ChangeLog, Comment, Notification, NotificationArchive, Place, Report
+from .retention import partition_statements, prune_notifications, purge_deleted_reports
+
+
+class PruneNotificationsTest(TestCase):
+    """
+    Solo se archivan las notificaciones leídas anteriores al corte, en
+    lotes, y --delete las borra sin archivarlas.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user("ana", password="123456")
+        self.place = Place.objects.create(
+            name="Plaza", lat=Decimal("-33.520000"), lng=Decimal("-70.770000")
+        )
+        old = timezone.now() - timedelta(days=120)
+        self.old_read = [self.notify(old, True, i) for i in range(5)]
+        self.old_unread = self.notify(old, False, "no leída")
+        self.recent_read = self.notify(timezone.now(), True, "reciente")
+
+    def notify(self, created_at, is_read, label):
+        n = Notification.objects.create(
+            user=self.user, place=self.place, message=f"Aviso {label}", is_read=is_read
+        )
+        Notification.objects.filter(pk=n.pk).update(created_at=created_at)
+        return n
+
+    def test_archiva_en_lotes(self):
+        cutoff = timezone.now() - timedelta(days=90)
+        # 2 lotes completos + uno parcial; cada uno: savepoint, SELECT,
+        # INSERT, DELETE, release.
+        with self.assertNumQueries(5 * 3):
+            moved = prune_notifications(cutoff, batch_size=2)
+
+        self.assertEqual(moved, 5)
+        remaining = set(Notification.objects.values_list("pk", flat=True))
+        self.assertEqual(remaining, {self.old_unread.pk, self.recent_read.pk})
+
+        archived = NotificationArchive.objects.order_by("original_id")
+        self.assertEqual(
+            [a.original_id for a in archived], [n.pk for n in self.old_read]
+        )
+        first = archived[0]
+        self.assertEqual(first.user_id, self.user.pk)
+        self.assertEqual(first.place_id, self.place.pk)
+        self.assertEqual(first.message, "Aviso 0")
+
+    def test_comando_delete(self):
+        call_command("prune_notifications", "--days=90", "--delete", stdout=io.StringIO())
+        self.assertEqual(Notification.objects.count(), 2)
+        self.assertFalse(NotificationArchive.objects.exists())
+
+    def test_borrar_usuario_borra_archivo(self):
+        prune_notifications(timezone.now() - timedelta(days=90))
+        self.user.delete()
+        self.assertFalse(NotificationArchive.objects.exists())
+
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class SoftDeleteReportTest(TestCase):
+    """
+    Eliminar un reporte solo lo marca: desaparece de listados y agregados
+    de inmediato, y purge_deleted_reports lo borra (con sus comentarios)
+    pasado el plazo.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user("ana", password="123456")
+        self.fan = User.objects.create_user("fan", password="123456")
+        self.place = Place.objects.create(
+            name="Plaza", lat=Decimal("-33.520000"), lng=Decimal("-70.770000")
+        )
+        self.fan.profile.favorite_places.add(self.place)
+        self.report = Report.objects.create(place=self.place, author=self.user, rating=1)
+        self.kept = Report.objects.create(place=self.place, author=self.user, rating=5)
+        Comment.objects.create(report=self.report, author=self.user, text="Sigue igual")
+        self.client.force_login(self.user)
+
+    def test_eliminar_oculta(self):
+        # La notificación agrupada del seguidor apunta al reporte a eliminar.
+        Notification.objects.filter(user=self.fan).update(report=self.report)
+        seq = self.client.get(reverse("sync_api")).json()["seq"]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("report_delete", args=[self.report.pk]))
+        self.assertEqual(response.status_code, 302)
+
+        self.report = Report.all_objects.get(pk=self.report.pk)
+        self.assertIsNotNone(self.report.deleted_at)
+        # La notificación al seguidor desaparece y el badge vuelve a cero.
+        self.assertFalse(Notification.objects.filter(report_id=self.report.pk).exists())
+        self.fan.profile.refresh_from_db()
+        self.assertEqual(self.fan.profile.unread_notifications, 0)
+        self.assertEqual(self.report.deleted_by, self.user)
+        self.assertTrue(Comment.objects.filter(report_id=self.report.pk).exists())
+
+        self.assertEqual(
+            self.client.get(reverse("report_detail", args=[self.report.pk])).status_code, 404
+        )
+        listed = self.client.get(reverse("reports")).context["reports"]
+        self.assertEqual([r.pk for r in listed], [self.kept.pk])
+
+        place = next(p for p in self.client.get(reverse("places_api")).json()["places"]
+                     if p["id"] == self.place.pk)
+        self.assertEqual(place["avg_rating"], 5)
+
+        delta = self.client.get(reverse("sync_api"), {"since": seq}).json()
+        self.assertEqual(delta["deleted"]["reports"], [self.report.pk])
+        updated = next(p for p in delta["places"] if p["id"] == self.place.pk)
+        self.assertEqual(updated["reports_count"], 1)
+
+    def test_purga_en_lotes(self):
+        old = timezone.now() - timedelta(days=40)
+        extra = [
+            Report.objects.create(place=self.place, author=self.user, rating=3)
+            for _ in range(2)
+        ]
+        for report in [self.report, *extra]:
+            report.soft_delete(by=self.user)
+        Report.all_objects.filter(pk__in=[self.report.pk, extra[0].pk]).update(deleted_at=old)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            purged = purge_deleted_reports(timezone.now() - timedelta(days=30), batch_size=1)
+        self.assertEqual(purged, 2)
+        self.assertEqual(
+            set(Report.all_objects.values_list("pk", flat=True)), {self.kept.pk, extra[1].pk}
+        )
+        self.assertFalse(Comment.objects.filter(report_id=self.report.pk).exists())
+        self.assertTrue(
+            ChangeLog.objects.filter(kind=ChangeLog.REPORT, object_id=self.report.pk, deleted=True).exists()
+        )
+
+        call_command("purge_deleted_reports", "--days=0", stdout=io.StringIO())
+        self.assertEqual(list(Report.all_objects.values_list("pk", flat=True)), [self.kept.pk])
+
+
+class ArchivePartitionSQLTest(TestCase):
+    """SQL de particiones mensuales del archivo (solo se ejecuta en MySQL)."""
+
+    def test_particion_inicial(self):
+        [sql] = partition_statements([], date(2026, 10, 19), months_ahead=2,
+                                     first_month=date(2026, 8, 3))
+        self.assertIn("ADD PRIMARY KEY (id, created_at)", sql)
+        self.assertIn("PARTITION BY RANGE (TO_DAYS(created_at))", sql)
+        for name, bound in [("p202608", "2026-09-01"), ("p202612", "2027-01-01")]:
+            self.assertIn(f"PARTITION {name} VALUES LESS THAN (TO_DAYS('{bound}'))", sql)
+        self.assertNotIn("p202701", sql)
+        self.assertTrue(sql.endswith("PARTITION pmax VALUES LESS THAN MAXVALUE)"))
+
+    def test_agrega_meses_y_elimina_antiguos(self):
+        existing = ["p202607", "p202608", "p202609", "p202610", "p202611", "pmax"]
+        reorganize, drop = partition_statements(
+            existing, date(2026, 10, 19), months_ahead=2, keep_months=3
+        )
+        self.assertIn("REORGANIZE PARTITION pmax INTO (PARTITION p202612", reorganize)
+        self.assertTrue(drop.endswith("DROP PARTITION p202607"))
+
+    def test_al_dia(self):
+        existing = ["p202610", "p202611", "pmax"]
+        self.assertEqual(
+            partition_statements(existing, date(2026, 10, 19), months_ahead=1), []
+        )
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+
+class IncluiMapTestRunner(DiscoverRunner):
+    """
+    Runner de tests del proyecto. Desactiva el ruteo de lecturas a la
+    réplica y el límite de peticiones: los tests que los necesitan los
+    activan con override_settings(REPLICA_READS=True) o
+    override_settings(RATE_LIMIT_ENABLED=True).
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        settings.REPLICA_READS = False
+        settings.RATE_LIMIT_ENABLED = False
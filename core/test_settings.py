@@ -0,0 +1,26 @@
+import importlib
+
+from django.test import SimpleTestCase
+
+
+class ProductionSettingsTest(SimpleTestCase):
+    """El perfil de producción carga y activa WhiteNoise, plantillas cacheadas y DEBUG=False."""
+
+    def test_settings_production(self):
+        prod = importlib.import_module("config.settings_production")
+
+        self.assertFalse(prod.DEBUG)
+        self.assertTrue(prod.SECRET_KEY)
+        self.assertIn("whitenoise.middleware.WhiteNoiseMiddleware", prod.MIDDLEWARE)
+        self.assertEqual(
+            prod.MIDDLEWARE.index("whitenoise.middleware.WhiteNoiseMiddleware"),
+            prod.MIDDLEWARE.index("django.middleware.security.SecurityMiddleware") + 1,
+        )
+        self.assertEqual(
+            prod.STORAGES["staticfiles"]["BACKEND"],
+            "whitenoise.storage.CompressedManifestStaticFilesStorage",
+        )
+        loaders = prod.TEMPLATES[0]["OPTIONS"]["loaders"]
+        self.assertEqual(loaders[0][0], "django.template.loaders.cached.Loader")
+        self.assertFalse(prod.TEMPLATES[0]["APP_DIRS"])
+        self.assertIn("default", prod.CACHES)
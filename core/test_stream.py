@@ -0,0 +1,131 @@
+import asyncio
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .models import Place, Profile, Report, Notification
+from .pubsub import Broker
+
+
+class BrokerTest(TestCase):
+    async def test_publica_solo_al_usuario_suscrito(self):
+        b = Broker()
+        with b.subscribe(1) as q1, b.subscribe(2) as q2:
+            self.assertEqual(b.publish(1, {"type": "read"}), 1)
+            event = await asyncio.wait_for(q1.get(), 1)
+            self.assertEqual(event, {"type": "read"})
+            self.assertTrue(q2.empty())
+        self.assertEqual(b.subscriber_count(), 0)
+
+
+@override_settings(SSE_HEARTBEAT_SECONDS=0.05, SSE_POLL_SECONDS=0.05)
+class NotificationStreamTest(TestCase):
+    """
+    El stream SSE entrega primero el contador de no leídas y luego cada
+    notificación nueva generada por el fan-out de favoritos. Al reconectar
+    reenvía las agrupadas después del cursor aunque su id sea antiguo. Lo
+    escrito en otro proceso llega por el relay; por WSGI no hay stream y la
+    página consulta notifications_poll.
+    """
+
+    def setUp(self):
+        self.follower = User.objects.create_user("sigue", password="123456")
+        self.author = User.objects.create_user("autor", password="123456")
+        self.place = Place.objects.create(
+            name="Metro Maipú", lat=Decimal("-33.510000"), lng=Decimal("-70.757000")
+        )
+        self.follower.profile.favorite_places.add(self.place)
+
+    async def test_requiere_login(self):
+        response = await self.async_client.get(reverse("notifications_stream"))
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.post(reverse("notifications_stream"))
+        self.assertEqual(response.status_code, 405)
+
+    async def test_stream_entrega_notificaciones(self):
+        await self.async_client.aforce_login(self.follower)
+        response = await self.async_client.get(reverse("notifications_stream"))
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+
+        stream = aiter(response.streaming_content)
+        first = (await anext(stream)).decode()
+        self.assertIn("event: unread", first)
+        self.assertIn('"count": 0', first)
+
+        # TestCase envuelve todo en una transacción: on_commit se ejecuta
+        # con captureOnCommitCallbacks.
+        def reportar():
+            with self.captureOnCommitCallbacks(execute=True):
+                Report.objects.create(place=self.place, author=self.author, description="Rampa rota")
+
+        await sync_to_async(reportar)()
+
+        chunk = (await anext(stream)).decode()
+        while chunk.startswith(":"):
+            chunk = (await anext(stream)).decode()
+        self.assertIn("event: notification", chunk)
+        self.assertIn("Metro Maipú", chunk)
+
+        notification = await Notification.objects.aget(user=self.follower)
+        self.assertIn(f"id: {notification.created_at.isoformat()}", chunk)
+
+        chunk = (await anext(stream)).decode()
+        self.assertIn('"count": 1', chunk)
+        await stream.aclose()
+
+    async def test_relay_entrega_lo_de_otro_proceso(self):
+        await self.async_client.aforce_login(self.follower)
+        response = await self.async_client.get(reverse("notifications_stream"))
+        stream = aiter(response.streaming_content)
+        self.assertIn('"count": 0', (await anext(stream)).decode())
+
+        # Como si la escribiera un worker WSGI: sin publish en este proceso.
+        await Notification.objects.acreate(
+            user=self.follower, place=self.place, message="Nuevo reporte en Metro Maipú"
+        )
+        await Profile.objects.filter(user=self.follower).aupdate(unread_notifications=1)
+
+        chunk = (await anext(stream)).decode()
+        while chunk.startswith(":"):
+            chunk = (await anext(stream)).decode()
+        self.assertIn("event: notification", chunk)
+        self.assertIn('"count": 1', (await anext(stream)).decode())
+        await stream.aclose()
+
+    def reportar(self, n=1):
+        with self.captureOnCommitCallbacks(execute=True):
+            for _ in range(n):
+                Report.objects.create(place=self.place, author=self.author)
+        return Notification.objects.get(user=self.follower)
+
+    async def test_reconexion_reenvia_agrupada(self):
+        first = await sync_to_async(self.reportar)()
+        cursor = first.created_at.isoformat()
+        updated = await sync_to_async(self.reportar)()
+        self.assertEqual((updated.pk, updated.count), (first.pk, 2))
+
+        await self.async_client.aforce_login(self.follower)
+        response = await self.async_client.get(
+            reverse("notifications_stream"), headers={"Last-Event-ID": cursor}
+        )
+        stream = aiter(response.streaming_content)
+        chunk = (await anext(stream)).decode()
+        self.assertIn("event: notification", chunk)
+        self.assertIn('"count": 2', chunk)
+        self.assertIn(f"id: {updated.created_at.isoformat()}", chunk)
+        await stream.aclose()
+
+    def test_wsgi_sin_stream_y_consulta(self):
+        self.client.force_login(self.follower)
+        self.assertEqual(self.client.get(reverse("notifications_stream")).status_code, 204)
+
+        url = reverse("notifications_poll")
+        cursor = self.client.get(url).json()["cursor"]
+        notification = self.reportar(2)
+        data = self.client.get(url, {"since": cursor}).json()
+        self.assertEqual([n["id"] for n in data["notifications"]], [notification.pk])
+        self.assertEqual(data["unread"], 1)
+        self.assertEqual(self.client.get(url, {"since": "ayer"}).status_code, 400)
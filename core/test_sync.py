@@ -0,0 +1,83 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import ChangeLog, Place, Report
+from .retention import prune_changelog
+
+
+@override_settings(SYNC_SETTLE_SECONDS=0)
+class SyncAPITest(TestCase):
+    """
+    Snapshot + deltas de /api/sync/:
+    - el snapshot trae los lugares con sus agregados y un seq;
+    - el delta trae solo lo cambiado desde ese seq, con tombstones;
+    - un seq desconocido o ya podado fuerza un snapshot con reset;
+    - las entradas se anotan al confirmar la transacción, no antes.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user("voluntario", password="123456")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.place = Place.objects.create(
+                name="Consultorio", lat=Decimal("-33.510000"), lng=Decimal("-70.757000")
+            )
+        self.url = reverse("sync_api")
+
+    def test_snapshot_y_delta(self):
+        snap = self.client.get(self.url).json()
+        self.assertEqual([p["id"] for p in snap["places"]], [self.place.pk])
+        seq = snap["seq"]
+
+        # Sin cambios, el delta viene vacío y con el mismo seq.
+        delta = self.client.get(self.url, {"since": seq}).json()
+        self.assertEqual(delta["seq"], seq)
+        self.assertEqual(delta["places"], [])
+
+        logged = ChangeLog.objects.count()
+        with self.captureOnCommitCallbacks(execute=True):
+            report = Report.objects.create(place=self.place, author=self.user, rating=4)
+            other = Place.objects.create(
+                name="Biblioteca", lat=Decimal("-33.520000"), lng=Decimal("-70.770000")
+            )
+            # Hasta el commit no hay nada que entregar.
+            self.assertEqual(ChangeLog.objects.count(), logged)
+
+        delta = self.client.get(self.url, {"since": seq}).json()
+        self.assertGreater(delta["seq"], seq)
+        self.assertEqual(sorted(p["id"] for p in delta["places"]), sorted([self.place.pk, other.pk]))
+        updated = next(p for p in delta["places"] if p["id"] == self.place.pk)
+        self.assertEqual(updated["reports_count"], 1)
+        self.assertEqual([r["id"] for r in delta["reports"]], [report.pk])
+
+        seq = delta["seq"]
+        report_id, other_id = report.pk, other.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            report.delete()
+            other.delete()
+
+        delta = self.client.get(self.url, {"since": seq}).json()
+        self.assertEqual(delta["deleted"], {"places": [other_id], "reports": [report_id]})
+        self.assertEqual([p["id"] for p in delta["places"]], [self.place.pk])
+
+    def test_seq_desconocido_reinicia(self):
+        data = self.client.get(self.url, {"since": 10**9}).json()
+        self.assertTrue(data["reset"])
+        self.assertIn("places", data)
+        self.assertEqual(self.client.get(self.url, {"since": "x"}).status_code, 400)
+
+    def test_retencion_reinicia_clientes_atrasados(self):
+        seq = self.client.get(self.url).json()["seq"]
+        with self.captureOnCommitCallbacks(execute=True):
+            Report.objects.create(place=self.place, author=self.user, rating=4)
+        ChangeLog.objects.filter(seq__lte=seq).update(created_at=timezone.now() - timedelta(days=40))
+
+        self.assertEqual(prune_changelog(timezone.now() - timedelta(days=30), batch_size=1), 1)
+        self.assertFalse(ChangeLog.objects.filter(seq__lte=seq).exists())
+        # Quien ya tenía `seq` no se perdió nada; quien venía de antes sí.
+        self.assertNotIn("reset", self.client.get(self.url, {"since": seq}).json())
+        self.assertTrue(self.client.get(self.url, {"since": seq - 1}).json()["reset"])
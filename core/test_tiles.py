@@ -0,0 +1,217 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from . import tiles
+from .checks import check_leaflet_vendored
+from .templatetags import maps
+
+TILE = b"\x89PNG\r\n\x1a\n" + b"tesela" * 100
+
+
+class FakeTileServer:
+    """Servidor de teselas local: responde 200 con ETag o 304 si coincide."""
+
+    def __init__(self):
+        self.requests = []
+        self.down = False
+        outer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                outer.requests.append((self.path, self.headers.get("If-None-Match")))
+                if outer.down:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                etag = f'"{self.path}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", "image/png")
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(TILE)))
+                self.end_headers()
+                self.wfile.write(TILE)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}/{{z}}/{{x}}/{{y}}.png"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TileProxyTest(TestCase):
+    """
+    Proxy de teselas contra un servidor local:
+    - la primera petición descarga y las siguientes salen del disco;
+    - vencida, se revalida con If-None-Match (304 del origen);
+    - si el origen cae se sirve la copia vencida, y sin copia hay 502;
+    - el navegador puede revalidar con su ETag;
+    - fuera de TILE_BOUNDS o de los zoom permitidos hay 404 sin ir al origen;
+    - el desalojo corre en prune_tiles, no en las peticiones.
+    """
+
+    def setUp(self):
+        self.upstream = self.enterContext(FakeTileServer())
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir, ignore_errors=True)
+        self.enterContext(override_settings(
+            TILE_PROXY_ENABLED=True,
+            TILE_UPSTREAMS={"test": self.upstream.url},
+            TILE_CACHE_DIR=self.cache_dir,
+            TILE_CACHE_MAX_AGE=3600,
+        ))
+        self.enterContext(mock.patch.object(tiles, "_cache", None))
+        # Teselas de Maipú en zoom 12.
+        self.inside = tiles.tiles_for_bounds(*settings.TILE_BOUNDS, 12)
+
+    def get(self, z=12, x=None, y=None, **headers):
+        if x is None:
+            x, y = self.inside[0]
+        return self.client.get(reverse("tile", args=["test", z, x, y]), headers=headers)
+
+    def test_descarga_y_luego_cache(self):
+        first = self.get()
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(b"".join(first.streaming_content), TILE)
+        self.assertEqual(first["Content-Type"], "image/png")
+
+        second = self.get()
+        self.assertEqual(b"".join(second.streaming_content), TILE)
+        self.assertEqual(len(self.upstream.requests), 1)
+        x, y = self.inside[0]
+        self.assertTrue(os.path.exists(os.path.join(self.cache_dir, "test", "12", str(x), f"{y}.png")))
+
+    def test_revalida_al_vencer(self):
+        self.get()
+        with override_settings(TILE_CACHE_MAX_AGE=0), mock.patch.object(tiles, "_cache", None):
+            response = self.get()
+        self.assertEqual(b"".join(response.streaming_content), TILE)
+        x, y = self.inside[0]
+        self.assertEqual(self.upstream.requests[-1], (f"/12/{x}/{y}.png", f'"/12/{x}/{y}.png"'))
+
+    def test_origen_caido(self):
+        self.get()
+        self.upstream.down = True
+        with override_settings(TILE_CACHE_MAX_AGE=0), mock.patch.object(tiles, "_cache", None):
+            stale = self.get()
+            self.assertEqual(stale.status_code, 200)
+            self.assertEqual(self.get(x=self.inside[1][0], y=self.inside[1][1]).status_code, 502)
+
+    def test_etag_del_navegador(self):
+        etag = self.get()["ETag"]
+        response = self.get(if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_tesela_borrada_entre_get_y_open(self):
+        self.get()
+        real_get = tiles.TileCache.get
+        calls = []
+
+        def get_and_prune(cache, *args):
+            path, meta = real_get(cache, *args)
+            if not calls:
+                path.unlink()
+            calls.append(args)
+            return path, meta
+
+        with mock.patch.object(tiles.TileCache, "get", get_and_prune):
+            response = self.get()
+        self.assertEqual(b"".join(response.streaming_content), TILE)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(len(self.upstream.requests), 2)
+
+    def test_coordenadas_invalidas_y_desactivado(self):
+        self.assertEqual(self.get(z=2, x=4, y=0).status_code, 404)
+        # Fuera de Maipú o de los zoom permitidos: no es un proxy abierto.
+        x, y = self.inside[0]
+        self.assertEqual(self.get(x=x - 50, y=y).status_code, 404)
+        self.assertEqual(self.get(z=12, x=0, y=0).status_code, 404)
+        self.assertEqual(self.get(z=settings.TILE_MIN_ZOOM - 1, x=x // 4, y=y // 4).status_code, 404)
+        self.assertEqual(self.get(z=settings.TILE_MAX_ZOOM + 1, x=x << 8, y=y << 8).status_code, 404)
+        self.assertEqual(
+            self.client.get(reverse("tile", args=["otra", 1, 0, 0])).status_code, 404
+        )
+        with override_settings(TILE_PROXY_ENABLED=False):
+            self.assertEqual(self.get().status_code, 404)
+        self.assertEqual(self.upstream.requests, [])
+
+    def test_desalojo_lru(self):
+        cache = tiles.TileCache(self.cache_dir, max_bytes=len(TILE) * 100, max_age=3600)
+        paths = [cache.get("test", 5, x, 0)[0] for x in range(3)]
+        old = time.time() - 60
+        for path in paths:
+            os.utime(path, (old, old))
+        # Se vuelve a pedir la primera: las menos usadas son las otras dos.
+        cache.get("test", 5, 0, 0)
+
+        cache.max_bytes = len(TILE) * 2
+        self.assertEqual(cache.evict(), 2)
+        self.assertTrue(paths[0].exists())
+        for path in paths[1:]:
+            self.assertFalse(path.exists())
+            self.assertFalse(path.with_suffix(".json").exists())
+
+    def test_prune_tiles(self):
+        for x, y in self.inside[:3]:
+            self.get(x=x, y=y)
+        # Las peticiones no desalojan aunque la caché pase del límite.
+        with override_settings(TILE_CACHE_MAX_BYTES=len(TILE)), mock.patch.object(tiles, "_cache", None):
+            self.get(x=self.inside[3][0], y=self.inside[3][1])
+            self.assertEqual(len(list(Path(self.cache_dir).rglob("*.png"))), 4)
+            out = StringIO()
+            call_command("prune_tiles", stdout=out)
+        self.assertIn("4 teselas desalojadas", out.getvalue())
+        self.assertEqual(list(Path(self.cache_dir).rglob("*.png")), [])
+
+    def test_mapa_usa_el_proxy(self):
+        rendered = Template("{% load maps %}{% tile_layers %}").render(Context())
+        self.assertIn("/tiles/test/{z}/{x}/{y}.png", rendered)
+        with override_settings(TILE_PROXY_ENABLED=False):
+            rendered = Template("{% load maps %}{% tile_layers %}").render(Context())
+        self.assertIn(self.upstream.url, rendered)
+
+    def test_leaflet_sin_copia_local(self):
+        self.addCleanup(maps._vendored.cache_clear)
+        maps._vendored.cache_clear()
+        with mock.patch.object(maps.finders, "find", return_value=None):
+            self.assertEqual(
+                [e.id for e in check_leaflet_vendored(None)], ["core.E004", "core.E004"]
+            )
+            with self.assertRaises(ImproperlyConfigured):
+                Template("{% load maps %}{% leaflet_js %}").render(Context())
+            with override_settings(LEAFLET_CDN_FALLBACK=True):
+                self.assertEqual(check_leaflet_vendored(None), [])
+                rendered = Template("{% load maps %}{% leaflet_js %}").render(Context())
+                self.assertIn("unpkg.com", rendered)
+        maps._vendored.cache_clear()
+        self.assertEqual(check_leaflet_vendored(None), [])
@@ -1,11 +1,20 @@
+from datetime import datetime, timedelta
 from decimal import Decimal
+from unittest import mock
+from zoneinfo import ZoneInfo
 
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from django.contrib.auth.models import User
 from django.contrib.messages import get_messages
 
-from .models import Place, Report, Comment, Profile
+from .forms import ReportForm
+from .models import Place, Report, Comment, Profile, Notification
+from .retention import purge_deleted_reports
 
 
 class ReportDetailTest(TestCase):
@@ -104,6 +113,41 @@ class ToggleFavoriteTest(TestCase):
         self.assertNotIn(self.place, self.user.profile.favorite_places.all())
 
 
+class ProfileLifecycleTest(TestCase):
+    """
+    El Profile se crea una vez con el usuario; iniciar sesión o guardar el
+    usuario no lo vuelve a escribir, y las vistas lo leen junto con el
+    usuario (backend con select_related).
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user("ana", "a@test.com", "123456")
+
+    def test_se_crea_una_vez(self):
+        self.assertTrue(Profile.objects.filter(user=self.user).exists())
+        with self.assertNumQueries(1):
+            self.user.first_name = "Ana"
+            self.user.save()
+
+    def test_login_no_escribe_el_perfil(self):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.post(
+                reverse("login"), {"username": "ana", "password": "123456"}
+            )
+        self.assertEqual(response.status_code, 302)
+        profile_sql = [q["sql"] for q in captured if "core_profile" in q["sql"]]
+        self.assertEqual(profile_sql, [])
+
+    def test_vistas_leen_el_perfil_con_el_usuario(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse("favorites"))
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(self.client.get(reverse("favorites")).status_code, 200)
+        profile_sql = [q["sql"] for q in captured if 'FROM "core_profile"' in q["sql"]]
+        self.assertEqual(profile_sql, [])
+        self.assertFalse(any(q["sql"].startswith(("INSERT", "UPDATE")) for q in captured))
+
+
 class PlacesAPITest(TestCase):
     """
     Pruebas de caja blanca sobre el endpoint places_api:
@@ -142,3 +186,403 @@ class PlacesAPITest(TestCase):
         self.assertEqual(len(data["places"]), 1)
         self.assertEqual(data["places"][0]["tags"], "ascensor")
 
+    async def test_places_api_async_igual_a_sync(self):
+        """La versión async debe devolver exactamente lo mismo que la síncrona."""
+        url = reverse("places_api_async") + "?tags=ascensor"
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+        sync_response = await self.async_client.get(reverse("places_api") + "?tags=ascensor")
+        self.assertEqual(response.json(), sync_response.json())
+        self.assertEqual(len(response.json()["places"]), 1)
+
+
+class UnreadNotificationsBadgeTest(TestCase):
+    """
+    Contador de no leídas:
+    - el fan-out de un reporte en un favorito lo incrementa;
+    - el menú muestra el badge sin hacer COUNT(*) sobre Notification;
+    - notifications_view lo deja en cero al marcar como leídas.
+    """
+
+    def setUp(self):
+        self.client = Client()
+        self.follower = User.objects.create_user("sigue", "s@test.com", "123456")
+        self.author = User.objects.create_user("autor", "a@test.com", "123456")
+        self.place = Place.objects.create(
+            name="Metro Maipú",
+            lat=Decimal("-33.510000"),
+            lng=Decimal("-70.757000"),
+        )
+        self.follower.profile.favorite_places.add(self.place)
+        for _ in range(2):
+            Report.objects.create(place=self.place, author=self.author, rating=3)
+        self.client.login(username="sigue", password="123456")
+
+    def test_badge_y_reset(self):
+        # Los dos reportes del mismo lugar se agrupan en una notificación.
+        self.follower.profile.refresh_from_db()
+        self.assertEqual(self.follower.profile.unread_notifications, 1)
+
+        response = self.client.get(reverse("about"))
+        self.assertContains(response, 'class="nav-unread-badge"')
+
+        self.client.get(reverse("notifications"))
+        self.follower.profile.refresh_from_db()
+        self.assertEqual(self.follower.profile.unread_notifications, 0)
+
+        response = self.client.get(reverse("about"))
+        self.assertNotContains(response, 'class="nav-unread-badge"')
+
+    def test_borrados_en_cascada_descuentan(self):
+        # La purga de reportes se lleva la notificación no leída.
+        Report.all_objects.update(deleted_at=timezone.now() - timedelta(days=60))
+        purge_deleted_reports(timezone.now() - timedelta(days=30))
+        self.assertFalse(Notification.objects.exists())
+        self.follower.profile.refresh_from_db()
+        self.assertEqual(self.follower.profile.unread_notifications, 0)
+        self.assertNotContains(self.client.get(reverse("about")), 'class="nav-unread-badge"')
+
+        # Borrar el lugar también.
+        Report.objects.create(place=self.place, author=self.author, rating=3)
+        self.place.delete()
+        self.follower.profile.refresh_from_db()
+        self.assertEqual(self.follower.profile.unread_notifications, 0)
+
+    def test_la_pagina_corrige_un_contador_desfasado(self):
+        Profile.objects.filter(user=self.follower).update(unread_notifications=7)
+        self.client.get(reverse("notifications"))
+        self.follower.profile.refresh_from_db()
+        self.assertEqual(self.follower.profile.unread_notifications, 0)
+
+
+class NotificationCoalescingTest(TestCase):
+    """
+    Mientras la notificación de un lugar no se lee, los reportes nuevos se
+    suman a ella (count, último reporte); después de leerla se abre otra.
+    """
+
+    def setUp(self):
+        self.follower = User.objects.create_user("sigue", "s@test.com", "123456")
+        self.author = User.objects.create_user("autor", "a@test.com", "123456")
+        self.place = Place.objects.create(
+            name="Metro Maipú", lat=Decimal("-33.510000"), lng=Decimal("-70.757000")
+        )
+        self.other = Place.objects.create(
+            name="Plaza", lat=Decimal("-33.520000"), lng=Decimal("-70.770000")
+        )
+        self.follower.profile.favorite_places.add(self.place, self.other)
+
+    def report(self, place, description=""):
+        return Report.objects.create(
+            place=place, author=self.author, rating=3, description=description
+        )
+
+    def test_agrupa_por_lugar(self):
+        self.report(self.place, "Primero")
+        last = self.report(self.place, "Segundo")
+        self.report(self.other)
+
+        notifications = Notification.objects.filter(user=self.follower)
+        self.assertEqual(notifications.count(), 2)
+        grouped = notifications.get(place=self.place)
+        self.assertEqual(grouped.count, 2)
+        self.assertEqual(grouped.report, last)
+        self.assertIn("Segundo", grouped.message)
+        self.follower.profile.refresh_from_db()
+        self.assertEqual(self.follower.profile.unread_notifications, 2)
+
+        self.client.force_login(self.follower)
+        response = self.client.get(reverse("notifications"))
+        self.assertContains(response, "2 reportes nuevos")
+
+        self.report(self.place)
+        self.assertEqual(notifications.filter(place=self.place).count(), 2)
+        fresh = notifications.get(place=self.place, is_read=False)
+        self.assertEqual(fresh.count, 1)
+
+    def test_seguidores_nuevos_y_agrupados(self):
+        self.report(self.place)
+        # Los seguidores nuevos reciben su primera notificación; el que ya
+        # tenía una sin leer la ve sumar.
+        fans = [User.objects.create_user(f"fan{i}") for i in range(3)]
+        for fan in fans:
+            fan.profile.favorite_places.add(self.place)
+        self.report(self.place)
+        self.assertEqual(Notification.objects.count(), 4)
+        self.assertEqual(
+            sorted(Notification.objects.values_list("count", flat=True)), [1, 1, 1, 2]
+        )
+
+
+class PlaceDetailTest(TestCase):
+    """
+    Página y API de detalle de un lugar:
+    - histograma 1–5 y frecuencia de etiquetas;
+    - paginación por cursor sin repetir reportes; un cursor inválido es un 400;
+    - el resumen se cachea y se invalida al crear un reporte o comentario.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("autor", password="123456")
+        self.place = Place.objects.create(
+            name="Plaza de Maipú",
+            lat=Decimal("-33.510000"),
+            lng=Decimal("-70.757000"),
+        )
+        for rating, tags in [(5, "rampa,ascensor"), (4, "rampa"), (4, ""), (1, "rampa")]:
+            Report.objects.create(place=self.place, author=self.user, rating=rating, tags=tags)
+
+    def test_api_agregados(self):
+        response = self.client.get(reverse("place_detail_api", args=[self.place.pk]))
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+
+        agg = data["aggregates"]
+        self.assertEqual(agg["reports_count"], 4)
+        self.assertEqual(agg["rating_histogram"], {"1": 1, "2": 0, "3": 0, "4": 2, "5": 1})
+        self.assertEqual(agg["avg_rating"], 3.5)
+        self.assertEqual(agg["tags"][0], {"tag": "rampa", "count": 3})
+        self.assertEqual(data["place"]["name"], "Plaza de Maipú")
+
+    def test_paginacion_por_cursor(self):
+        url = reverse("place_detail_api", args=[self.place.pk])
+        with mock.patch("core.aggregates.REPORTS_PAGE_SIZE", 3):
+            first = self.client.get(url).json()
+            second = self.client.get(url, {"cursor": first["next_cursor"]}).json()
+
+        self.assertEqual(len(first["reports"]), 3)
+        self.assertIsNotNone(first["next_cursor"])
+
+        ids = [r["id"] for r in first["reports"] + second["reports"]]
+        self.assertEqual(len(set(ids)), 4)
+        self.assertIsNone(second["next_cursor"])
+
+        # Un cursor alterado es un error del cliente, no la primera página.
+        for bad in ("no-es-un-cursor", "eA"):
+            self.assertEqual(self.client.get(url, {"cursor": bad}).status_code, 400)
+            page = reverse("place_detail", args=[self.place.pk])
+            self.assertEqual(self.client.get(page, {"cursor": bad}).status_code, 400)
+
+    def test_cache_se_invalida(self):
+        url = reverse("place_detail", args=[self.place.pk])
+        self.assertContains(self.client.get(url), "Plaza de Maipú")
+
+        with self.assertNumQueries(1):
+            self.client.get(reverse("place_detail_api", args=[self.place.pk]))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            report = Report.objects.create(place=self.place, author=self.user, rating=2)
+        data = self.client.get(reverse("place_detail_api", args=[self.place.pk])).json()
+        self.assertEqual(data["aggregates"]["reports_count"], 5)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(report=report, author=self.user, text="Sigue igual")
+        data = self.client.get(reverse("place_detail_api", args=[self.place.pk])).json()
+        self.assertEqual(data["reports"][0]["comments_count"], 1)
+
+
+class FavoritesAPITest(TestCase):
+    """
+    Sincronización de favoritos en lote:
+    - aplica altas y bajas como diferencia de conjuntos y sube la versión;
+    - un lote sin cambios efectivos no cambia la versión;
+    - toggle_favorite_place también sube la versión (vía m2m_changed).
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user("fan", password="123456")
+        self.places = [
+            Place.objects.create(
+                name=f"Lugar {i}",
+                lat=Decimal("-33.510000"),
+                lng=Decimal("-70.757000"),
+            )
+            for i in range(3)
+        ]
+        self.client.force_login(self.user)
+        self.url = reverse("favorites_api")
+
+    def sync(self, **payload):
+        return self.client.post(self.url, data=payload, content_type="application/json")
+
+    def test_sync_aplica_diferencia(self):
+        a, b, c = (p.pk for p in self.places)
+        self.user.profile.favorite_places.add(a)
+        version = Profile.objects.get(user=self.user).favorites_version
+
+        response = self.sync(add=[a, b, 999999], remove=[c])
+        data = response.json()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data["added"], [b])
+        self.assertEqual(data["removed"], [])
+        self.assertEqual(data["ignored"], [999999])
+        self.assertEqual(data["favorites"], [a, b])
+        self.assertEqual(data["version"], version + 1)
+
+        data = self.sync(remove=[a]).json()
+        self.assertEqual(data["favorites"], [b])
+        self.assertEqual(data["version"], version + 2)
+
+        # Reenviar el mismo lote (reintento de un cliente offline) no cambia nada.
+        data = self.sync(remove=[a]).json()
+        self.assertEqual(data["version"], version + 2)
+        self.assertEqual(self.client.get(self.url).json(), {"version": version + 2, "favorites": [b]})
+
+    def test_lote_invalido(self):
+        a = self.places[0].pk
+        self.assertEqual(self.sync(add=[a], remove=[a]).status_code, 400)
+        self.assertEqual(self.sync(add="x").status_code, 400)
+
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_toggle_sube_version(self):
+        place = self.places[0]
+        self.client.post(reverse("toggle_favorite_place", args=[place.pk]))
+        self.assertEqual(Profile.objects.get(user=self.user).favorites_version, 1)
+
+
+class CardFragmentCacheTest(TestCase):
+    """
+    Las tarjetas de lugares y reportes se cachean por id + updated_at:
+    - editar un reporte cambia su clave y se ve el cambio;
+    - la estrella de favorito y las acciones de "Mis reportes" son por
+      usuario, y la insignia "Nuevo" por posición: van fuera de la caché.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("ana", password="123456")
+        self.place = Place.objects.create(
+            name="Plaza", lat=Decimal("-33.520000"), lng=Decimal("-70.770000")
+        )
+        self.report = Report.objects.create(
+            place=self.place, author=self.user, rating=3, description="Rampa rota"
+        )
+
+    def test_reporte_editado_se_rerenderiza(self):
+        self.assertContains(self.client.get(reverse("reports")), "Rampa rota")
+
+        self.report.description = "Rampa reparada"
+        self.report.save()
+        response = self.client.get(reverse("reports"))
+        self.assertContains(response, "Rampa reparada")
+        self.assertNotContains(response, "Rampa rota")
+
+    def test_favorito_por_usuario(self):
+        other = User.objects.create_user("beto", password="123456")
+        self.user.profile.favorite_places.add(self.place)
+
+        self.client.force_login(self.user)
+        self.assertContains(self.client.get(reverse("places")), "fav-btn active")
+
+        self.client.force_login(other)
+        response = self.client.get(reverse("places"))
+        self.assertContains(response, "Plaza")
+        self.assertNotContains(response, "fav-btn active")
+
+
+    def test_insignia_y_acciones_fuera_de_la_cache(self):
+        self.assertContains(self.client.get(reverse("places")), "place-badge-new", count=1)
+        Place.objects.create(
+            name="Biblioteca", lat=Decimal("-33.510000"), lng=Decimal("-70.757000")
+        )
+        # La tarjeta de "Plaza" ya está en caché y dejó de ser la primera.
+        response = self.client.get(reverse("places"))
+        self.assertContains(response, "place-badge-new", count=1)
+        html = response.content.decode()
+        self.assertLess(html.index("Biblioteca"), html.index("place-badge-new"))
+        self.assertLess(html.index("place-badge-new"), html.index("Plaza"))
+
+        self.client.force_login(self.user)
+        self.assertContains(self.client.get(reverse("my_reports")), "report-btn-edit")
+        self.client.logout()
+        response = self.client.get(reverse("reports"))
+        self.assertContains(response, "Rampa rota")
+        self.assertNotContains(response, "report-btn-edit")
+
+
+class PlacePickerTest(TestCase):
+    """
+    Selector de lugares de ReportForm:
+    - el formulario solo renderiza la opción elegida;
+    - /api/places/search/ busca por prefijo y pagina por (name, id).
+    """
+
+    def setUp(self):
+        self.places = [
+            Place.objects.create(
+                name=name, lat=Decimal("-33.520000"), lng=Decimal("-70.770000")
+            )
+            for name in ["Metro Maipú", "Metro Monte Tabor", "Mall Arauco", "Metro Del Sol"]
+        ]
+
+    def test_formulario_no_lista_todos_los_lugares(self):
+        html = ReportForm().as_p()
+        self.assertNotIn("Mall Arauco", html)
+
+        html = ReportForm(initial={"place": self.places[2].pk}).as_p()
+        self.assertIn("Mall Arauco", html)
+        self.assertNotIn("Metro Maipú", html)
+
+    def test_busqueda_por_prefijo_paginada(self):
+        url = reverse("place_search_api")
+        first = self.client.get(url, {"q": "metro", "limit": 2}).json()
+        self.assertEqual([p["name"] for p in first["results"]], ["Metro Del Sol", "Metro Maipú"])
+        self.assertIsNotNone(first["next"])
+
+        second = self.client.get(url, {"q": "metro", "limit": 2, "after": first["next"]}).json()
+        self.assertEqual([p["name"] for p in second["results"]], ["Metro Monte Tabor"])
+        self.assertIsNone(second["next"])
+
+
+class ReportsDateRangeTest(TestCase):
+    """
+    ?desde/?hasta se interpretan como días completos en hora de Chile y
+    las fechas mal formadas se informan en vez de llegar al ORM.
+    """
+
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user("ana", password="123456")
+        place = Place.objects.create(
+            name="Plaza", lat=Decimal("-33.520000"), lng=Decimal("-70.770000")
+        )
+        santiago = ZoneInfo("America/Santiago")
+        self.late = Report.objects.create(place=place, author=user, rating=3, description="Tarde")
+        self.early = Report.objects.create(place=place, author=user, rating=3, description="Temprano")
+        # 23:30 en Santiago ya es el día siguiente en UTC.
+        Report.objects.filter(pk=self.late.pk).update(
+            created_at=datetime(2024, 3, 10, 23, 30, tzinfo=santiago)
+        )
+        Report.objects.filter(pk=self.early.pk).update(
+            created_at=datetime(2024, 3, 11, 0, 15, tzinfo=santiago)
+        )
+
+    def descriptions(self, **params):
+        response = self.client.get(reverse("reports"), params)
+        self.assertEqual(response.status_code, 200)
+        return {r.description for r in response.context["reports"]}, response
+
+    def test_rango_en_hora_local(self):
+        found, _ = self.descriptions(hasta="2024-03-10")
+        self.assertEqual(found, {"Tarde"})
+
+        found, _ = self.descriptions(desde="2024-03-11")
+        self.assertEqual(found, {"Temprano"})
+
+        found, _ = self.descriptions(desde="2024-03-10", hasta="2024-03-11")
+        self.assertEqual(found, {"Tarde", "Temprano"})
+
+    def test_fecha_invalida_se_ignora(self):
+        found, response = self.descriptions(desde="10/03/2024", hasta="2024-03-10")
+        self.assertEqual(found, {"Tarde"})
+        self.assertContains(response, "no es válida")
+        self.assertEqual(response.context["date_from"], "")
+
+    def test_rango_invertido(self):
+        found, response = self.descriptions(desde="2024-03-11", hasta="2024-03-10")
+        self.assertEqual(found, {"Tarde", "Temprano"})
+        self.assertContains(response, "posterior")
@@ -0,0 +1,232 @@
+"""
+Proxy con caché en disco para las teselas del mapa base.
+
+Con TILE_PROXY_ENABLED el mapa pide /tiles/<capa>/<z>/<x>/<y>.png a
+nuestro servidor en vez de ir directo a OpenStreetMap/Carto. Cada tesela
+se guarda en TILE_CACHE_DIR junto a un .json con su ETag/Last-Modified:
+mientras tenga menos de TILE_CACHE_MAX_AGE segundos se sirve del disco sin
+consultar a nadie; después se revalida con If-None-Match /
+If-Modified-Since (un 304 solo renueva la fecha). Si el servidor de
+teselas falla se sirve la copia vencida.
+
+Solo se sirven teselas que tocan TILE_BOUNDS entre TILE_MIN_ZOOM y
+TILE_MAX_ZOOM, así que no sirve de proxy abierto hacia el origen.
+
+El tamaño total se limita a TILE_CACHE_MAX_BYTES con desalojo LRU: cada
+acierto actualiza el mtime del archivo y `python manage.py prune_tiles`
+(cron, y al final de warm_tiles) borra las de mtime más antiguo hasta
+bajar del 90 % del límite. Recorrer el directorio no entra en ninguna
+petición del mapa. Las respuestas se envían con FileResponse (por
+bloques, sin rangos).
+"""
+import json
+import math
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+from django.conf import settings
+
+from . import metrics
+
+_session = None
+
+
+def session():
+    """Sesión HTTP compartida: reutiliza conexiones keep-alive por servidor."""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        _session.headers["User-Agent"] = getattr(
+            settings, "TILE_USER_AGENT", "IncluiMap tile proxy"
+        )
+    return _session
+
+
+def valid_tile(z, x, y):
+    """La tesela está entre TILE_MIN_ZOOM y TILE_MAX_ZOOM y toca TILE_BOUNDS."""
+    if not settings.TILE_MIN_ZOOM <= z <= settings.TILE_MAX_ZOOM:
+        return False
+    x0, y0, x1, y1 = _tile_range(*settings.TILE_BOUNDS, z)
+    return x0 <= x <= x1 and y0 <= y <= y1
+
+
+class TileCache:
+    def __init__(self, root=None, max_bytes=None, max_age=None):
+        self.root = Path(root or settings.TILE_CACHE_DIR)
+        self.max_bytes = max_bytes or getattr(settings, "TILE_CACHE_MAX_BYTES", 512 * 1024 * 1024)
+        self.max_age = max_age if max_age is not None else getattr(settings, "TILE_CACHE_MAX_AGE", 7 * 86400)
+
+    def path(self, layer, z, x, y):
+        return self.root / layer / str(z) / str(x) / f"{y}.png"
+
+    def _meta_path(self, path):
+        return path.with_suffix(".json")
+
+    def read_meta(self, path):
+        try:
+            with open(self._meta_path(path), encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def touch(self, path):
+        """Marca la tesela como usada recién (orden LRU)."""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def get(self, layer, z, x, y):
+        """
+        Devuelve (ruta, meta) de la tesela, descargándola o revalidándola si
+        hace falta. (None, None) si no hay copia y el servidor no la entregó.
+        """
+        path = self.path(layer, z, x, y)
+        meta = self.read_meta(path) if path.exists() else None
+
+        if meta and time.time() - meta.get("fetched_at", 0) < self.max_age:
+            metrics.incr("tiles.hit")
+            self.touch(path)
+            return path, meta
+
+        url = settings.TILE_UPSTREAMS[layer].format(z=z, x=x, y=y)
+        headers = {}
+        if meta:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        try:
+            response = session().get(
+                url, headers=headers, stream=True,
+                timeout=getattr(settings, "TILE_UPSTREAM_TIMEOUT", 10),
+            )
+        except requests.RequestException:
+            response = None
+
+        if response is not None:
+            with response:
+                if response.status_code == 304 and meta:
+                    metrics.incr("tiles.revalidated")
+                    meta["fetched_at"] = time.time()
+                    self._write_meta(path, meta)
+                    self.touch(path)
+                    return path, meta
+
+                if response.status_code == 200:
+                    metrics.incr("tiles.miss")
+                    meta = {
+                        "etag": response.headers.get("ETag", ""),
+                        "last_modified": response.headers.get("Last-Modified", ""),
+                        "content_type": response.headers.get("Content-Type", "image/png"),
+                        "fetched_at": time.time(),
+                    }
+                    self._store(path, response)
+                    self._write_meta(path, meta)
+                    return path, meta
+
+        if meta:
+            # El servidor falló: mejor una tesela vencida que un hueco.
+            metrics.incr("tiles.stale")
+            self.touch(path)
+            return path, meta
+        metrics.incr("tiles.error")
+        return None, None
+
+    def _store(self, path, response):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                for chunk in response.iter_content(chunk_size=16 * 1024):
+                    fh.write(chunk)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _write_meta(self, path, meta):
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".part")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(meta, fh)
+        os.replace(tmp, self._meta_path(path))
+
+    def evict(self):
+        """
+        Borra las teselas menos usadas hasta quedar bajo el 90 % del límite.
+        Recorre todo el directorio: va en prune_tiles, no en una petición.
+        """
+        tiles = []
+        total = 0
+        for path in self.root.rglob("*.png"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            tiles.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+        if total <= self.max_bytes:
+            return 0
+
+        target = self.max_bytes * 0.9
+        removed = 0
+        for _, size, path in sorted(tiles):
+            if total <= target:
+                break
+            for victim in (path, self._meta_path(path)):
+                try:
+                    victim.unlink()
+                except OSError:
+                    pass
+            total -= size
+            removed += 1
+        metrics.incr("tiles.evicted", removed)
+        return removed
+
+
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = TileCache()
+    return _cache
+
+
+def _tile_range(min_lat, max_lat, min_lng, max_lng, zoom):
+    """(x0, y0, x1, y1) de las teselas que cubren el rectángulo en `zoom`."""
+    def to_tile(lat, lng):
+        n = 2 ** zoom
+        x = int((lng + 180) / 360 * n)
+        lat_rad = math.radians(lat)
+        y = int((1 - math.asinh(math.tan(lat_rad)) / math.pi) / 2 * n)
+        return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+    return (*to_tile(max_lat, min_lng), *to_tile(min_lat, max_lng))
+
+
+def tiles_for_bounds(min_lat, max_lat, min_lng, max_lng, zoom):
+    """Coordenadas (x, y) de las teselas que cubren el rectángulo en `zoom`."""
+    x0, y0, x1, y1 = _tile_range(min_lat, max_lat, min_lng, max_lng, zoom)
+    return [(x, y) for x in range(x0, x1 + 1) for y in range(y0, y1 + 1)]
+
+
+def warm(layer, bounds, zooms, workers=4):
+    """
+    Precarga en lote las teselas de `bounds` para cada zoom, con `workers`
+    descargas en paralelo sobre la sesión compartida. Devuelve
+    {"ok": n, "error": n}.
+    """
+    cache = get_cache()
+    jobs = [(z, x, y) for z in zooms for x, y in tiles_for_bounds(*bounds, z)]
+    counts = {"ok": 0, "error": 0}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for path, _ in pool.map(lambda t: cache.get(layer, *t), jobs):
+            counts["ok" if path else "error"] += 1
+    return counts
@@ -1,22 +1,45 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse,
+)
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import login
-from django.db.models import Q, Avg, Count
-from django.views.decorators.http import require_GET, require_POST
+from django.db.models import Q, Avg, Count, F
+from django.views.decorators.http import require_GET, require_POST, require_http_methods
 from django.core.mail import send_mail
 from django.conf import settings
+from django.db import transaction
+from django.core.handlers.asgi import ASGIRequest
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import quote_etag
+import asyncio
 import json
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
 
-from .models import Place, Report, Profile, Notification, Comment
+from .models import (
+    ALIVE_REPORTS, Place, Report, Profile, Notification, Comment, Flag, notification_event,
+    recount_unread_notifications, reports_bulk_created,
+)
 from .forms import ReportForm, SignupForm, UserForm, ProfileForm
+from .db.pool import pool_stats
+from .routers import read_from_replica, pin_to_primary
+from .aggregates import place_summary, reports_page, decode_cursor, with_comments_count
+from . import sync
+from .pubsub import broker
+from . import metrics
+from . import tiles
+from . import moderation
 
 
 def map_view(request):
     return render(request, "core/map.html")
 
 
+@read_from_replica
 def places_view(request):
     """
     Lista de lugares, mostrando cuáles son favoritos para el usuario autenticado.
@@ -25,8 +48,9 @@ def places_view(request):
 
     favorite_ids = set()
     if request.user.is_authenticated:
-        profile, _ = Profile.objects.get_or_create(user=request.user)
-        favorite_ids = set(profile.favorite_places.values_list("id", flat=True))
+        favorite_ids = set(
+            request.user.profile.favorite_places.values_list("id", flat=True)
+        )
 
     return render(request, "core/places.html", {
         "places": qs,
@@ -34,6 +58,133 @@ def places_view(request):
     })
 
 
+def _place_detail_data(request, place):
+    """
+    Datos comunes a /lugares/<id>/ y /api/places/<id>/. Sin cursor se usa
+    el resumen cacheado; con ?cursor= se lee la página pedida. Devuelve None
+    si el cursor no es válido.
+    """
+    raw_cursor = (request.GET.get("cursor") or "").strip()
+    cursor = decode_cursor(raw_cursor) if raw_cursor else None
+    if raw_cursor and cursor is None:
+        return None
+
+    summary = place_summary(place.pk)
+    if cursor is None:
+        reports, next_cursor = summary["reports"], summary["next_cursor"]
+    else:
+        reports, next_cursor = reports_page(place.pk, cursor)
+
+    return {
+        "aggregates": summary["aggregates"],
+        "reports": reports,
+        "next_cursor": next_cursor,
+    }
+
+
+@read_from_replica
+def place_detail_view(request, pk):
+    """
+    Página de un lugar: distribución de calificaciones, etiquetas más
+    mencionadas y sus reportes más recientes.
+    """
+    place = get_object_or_404(Place, pk=pk)
+    data = _place_detail_data(request, place)
+    if data is None:
+        return HttpResponse("Cursor inválido.", status=400, content_type="text/plain; charset=utf-8")
+
+    is_favorite = (
+        request.user.is_authenticated
+        and request.user.profile.favorite_places.filter(pk=place.pk).exists()
+    )
+
+    aggregates = data["aggregates"]
+    max_count = max(aggregates["rating_histogram"].values()) or 1
+    histogram = [
+        {
+            "rating": int(rating),
+            "count": count,
+            "percent": round(100 * count / max_count),
+        }
+        for rating, count in sorted(aggregates["rating_histogram"].items(), reverse=True)
+    ]
+
+    return render(request, "core/place_detail.html", {
+        "place": place,
+        "aggregates": aggregates,
+        "histogram": histogram,
+        "reports": data["reports"],
+        "next_cursor": data["next_cursor"],
+        "is_favorite": is_favorite,
+    })
+
+
+@require_GET
+@read_from_replica
+def place_detail_api(request, pk):
+    """
+    GET /api/places/<id>/?cursor=... — lugar, histograma de calificaciones
+    (1–5), frecuencia de etiquetas y reportes paginados por cursor.
+    """
+    place = get_object_or_404(Place, pk=pk)
+    data = _place_detail_data(request, place)
+    if data is None:
+        return JsonResponse({"error": "Cursor inválido."}, status=400)
+
+    return JsonResponse({
+        "place": {
+            "id": place.pk,
+            "name": place.name,
+            "address": place.address,
+            "lat": float(place.lat),
+            "lng": float(place.lng),
+            "tags": place.tags,
+        },
+        **data,
+    }, json_dumps_params={"ensure_ascii": False})
+
+
+def _date_range(request):
+    """
+    Convierte ?desde/?hasta (AAAA-MM-DD, días en hora de Chile) en un rango
+    semiabierto [inicio de desde, inicio del día siguiente a hasta) con
+    datetimes con zona. Filtrar created_at contra esos límites usa el índice;
+    created_at__date envuelve la columna en DATE()/CONVERT_TZ y no.
+
+    Devuelve (filtros, desde, hasta, errores); una fecha inválida se
+    descarta y se informa en errores.
+    """
+    tz = ZoneInfo("America/Santiago")
+    filters, errors = {}, []
+    raw = {
+        "desde": (request.GET.get("desde") or "").strip(),
+        "hasta": (request.GET.get("hasta") or "").strip(),
+    }
+    days = {}
+    for key, value in raw.items():
+        if not value:
+            continue
+        try:
+            days[key] = date.fromisoformat(value)
+        except ValueError:
+            errors.append(f"La fecha «{value}» no es válida (usa AAAA-MM-DD).")
+            raw[key] = ""
+
+    if "desde" in days and "hasta" in days and days["desde"] > days["hasta"]:
+        errors.append("La fecha «desde» es posterior a «hasta».")
+        return {}, raw["desde"], raw["hasta"], errors
+
+    # combine() con ZoneInfo resuelve bien la medianoche que no existe el
+    # día del cambio de horario (Chile adelanta el reloj a las 24:00).
+    if "desde" in days:
+        filters["created_at__gte"] = datetime.combine(days["desde"], time.min, tzinfo=tz)
+    if "hasta" in days:
+        next_day = days["hasta"] + timedelta(days=1)
+        filters["created_at__lt"] = datetime.combine(next_day, time.min, tzinfo=tz)
+    return filters, raw["desde"], raw["hasta"], errors
+
+
+@read_from_replica
 def reports_view(request):
     """
     Lista de reportes públicos, con opción de orden por fecha y rango de fechas.
@@ -42,10 +193,10 @@ def reports_view(request):
 
     qs = (
         Report.objects
-        .select_related("place", "author")
+        .select_related("place", "author__profile")
     )
+    qs = with_comments_count(qs)
 
-    
     order = (request.GET.get("orden") or "newest").strip()
     if order == "oldest":
         qs = qs.order_by(DATE_FIELD)
@@ -53,14 +204,8 @@ def reports_view(request):
         order = "newest"
         qs = qs.order_by(f"-{DATE_FIELD}")
 
-    
-    date_from = (request.GET.get("desde") or "").strip()
-    date_to = (request.GET.get("hasta") or "").strip()
-
-    if date_from:
-        qs = qs.filter(**{f"{DATE_FIELD}__date__gte": date_from})
-    if date_to:
-        qs = qs.filter(**{f"{DATE_FIELD}__date__lte": date_to})
+    date_filters, date_from, date_to, date_errors = _date_range(request)
+    qs = qs.filter(**date_filters)
 
     qs = qs[:24]
 
@@ -69,6 +214,7 @@ def reports_view(request):
         "order": order,
         "date_from": date_from,
         "date_to": date_to,
+        "date_errors": date_errors,
     })
 
 
@@ -83,8 +229,9 @@ def my_reports_view(request):
     qs = (
         Report.objects
         .filter(author=request.user)
-        .select_related("place", "author")
+        .select_related("place", "author__profile")
     )
+    qs = with_comments_count(qs)
 
     order = (request.GET.get("orden") or "newest").strip()
     if order == "oldest":
@@ -93,13 +240,8 @@ def my_reports_view(request):
         order = "newest"
         qs = qs.order_by(f"-{DATE_FIELD}")
 
-    date_from = (request.GET.get("desde") or "").strip()
-    date_to = (request.GET.get("hasta") or "").strip()
-
-    if date_from:
-        qs = qs.filter(**{f"{DATE_FIELD}__date__gte": date_from})
-    if date_to:
-        qs = qs.filter(**{f"{DATE_FIELD}__date__lte": date_to})
+    date_filters, date_from, date_to, date_errors = _date_range(request)
+    qs = qs.filter(**date_filters)
 
     qs = qs[:50]
 
@@ -109,6 +251,7 @@ def my_reports_view(request):
         "order": order,
         "date_from": date_from,
         "date_to": date_to,
+        "date_errors": date_errors,
     })
 
 
@@ -187,7 +330,9 @@ def report_delete_view(request, pk):
     report = get_object_or_404(Report, pk=pk, author=request.user)
 
     if request.method == "POST":
-        report.delete()
+        # Borrado lógico: la purga de comentarios y notificaciones queda
+        # para purge_deleted_reports, fuera de la petición.
+        report.soft_delete(by=request.user)
         messages.success(
             request,
             "Reporte eliminado correctamente.",
@@ -205,8 +350,7 @@ def favorites_view(request):
     """
     Muestra los lugares marcados como favoritos por el usuario.
     """
-    profile, _ = Profile.objects.get_or_create(user=request.user)
-    qs = profile.favorite_places.all().order_by("name")
+    qs = request.user.profile.favorite_places.all().order_by("name")
     return render(request, "core/favorites.html", {"places": qs})
 
 
@@ -217,7 +361,7 @@ def toggle_favorite_place(request, place_id):
     Marca o desmarca un lugar como favorito para el usuario actual.
     """
     place = get_object_or_404(Place, pk=place_id)
-    profile, _ = Profile.objects.get_or_create(user=request.user)
+    profile = request.user.profile
 
     if profile.favorite_places.filter(pk=place.pk).exists():
         profile.favorite_places.remove(place)
@@ -230,6 +374,245 @@ def toggle_favorite_place(request, place_id):
     return redirect(next_url or "places")
 
 
+def _parse_place_ids(value):
+    if value is None:
+        return set()
+    if not isinstance(value, list):
+        raise ValueError
+    return {int(v) for v in value}
+
+
+@require_POST
+def reports_batch_api(request):
+    """
+    POST /api/reports/batch/ — ingesta en lote de reportes encolados sin
+    conexión. Acepta JSON o multipart; en multipart el lote va en el campo
+    "reports" y cada ítem puede nombrar en "photo" el archivo que le toca:
+
+        [{"client_key": "uuid", "place": 3, "rating": 4,
+          "description": "...", "tags": ["rampa"], "photo": "foto1"}, ...]
+
+    Cada ítem se valida con las reglas de ReportForm y los válidos se
+    insertan con un solo bulk_create. "client_key" es obligatoria y única
+    por autor: si un reintento reenvía un reporte ya recibido, se responde
+    "duplicate" con su id en vez de crearlo otra vez. El fan-out de
+    notificaciones se encola una vez para todo el lote.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Debes iniciar sesión."}, status=401)
+
+    try:
+        if request.content_type == "application/json":
+            items = json.loads(request.body or b"[]")
+        else:
+            items = json.loads(request.POST.get("reports") or "[]")
+        if not isinstance(items, list) or not all(isinstance(i, dict) for i in items):
+            raise ValueError
+    except ValueError:
+        return JsonResponse({"error": "Se espera una lista JSON de reportes."}, status=400)
+
+    max_items = getattr(settings, "REPORT_BATCH_MAX_ITEMS", 50)
+    if len(items) > max_items:
+        return JsonResponse({"error": f"Máximo {max_items} reportes por lote."}, status=400)
+
+    keys = [str(item.get("client_key") or "").strip() for item in items]
+    # all_objects: una clave de un reporte ya eliminado sigue ocupada.
+    existing = dict(
+        Report.all_objects
+        .filter(author=request.user, client_key__in=[k for k in keys if k])
+        .values_list("client_key", "id")
+    )
+
+    results, pending, seen = [], [], set()
+    for item, key in zip(items, keys):
+        result = {"client_key": key}
+        results.append(result)
+
+        if not key or len(key) > 64:
+            result.update(status="invalid", errors={"client_key": ["Obligatoria, hasta 64 caracteres."]})
+            continue
+        if key in existing:
+            result.update(status="duplicate", id=existing[key])
+            continue
+        if key in seen:
+            result.update(status="duplicate")
+            continue
+        seen.add(key)
+
+        files = {}
+        if item.get("photo") and item["photo"] in request.FILES:
+            files["photo"] = request.FILES[item["photo"]]
+        form = ReportForm(
+            {
+                "place": item.get("place"),
+                "rating": item.get("rating"),
+                "description": item.get("description") or "",
+                "tags": item.get("tags") or [],
+            },
+            files,
+        )
+        if not form.is_valid():
+            result.update(status="invalid", errors=form.errors.get_json_data())
+            continue
+
+        report = form.save(commit=False)
+        report.author = request.user
+        report.client_key = key
+        pending.append((result, report))
+
+    if pending:
+        new_keys = [report.client_key for _, report in pending]
+        with transaction.atomic():
+            # Lectura con bloqueo: un reintento concurrente que insertó alguna
+            # de estas claves después de la consulta de arriba aparece aquí,
+            # y el bloqueo del índice único impide que lo haga entremedio.
+            taken = dict(
+                Report.all_objects.select_for_update()
+                .filter(author=request.user, client_key__in=new_keys)
+                .values_list("client_key", "id")
+            )
+            fresh = [report for _, report in pending if report.client_key not in taken]
+            # ignore_conflicts por si acaso: una clave repetida se salta en
+            # vez de hacer fallar todo el lote.
+            Report.objects.bulk_create(fresh, ignore_conflicts=True)
+            # bulk_create no devuelve ids en MySQL (ni con ignore_conflicts).
+            ids = dict(
+                Report.all_objects
+                .filter(author=request.user, client_key__in=[r.client_key for r in fresh])
+                .values_list("client_key", "id")
+            )
+            created = [ids[r.client_key] for r in fresh if r.client_key in ids]
+            if created:
+                reports_bulk_created.send(sender=Report, reports=created, author=request.user)
+
+        for result, report in pending:
+            key = report.client_key
+            if key in taken:
+                result.update(status="duplicate", id=taken[key])
+            else:
+                result.update(status="created", id=ids.get(key))
+
+    return JsonResponse({
+        "created": sum(1 for r in results if r["status"] == "created"),
+        "results": results,
+    })
+
+
+@require_GET
+def sync_api(request):
+    """
+    GET /api/sync/ → snapshot {"seq", "places"} con lugares y agregados.
+    GET /api/sync/?since=<seq> → delta desde ese seq: lugares y reportes
+    nuevos o modificados, ids eliminados (tombstones) y el nuevo seq.
+
+    Si el seq del cliente no existe en el servidor (p.ej. tras restaurar la
+    BD) o es anterior a lo que conserva el ChangeLog (SYNC_RETENTION_DAYS),
+    se responde un snapshot con "reset": true para que descarte su copia.
+    """
+    since_raw = (request.GET.get("since") or "").strip()
+    if not since_raw:
+        data = sync.snapshot()
+    else:
+        try:
+            since = int(since_raw)
+        except ValueError:
+            return JsonResponse({"error": "'since' debe ser un entero."}, status=400)
+        known = sync.oldest_seq() - 1 <= since <= sync.current_seq(settled=False)
+        if since < 0 or not known:
+            data = dict(sync.snapshot(), reset=True)
+        else:
+            data = sync.changes_since(since)
+
+    return JsonResponse(data, json_dumps_params={"ensure_ascii": False})
+
+
+@require_http_methods(["GET", "POST"])
+def favorites_api(request):
+    """
+    GET  /api/favorites/ → {"version": n, "favorites": [ids]}
+    POST /api/favorites/ con {"add": [ids], "remove": [ids]} aplica el lote
+    como diferencia de conjuntos sobre favorite_places, en una transacción
+    y con inserts/deletes en bloque sobre la tabla intermedia. Pensado para
+    clientes que acumulan cambios sin conexión y los envían juntos.
+
+    Responde siempre con la versión y la lista completa, para que el
+    cliente reemplace su copia local. Los ids de lugares inexistentes se
+    devuelven en "ignored".
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Debes iniciar sesión."}, status=401)
+
+    Through = Profile.favorite_places.through
+
+    if request.method == "GET":
+        profile = request.user.profile
+        favorites = list(
+            Through.objects.filter(profile_id=profile.pk)
+            .order_by("place_id")
+            .values_list("place_id", flat=True)
+        )
+        return JsonResponse({"version": profile.favorites_version, "favorites": favorites})
+
+    try:
+        payload = json.loads(request.body or b"{}")
+        to_add = _parse_place_ids(payload.get("add"))
+        to_remove = _parse_place_ids(payload.get("remove"))
+    except (ValueError, TypeError, AttributeError):
+        return JsonResponse({"error": "Formato inválido: se esperan listas de ids en 'add' y 'remove'."}, status=400)
+
+    if to_add & to_remove:
+        return JsonResponse({"error": "Un mismo lugar no puede estar en 'add' y 'remove'."}, status=400)
+
+    with transaction.atomic():
+        # Serializa lotes concurrentes del mismo usuario.
+        profile = Profile.objects.select_for_update().get(user=request.user)
+
+        existing_places = set(
+            Place.objects.filter(pk__in=to_add).values_list("pk", flat=True)
+        )
+        ignored = sorted(to_add - existing_places)
+
+        current = set(
+            Through.objects
+            .filter(profile_id=profile.pk, place_id__in=to_add | to_remove)
+            .values_list("place_id", flat=True)
+        )
+        added = existing_places - current
+        removed = to_remove & current
+
+        if added:
+            Through.objects.bulk_create(
+                [Through(profile_id=profile.pk, place_id=pk) for pk in added],
+                ignore_conflicts=True,
+            )
+        if removed:
+            Through.objects.filter(profile_id=profile.pk, place_id__in=removed).delete()
+
+        version = profile.favorites_version
+        if added or removed:
+            # Las escrituras en bloque no emiten m2m_changed: se sube la
+            # versión y se fija la lectura al primario aquí mismo.
+            version += 1
+            Profile.objects.filter(pk=profile.pk).update(
+                favorites_version=F("favorites_version") + 1
+            )
+            pin_to_primary(request.user.pk)
+
+        favorites = list(
+            Through.objects.filter(profile_id=profile.pk)
+            .order_by("place_id")
+            .values_list("place_id", flat=True)
+        )
+
+    return JsonResponse({
+        "version": version,
+        "favorites": favorites,
+        "added": sorted(added),
+        "removed": sorted(removed),
+        "ignored": ignored,
+    })
+
+
 def about_view(request):
     return render(request, "core/about.html")
 
@@ -238,7 +621,8 @@ def contact_view(request):
     """
     Formulario de contacto:
     - Si es GET, muestra la página.
-    - Si es POST, intenta enviar un correo y muestra mensajes de éxito/error.
+    - Si es POST, encola el correo en la bandeja de salida (no espera al
+      servidor SMTP) y muestra mensajes de éxito/error.
     - Los mensajes se etiquetan con extra_tags="contact" para que solo se
       muestren en la vista de contacto.
     """
@@ -310,14 +694,14 @@ def contact_view(request):
     })
 
 
-@require_GET
-def places_api(request):
+def _places_api_queryset(params):
     """
-    GET /api/places/?q=texto&tags=rampa,ascensor&commune=maipu
+    Consulta de /api/places/ a partir de los parámetros GET. Compartida por
+    la versión síncrona y la async para que ambas devuelvan lo mismo.
     """
-    q = (request.GET.get("q") or "").strip()
-    commune = (request.GET.get("commune") or "").strip().lower()
-    tags_raw = (request.GET.get("tags") or "").strip().lower()
+    q = (params.get("q") or "").strip()
+    commune = (params.get("commune") or "").strip().lower()
+    tags_raw = (params.get("tags") or "").strip().lower()
     tags_list = [t for t in tags_raw.split(",") if t]
 
     qs = Place.objects.all()
@@ -339,27 +723,144 @@ def places_api(request):
             tag_q |= Q(tags__icontains=t)
         qs = qs.filter(tag_q)
 
-    qs = (
+    return (
         qs.annotate(
-            avg_rating=Avg("report__rating"),
-            reports_count=Count("report")
+            avg_rating=Avg("report__rating", filter=ALIVE_REPORTS),
+            reports_count=Count("report", filter=ALIVE_REPORTS)
         )
         .values("id", "name", "address", "lat", "lng", "tags", "avg_rating", "reports_count")
         .order_by("-reports_count", "name")
     )
 
+
+def _place_row(p):
+    """Normaliza lat/lng a float; devuelve None si no son válidas."""
+    try:
+        lat = float(p.get("lat"))
+        lng = float(p.get("lng"))
+    except (TypeError, ValueError):
+        return None
+    p["lat"] = lat
+    p["lng"] = lng
+    return p
+
+
+@require_GET
+@read_from_replica
+def places_api(request):
+    """
+    GET /api/places/?q=texto&tags=rampa,ascensor&commune=maipu
+    """
+    data = []
+    for p in _places_api_queryset(request.GET):
+        row = _place_row(p)
+        if row is not None:
+            data.append(row)
+
+    return JsonResponse({"places": data}, json_dumps_params={"ensure_ascii": False})
+
+
+@require_GET
+@read_from_replica
+def place_search_api(request):
+    """
+    GET /api/places/search/?q=prefijo&after=<id>&limit=20
+
+    Lugares cuyo nombre empieza con `q`, ordenados por (name, id) y
+    paginados por cursor: `after` es el id del último resultado recibido.
+    Usa el índice place_name_idx; lo consume el selector de ReportForm.
+    """
+    q = (request.GET.get("q") or "").strip()
+    try:
+        limit = max(1, min(int(request.GET.get("limit") or 20), 50))
+    except ValueError:
+        limit = 20
+
+    qs = Place.objects.all()
+    if q:
+        qs = qs.filter(name__istartswith=q)
+
+    after = (request.GET.get("after") or "").strip()
+    if after.isdigit():
+        last = Place.objects.filter(pk=after).values_list("name", flat=True).first()
+        if last is not None:
+            qs = qs.filter(Q(name__gt=last) | Q(name=last, pk__gt=int(after)))
+
+    rows = list(qs.order_by("name", "id").values("id", "name", "address")[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return JsonResponse({
+        "results": rows,
+        "next": rows[-1]["id"] if has_more else None,
+    }, json_dumps_params={"ensure_ascii": False})
+
+
+@require_GET
+@read_from_replica
+async def places_api_async(request):
+    """
+    GET /api/async/places/ — mismos parámetros y respuesta que /api/places/,
+    pero nativa de ASGI: bajo uvicorn no ocupa un hilo del threadpool
+    mientras espera a la BD, así un worker atiende más clientes del mapa a
+    la vez. Bajo WSGI también funciona (Django la ejecuta con async_to_sync).
+    """
     data = []
-    for p in qs:
+    async for p in _places_api_queryset(request.GET).aiterator(chunk_size=500):
+        row = _place_row(p)
+        if row is not None:
+            data.append(row)
+
+    return JsonResponse({"places": data}, json_dumps_params={"ensure_ascii": False})
+
+
+@require_GET
+def tile_view(request, layer, z, x, y):
+    """
+    GET /tiles/<capa>/<z>/<x>/<y>.png — tesela del mapa base servida desde
+    la caché en disco (ver core/tiles.py). Solo con TILE_PROXY_ENABLED y
+    para teselas de TILE_BOUNDS; el resto es 404 sin tocar la caché.
+    """
+    if not getattr(settings, "TILE_PROXY_ENABLED", False):
+        raise Http404
+    if layer not in settings.TILE_UPSTREAMS or not tiles.valid_tile(z, x, y):
+        raise Http404
+
+    cache = tiles.get_cache()
+    # Un segundo intento si prune_tiles la borra entre get() y open().
+    for _ in range(2):
+        path, meta = cache.get(layer, z, x, y)
+        if path is None:
+            return HttpResponse(status=502)
+
+        etag = meta.get("etag") or quote_etag(f"{int(meta['fetched_at'])}")
+        if etag in request.headers.get("If-None-Match", ""):
+            response = HttpResponseNotModified()
+            break
         try:
-            lat = float(p.get("lat"))
-            lng = float(p.get("lng"))
-        except (TypeError, ValueError):
+            fh = open(path, "rb")
+        except FileNotFoundError:
             continue
-        p["lat"] = lat
-        p["lng"] = lng
-        data.append(p)
+        response = FileResponse(fh, content_type=meta.get("content_type", "image/png"))
+        break
+    else:
+        raise Http404
+    response["ETag"] = etag
+    response["Cache-Control"] = f"public, max-age={getattr(settings, 'TILE_BROWSER_MAX_AGE', 86400)}"
+    return response
 
-    return JsonResponse({"places": data}, json_dumps_params={"ensure_ascii": False})
+
+@require_GET
+@staff_member_required
+def metrics_api(request):
+    """
+    GET /api/metrics/ — métricas del proceso que atiende la petición:
+    pools de conexiones (tamaño, esperas, checkouts) y contadores.
+    Solo para staff.
+    """
+    data = metrics.snapshot()
+    data["db_pools"] = pool_stats()
+    return JsonResponse(data)
 
 
 def signup_view(request):
@@ -391,7 +892,7 @@ def profile_view(request):
     """
     Vista de perfil del usuario.
     """
-    profile, _ = Profile.objects.get_or_create(user=request.user)
+    profile = request.user.profile
 
     if request.method == "POST":
         u_form = UserForm(request.POST, instance=request.user)
@@ -424,7 +925,10 @@ def profile_view(request):
 def notifications_view(request):
     """
     Lista las notificaciones del usuario actual.
-    Marca todas las no leídas como leídas al abrir la página.
+    Marca todas las no leídas como leídas al abrir la página y recalcula
+    el contador del perfil desde la tabla: así se corrige también si un
+    borrado en cascada se llevó no leídas sin descontarlas, y una que
+    llegue entre medio sigue contada.
     """
     qs = (
         Notification.objects
@@ -433,14 +937,214 @@ def notifications_view(request):
         .order_by("-created_at")[:50]
     )
 
-    Notification.objects.filter(user=request.user, is_read=False).update(is_read=True)
+    with transaction.atomic():
+        # Al leerla se libera coalesce_key: el próximo reporte del lugar abre
+        # una notificación nueva en vez de sumarse a esta.
+        marked = (
+            Notification.objects.filter(user=request.user, is_read=False)
+            .update(is_read=True, coalesce_key=None)
+        )
+        if marked or request.user.profile.unread_notifications:
+            recount_unread_notifications([request.user.pk])
+    if marked:
+        user_id = request.user.pk
+        transaction.on_commit(lambda: broker.publish(user_id, {"type": "read"}))
 
     return render(request, "core/notifications.html", {
         "notifications": qs,
     })
 
 
+def _sse(event, data, event_id=None):
+    msg = f"event: {event}\n"
+    if event_id is not None:
+        msg += f"id: {event_id}\n"
+    return msg + f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _parse_event_cursor(value):
+    """Cursor de notificaciones (created_at en ISO) o None si no es válido."""
+    try:
+        cursor = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    return cursor if timezone.is_aware(cursor) else None
+
+
+def _notifications_since(user, cursor):
+    """
+    Notificaciones del usuario cuyo último evento (created_at, que sube al
+    agruparse) es posterior a `cursor`, con un margen de
+    SSE_REPLAY_OVERLAP_SECONDS para no perder filas de transacciones que
+    confirmaron tarde. Puede repetir filas ya enviadas: el cliente las
+    reemplaza por id.
+    """
+    overlap = timedelta(seconds=getattr(settings, "SSE_REPLAY_OVERLAP_SECONDS", 5))
+    return (
+        Notification.objects
+        .filter(user=user, created_at__gte=cursor - overlap)
+        .select_related("place")
+        .order_by("created_at", "pk")[:50]
+    )
+
+
+async def _unread_count(user):
+    count = await (
+        Profile.objects
+        .filter(user=user)
+        .values_list("unread_notifications", flat=True)
+        .afirst()
+    )
+    return count or 0
+
+
+@require_GET
+@login_required
+def notifications_poll(request):
+    """
+    GET /notificaciones/nuevas/?since=<cursor> — alternativa al stream SSE
+    cuando la app corre por WSGI: notificaciones nuevas o agrupadas desde
+    `since`, el contador de no leídas y el cursor para la próxima consulta.
+    """
+    since = request.GET.get("since")
+    cursor = _parse_event_cursor(since) if since else timezone.now()
+    if cursor is None:
+        return JsonResponse({"error": "Cursor inválido."}, status=400)
+
+    rows = list(_notifications_since(request.user, cursor))
+    if rows:
+        cursor = max(cursor, rows[-1].created_at)
+    return JsonResponse({
+        "notifications": [notification_event(n) for n in rows],
+        "unread": request.user.profile.unread_notifications,
+        "cursor": cursor.isoformat(),
+    })
+
+
+def _relay_poll():
+    """
+    `poll` para broker.run_relay: de los usuarios suscritos en este proceso,
+    los que tienen notificaciones nuevas o agrupadas desde la pasada
+    anterior (con el margen de SSE_REPLAY_OVERLAP_SECONDS) o cuyo contador
+    de no leídas cambió. Dos consultas por lote de usuarios y pasada, sin
+    importar cuántas conexiones haya.
+    """
+    overlap = timedelta(seconds=getattr(settings, "SSE_REPLAY_OVERLAP_SECONDS", 5))
+    since = timezone.now()
+    unread = {}
+
+    async def poll(user_ids):
+        nonlocal since, unread
+        now = timezone.now()
+        woken = set()
+        counts = {}
+        for start in range(0, len(user_ids), 500):
+            chunk = user_ids[start:start + 500]
+            woken.update([
+                user_id async for user_id in
+                Notification.objects
+                .filter(user_id__in=chunk, created_at__gte=since - overlap)
+                .order_by().values_list("user_id", flat=True).distinct()
+            ])
+            async for user_id, count in (
+                Profile.objects.filter(user_id__in=chunk)
+                .values_list("user_id", "unread_notifications")
+            ):
+                counts[user_id] = count
+                if unread.get(user_id) != count:
+                    woken.add(user_id)
+        since, unread = now, counts
+        return woken
+
+    return poll
+
+
+@require_GET
+async def notifications_stream(request):
+    """
+    GET /notificaciones/stream/ — Server-Sent Events con las notificaciones
+    nuevas o agrupadas y el contador de no leídas del usuario.
+
+    Solo por ASGI (config/asgi.py): por WSGI un stream infinito ocuparía un
+    hilo del worker por cliente, así que se responde 204 (el navegador no
+    reintenta) y la página consulta notifications_poll.
+
+    La conexión espera en su cola del broker y solo lee la base de datos
+    (filas cuyo created_at pasó del cursor y el contador) cuando la
+    despiertan: el fan-out de este mismo proceso o el relay del proceso
+    (_relay_poll), que cada SSE_POLL_SECONDS ve lo escrito en los demás
+    workers. La conexión dura a lo más SSE_MAX_SECONDS; el navegador
+    reconecta con Last-Event-ID (el cursor) y recibe lo que se perdió.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponse(status=401)
+
+    cursor = _parse_event_cursor(request.headers.get("Last-Event-ID"))
+    replay = cursor is not None
+    if cursor is None:
+        cursor = timezone.now()
+
+    heartbeat = getattr(settings, "SSE_HEARTBEAT_SECONDS", 15)
+    poll = getattr(settings, "SSE_POLL_SECONDS", 5)
+    lifetime = getattr(settings, "SSE_MAX_SECONDS", 300)
+
+    async def events():
+        nonlocal cursor
+        clock = asyncio.get_running_loop().time
+        deadline = clock() + lifetime
+        # pk -> created_at ya enviado, para no repetir filas del margen.
+        sent = {}
+        unread = None
+        last_write = clock()
+        check_db = replay
+
+        with broker.subscribe(user.pk) as queue:
+            broker.run_relay(_relay_poll, poll)
+            woken = True
+            while clock() < deadline:
+                if woken:
+                    if check_db:
+                        async for n in _notifications_since(user, cursor):
+                            if sent.get(n.pk) != n.created_at:
+                                sent[n.pk] = n.created_at
+                                yield _sse("notification", notification_event(n), n.created_at.isoformat())
+                                last_write = clock()
+                            cursor = max(cursor, n.created_at)
+
+                    count = await _unread_count(user)
+                    if count != unread:
+                        unread = count
+                        yield _sse("unread", {"count": count})
+                        last_write = clock()
+
+                if clock() - last_write >= heartbeat:
+                    # Comentario SSE: mantiene viva la conexión a través de proxies.
+                    yield ": keepalive\n\n"
+                    last_write = clock()
+
+                wait = min(heartbeat, max(0, deadline - clock()))
+                try:
+                    await asyncio.wait_for(queue.get(), timeout=wait)
+                except asyncio.TimeoutError:
+                    woken = False
+                else:
+                    # Varios avisos seguidos se resuelven con una sola lectura.
+                    while not queue.empty():
+                        queue.get_nowait()
+                    woken = check_db = True
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 @login_required
+@read_from_replica
 def dashboard_view(request):
     """
     Dashboard con métricas de accesibilidad basadas en:
@@ -450,8 +1154,8 @@ def dashboard_view(request):
     places_stats = (
         Place.objects
         .annotate(
-            avg_rating=Avg("report__rating"),
-            reports_count=Count("report")
+            avg_rating=Avg("report__rating", filter=ALIVE_REPORTS),
+            reports_count=Count("report", filter=ALIVE_REPORTS)
         )
         .order_by("-avg_rating", "name")
     )
@@ -519,5 +1223,73 @@ def report_detail(request, pk):
     return render(request, 'core/report_detail.html', {
         'report': report,
         'comments': comments,
+        'flag_reasons': Flag.REASON_CHOICES,
+    })
+
+
+def _flag(request, report=None, comment=None):
+    reason = request.POST.get("reason")
+    if reason not in dict(Flag.REASON_CHOICES):
+        reason = Flag.OTHER
+    _, created = moderation.flag_content(
+        request.user, report=report, comment=comment,
+        reason=reason, note=request.POST.get("note", "").strip(),
+    )
+    if created:
+        messages.success(request, "Gracias, el equipo de moderación lo revisará.", extra_tags="comment")
+    else:
+        messages.info(request, "Ya lo habías denunciado.", extra_tags="comment")
+
+
+@require_POST
+@login_required
+def flag_report_view(request, pk):
+    """Denunciar un reporte."""
+    report = get_object_or_404(Report, pk=pk)
+    _flag(request, report=report)
+    return redirect('report_detail', pk=report.pk)
+
+
+@require_POST
+@login_required
+def flag_comment_view(request, pk):
+    """Denunciar un comentario de un reporte visible."""
+    comment = get_object_or_404(Comment, pk=pk, report__deleted_at__isnull=True)
+    _flag(request, comment=comment)
+    return redirect('report_detail', pk=comment.report_id)
+
+
+@staff_member_required
+def moderation_view(request):
+    """
+    Cola de moderación: denuncias pendientes paginadas por cursor
+    (?after=<id>) y acciones en bloque sobre las seleccionadas.
+    Solo para staff.
+    """
+    try:
+        after = int(request.GET.get("after") or 0)
+    except ValueError:
+        after = 0
+
+    if request.method == "POST":
+        action = request.POST.get("action")
+        flag_ids = [int(pk) for pk in request.POST.getlist("flags") if pk.isdigit()]
+        if action not in moderation.ACTIONS or not flag_ids:
+            messages.error(request, "Elige una acción y al menos una denuncia.")
+        else:
+            result = moderation.apply_action(action, flag_ids, request.user)
+            messages.success(
+                request,
+                f"{result['flags']} denuncias resueltas "
+                f"({result['reports']} reportes, {result['comments']} comentarios).",
+            )
+        url = reverse('moderation')
+        return redirect(f"{url}?after={after}" if after else url)
+
+    flags, next_after = moderation.pending_queue(after=after)
+    return render(request, 'core/moderation.html', {
+        'flags': flags,
+        'after': after,
+        'next_after': next_after,
     })
 
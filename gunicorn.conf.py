@@ -0,0 +1,34 @@
+"""
+Configuración de gunicorn para producción:
+
+    DJANGO_SETTINGS_MODULE=config.settings_production \
+        gunicorn -c gunicorn.conf.py config.wsgi
+
+Todos los valores se pueden ajustar con variables GUNICORN_*.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+
+# Regla habitual: 2 × núcleos + 1 procesos. Con hilos (gthread) cada proceso
+# atiende varias peticiones a la vez mientras espera a MySQL; en ese caso
+# conviene activar el pool de conexiones (DB_POOL_SIZE >= threads).
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.environ.get("GUNICORN_THREADS", "4"))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "5"))
+
+# Recicla workers periódicamente para acotar fugas de memoria.
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+
+# Carga la app una vez antes del fork (menos memoria y arranque más rápido).
+preload_app = os.environ.get("GUNICORN_PRELOAD", "1") == "1"
+
+accesslog = os.environ.get("GUNICORN_ACCESS_LOG", "-")
+errorlog = os.environ.get("GUNICORN_ERROR_LOG", "-")
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")